@@ -1,69 +1,376 @@
+import argparse
 from datetime import datetime
-from src.data_loader import get_all_financials
-from src.utils import get_two_closest_columns
-from src.ratio_calculator import calculate_ratios
-from src.report_builder import (
-    get_company_overview,
-    plot_stock_price,
-    get_dividends_and_splits,
-    get_earnings_calendar,
-    get_options_summary
-)
-from src.extended_data import get_extended_fundamental_data
-from src.pdf_report import create_pdf_report
-
-# Get input from user
-ticker = input("Enter a stock ticker (e.g. AAPL): ").strip().upper()
-date_input = input("Enter a reference date (YYYY-MM-DD): ").strip()
-
-try:
-    reference_date = datetime.strptime(date_input, "%Y-%m-%d")
-except ValueError:
-    print("Invalid date format. Please use YYYY-MM-DD.")
-    exit(1)
-
-# Load financial data
-financials = get_all_financials(ticker)
-bs = financials["balance_sheet"]
-current_date, previous_date = get_two_closest_columns(bs, reference_date)
-
-if not current_date or not previous_date:
-    print("Not enough financial data around the selected date.")
-    exit(1)
-
-# Collect all sections
-ratios = calculate_ratios(financials, current_date, previous_date)
-info = get_company_overview(ticker)
-chart_path = plot_stock_price(ticker, reference_date)
-divs_splits = get_dividends_and_splits(ticker)
-earnings = get_earnings_calendar(ticker)
-options = get_options_summary(ticker)
-extended_data = get_extended_fundamental_data(ticker)
-
-# Enhance overview with dividend and split history
-info["Latest Dividends"] = ", ".join([
-    f"{d.date().isoformat()}: {v}" for d, v in divs_splits['dividends'].tail().items()
-])
-info["Stock Splits"] = ", ".join([
-    f"{d.date().isoformat()}: {v}" for d, v in divs_splits['splits'].tail().items()
-])
-
-# Optional: Generate logo URL
-domain = info.get("website", "").replace("https://", "").replace("http://", "").replace("www.", "").strip("/")
-logo_url = f"https://logo.clearbit.com/{domain}" if domain else None
-
-# Generate the final PDF report
-pdf_path = create_pdf_report(
-    ticker=ticker,
-    overview=info,
-    ratios=ratios,
-    chart_path=chart_path,
-    earnings=earnings,
-    options=options,
-    extended_data=extended_data,
-    save_path=f"{ticker}_report.pdf",
-    name="Younes Sbihi",
-    logo_url=logo_url
-)
-
-print(f"PDF report saved to: {pdf_path}")
\ No newline at end of file
+
+# Commands import their modules on demand, so the CLI starts without loading
+# yfinance, pandas, matplotlib or fpdf until a section actually needs them.
+
+
+def run_interactive():
+    from src.incremental import ChartCache
+    from src.peers import get_peer_stats
+    from src.pipeline import ReportError, generate_report
+    from src.session import get_session
+    from src.price_store import PriceStore
+    from src.statement_cache import StatementCache
+
+    # Get input from user
+    ticker = input("Enter a stock ticker (e.g. AAPL): ").strip().upper()
+    date_input = input("Enter a reference date (YYYY-MM-DD): ").strip()
+
+    try:
+        reference_date = datetime.strptime(date_input, "%Y-%m-%d")
+    except ValueError:
+        print("Invalid date format. Please use YYYY-MM-DD.")
+        exit(1)
+
+    # One shared data session per ticker: every section reuses its fetched state
+    session = get_session(ticker)
+
+    try:
+        pdf_path = generate_report(
+            ticker, reference_date, session=session, cache=StatementCache(), price_store=PriceStore(),
+            chart_cache=ChartCache(), peers=get_peer_stats()
+        )
+    except ReportError as e:
+        print(e)
+        exit(1)
+
+    print(f"PDF report saved to: {pdf_path}")
+    print(f"Upstream calls: {session.upstream_calls}")
+    report_upstream()
+
+
+def report_upstream():
+    from src.throttle import upstream_totals
+
+    totals = upstream_totals()
+    if totals and (totals["retries"] or totals["failures"] or totals["throttled_seconds"]):
+        print(
+            f"Upstream: {totals['retries']:.0f} retries, {totals['failures']:.0f} failed calls, "
+            f"{totals['throttled_seconds']}s waiting for the rate limiter"
+        )
+
+
+def run_batch_command(args):
+    import logging
+    from datetime import timedelta
+    from src.batch import load_jobs, run_batch
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    jobs = load_jobs(args.jobs)
+    manifest = run_batch(
+        jobs,
+        args.output_dir,
+        workers=args.workers,
+        resume=args.resume,
+        incremental=not args.force,
+        appendix=args.appendix,
+        peer_store=args.peers,
+        frequency=args.frequency,
+        filing_lag=timedelta(days=args.filing_lag_days) if args.filing_lag_days else None,
+        trace_files=bool(args.trace),
+        metrics=bool(args.metrics),
+        throttle=args.throttle
+    )
+    counts = manifest["counts"]
+    print(
+        f"Done in {manifest['total_seconds']}s: {counts['ok']} ok, "
+        f"{counts['failed']} failed, {counts['skipped']} skipped"
+    )
+    if manifest["upstream"]["retries"] or manifest["upstream"]["failures"]:
+        print(f"Upstream: {manifest['upstream']['retries']:.0f} retries, {manifest['upstream']['failures']:.0f} failed calls")
+    if counts["failed"]:
+        exit(1)
+
+
+def run_export_command(args):
+    import logging
+    from datetime import timedelta
+    from src.batch import load_jobs
+    from src.export import run_export
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    output = args.output or ("exports" if args.format == "json" else f"exports.{args.format}")
+    manifest = run_export(
+        load_jobs(args.jobs),
+        output,
+        fmt=args.format,
+        workers=args.workers,
+        throttle=args.throttle,
+        frequency=args.frequency,
+        filing_lag=timedelta(days=args.filing_lag_days) if args.filing_lag_days else None
+    )
+    counts = manifest["counts"]
+    print(f"Exported to {output} in {manifest['total_seconds']}s: {counts['ok']} ok, {counts['failed']} failed")
+    if counts["failed"]:
+        exit(1)
+
+
+def run_screen_command(args):
+    from src.peers import PeerStats
+    from src.screener import ScreenerStore, resolve_metrics, run_screen
+    from src.statement_cache import StatementCache
+
+    store = ScreenerStore(args.store)
+    if args.ingest:
+        with open(args.ingest) as f:
+            tickers = [line.strip().upper() for line in f if line.strip()]
+        metrics = resolve_metrics(args.ingest_metrics.split(",")) if args.ingest_metrics else None
+        errors = store.ingest(tickers, cache=StatementCache(), metrics=metrics)
+        for ticker, error in errors.items():
+            print(f"Skipped {ticker}: {error}")
+        # Precompute the industry distributions reports are ranked against
+        table = PeerStats(store).table()
+        print(f"Peer statistics: {table.index.get_level_values(0).nunique() if len(table) else 0} industries")
+    if args.query:
+        result, seconds = run_screen(args.query, store, sort_by=args.sort_by, limit=args.limit)
+        print(f"{len(result)} matches in {seconds * 1000:.1f} ms")
+        print(result.to_string())
+
+
+def run_returns_command(args):
+    import time
+    from datetime import timedelta
+    from src.price_store import PriceStore
+    from src.total_return import universe_returns
+
+    with open(args.tickers) as f:
+        tickers = list(dict.fromkeys(line.strip().upper() for line in f if line.strip()))
+    end = datetime.strptime(args.date, "%Y-%m-%d") if args.date else datetime.today()
+    start = end - timedelta(days=round(args.years * 365))
+    began = time.perf_counter()
+    result = universe_returns(tickers, start, end + timedelta(days=1), PriceStore(args.store))
+    print(f"{len(result)} tickers in {time.perf_counter() - began:.2f}s")
+    if not args.output:
+        print(result.to_string())
+    elif args.output.endswith(".parquet"):
+        result.to_parquet(args.output)
+    else:
+        result.to_csv(args.output)
+
+
+def run_schedule_command(args):
+    import logging
+    from datetime import timedelta
+    from src.scheduler import RefreshScheduler, format_cycle
+
+    with open(args.tickers) as f:
+        tickers = [line.strip().upper() for line in f if line.strip()]
+    scheduler = RefreshScheduler(
+        tickers,
+        state_path=args.state,
+        ttl=timedelta(days=args.ttl_days),
+        frequency=args.frequency,
+        workers=args.workers,
+        output_dir=None if args.dry_run else args.output_dir,
+        throttle=args.throttle
+    )
+    if args.dry_run or args.once:
+        print(format_cycle(scheduler.run_cycle(dry_run=args.dry_run)))
+    else:
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+        scheduler.run_forever(poll=timedelta(minutes=args.poll_minutes))
+
+
+def run_record_command(args):
+    from src.fixtures import record_fixtures
+
+    errors = record_fixtures(
+        [ticker.upper() for ticker in args.tickers], datetime.strptime(args.date, "%Y-%m-%d"), args.output
+    )
+    for ticker, error in errors.items():
+        print(f"Incomplete recording for {ticker}: {error}")
+    print(f"Fixtures saved to: {args.output}")
+
+
+def run_bench_command(args):
+    from src.benchmark import compare, format_results, load_results, run_benchmarks, save_results
+
+    results = run_benchmarks(
+        args.fixtures,
+        reference_date=datetime.strptime(args.date, "%Y-%m-%d") if args.date else None,
+        iterations=args.iterations,
+        batch_sizes=[int(size) for size in args.sizes.split(",") if size],
+        workers=args.workers
+    )
+    regressions = compare(results, load_results(args.baseline), args.threshold) if args.baseline else None
+    print(format_results(results, regressions))
+    if args.output:
+        save_results(results, args.output)
+        print(f"Results saved to: {args.output}")
+    if regressions:
+        exit(1)
+
+
+def run_serve_command(args):
+    from src.assets import LogoCache
+    from src.incremental import ChartCache
+    from src.peers import get_peer_stats
+    from src.price_store import PriceStore
+    from src.server import ReportService, serve
+    from src.statement_cache import StatementCache
+
+    provider = None
+    if args.fixtures:
+        from src.fixtures import ReplayProvider
+
+        provider = ReplayProvider.from_file(args.fixtures)
+    service = ReportService(
+        args.output_dir,
+        workers=args.workers,
+        provider=provider,
+        cache=StatementCache(),
+        price_store=PriceStore(),
+        logo_cache=LogoCache(),
+        chart_cache=ChartCache(),
+        peers=get_peer_stats(args.peers) if args.peers else None,
+        fetch_logo=provider is None
+    )
+    serve(service, args.host, args.port)
+
+
+def run_command(args):
+    if args.command == "batch":
+        run_batch_command(args)
+    elif args.command == "export":
+        run_export_command(args)
+    elif args.command == "screen":
+        run_screen_command(args)
+    elif args.command == "returns":
+        run_returns_command(args)
+    elif args.command == "schedule":
+        run_schedule_command(args)
+    elif args.command == "record-fixtures":
+        run_record_command(args)
+    elif args.command == "bench":
+        run_bench_command(args)
+    elif args.command == "serve":
+        run_serve_command(args)
+    else:
+        run_interactive()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Financial report generator")
+    parser.add_argument(
+        "--profile-imports",
+        nargs="?",
+        type=float,
+        const=-1,
+        metavar="BUDGET_MS",
+        help="Report import times of the CLI entry point and fail if over budget"
+    )
+    parser.add_argument("--rate-limit", type=float, default=2.0, metavar="PER_SECOND",
+                        help="Upstream requests per second, shared by all workers on this machine")
+    parser.add_argument("--burst", type=int, default=10, help="Upstream requests allowed in a burst")
+    parser.add_argument("--retries", type=int, default=4, help="Retries of transient upstream errors")
+    parser.add_argument("--no-throttle", action="store_true", help="Call upstream without rate limiting")
+    parser.add_argument("--trace", metavar="PATH", help="Write a JSON trace of pipeline spans to PATH "
+                        "(batch mode writes each report's trace to <pdf>.trace.json instead, and not to PATH)")
+    parser.add_argument("--metrics", metavar="PATH", help="Write Prometheus text metrics (timings, cache hits, errors)")
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch = subparsers.add_parser("batch", help="Generate reports for a list of tickers and dates")
+    batch.add_argument("jobs", help="CSV or JSON file of (ticker, reference_date) pairs")
+    batch.add_argument("-o", "--output-dir", default="reports", help="Directory for PDFs and the manifest")
+    batch.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    batch.add_argument("--resume", action="store_true", help="Skip jobs whose PDF already exists")
+    batch.add_argument("--force", action="store_true", help="Rebuild PDFs even when their inputs are unchanged")
+    batch.add_argument("--peers", metavar="STORE", help="Screener store to rank each ratio against industry peers")
+    batch.add_argument("--appendix", action="store_true", help="Append every priced option contract as a table")
+    batch.add_argument("--frequency", choices=["annual", "quarterly", "ttm"], default="annual",
+                       help="Statements used for the ratios")
+    batch.add_argument("--filing-lag-days", type=int, default=0,
+                       help="Only use periods published this many days before the reference date")
+
+    export = subparsers.add_parser("export", help="Write report data as JSON, CSV or Parquet (no charts or PDF)")
+    export.add_argument("jobs", help="CSV or JSON file of (ticker, reference_date) pairs")
+    export.add_argument("-f", "--format", choices=["json", "csv", "parquet"], default="json")
+    export.add_argument("-o", "--output", help="Directory for JSON, file for CSV/Parquet (default: exports[.fmt])")
+    export.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    export.add_argument("--frequency", choices=["annual", "quarterly", "ttm"], default="annual",
+                        help="Statements used for the ratios")
+    export.add_argument("--filing-lag-days", type=int, default=0,
+                        help="Only use periods published this many days before the reference date")
+
+    screen = subparsers.add_parser("screen", help="Filter a universe of tickers by ratios")
+    screen.add_argument("query", nargs="?", help='e.g. "ROE > 0.15 and Debt-to-Equity < 1"')
+    screen.add_argument("--ingest", help="File with one ticker per line to (re)load into the store first")
+    screen.add_argument("--ingest-metrics", help="Comma-separated metrics to ingest for: only the statements they need are fetched")
+    screen.add_argument("--store", default="cache/screener", help="Screener store directory")
+    screen.add_argument("--sort-by", help="Metric to sort matches by (descending)")
+    screen.add_argument("--limit", type=int, default=None, help="Maximum number of matches to show")
+
+    returns = subparsers.add_parser("returns", help="Total return, CAGR, drawdown and volatility for a universe")
+    returns.add_argument("tickers", help="File with one ticker per line")
+    returns.add_argument("--date", help="End date (YYYY-MM-DD, default: today)")
+    returns.add_argument("--years", type=float, default=5, help="Length of the history window")
+    returns.add_argument("--store", default="cache/prices", help="Price store directory")
+    returns.add_argument("-o", "--output", help="Write the results to a .csv or .parquet file instead of printing")
+
+    schedule = subparsers.add_parser("schedule", help="Refresh only tickers that reported or went stale, then their reports")
+    schedule.add_argument("tickers", help="File with one ticker per line")
+    schedule.add_argument("-o", "--output-dir", help="Regenerate the reports of tickers whose statements changed here")
+    schedule.add_argument("--state", default="cache/scheduler.json", help="Per-ticker scheduler state file")
+    schedule.add_argument("--ttl-days", type=float, default=30, help="Refetch at least this often without earnings")
+    schedule.add_argument("--frequency", choices=["annual", "quarterly", "ttm"], default="annual",
+                          help="Statements to refresh (and use in the reports)")
+    schedule.add_argument("-w", "--workers", type=int, default=8, help="Tickers refreshed concurrently")
+    schedule.add_argument("--poll-minutes", type=float, default=60, help="Longest sleep between cycles")
+    schedule.add_argument("--once", action="store_true", help="Run a single cycle instead of a daemon loop")
+    schedule.add_argument("--dry-run", action="store_true", help="Only list the tickers that are due and why")
+
+    record = subparsers.add_parser("record-fixtures", help="Record Yahoo responses for offline benchmarks")
+    record.add_argument("tickers", nargs="+", help="Tickers to record")
+    record.add_argument("--date", required=True, help="Reference date (YYYY-MM-DD) to record a report for")
+    record.add_argument("-o", "--output", default="benchmarks/fixtures.pkl", help="Fixture file to write")
+
+    bench = subparsers.add_parser("bench", help="Benchmark report stages and batches against recorded fixtures")
+    bench.add_argument("--fixtures", default="benchmarks/fixtures.pkl", help="Fixture file from record-fixtures")
+    bench.add_argument("--date", help="Reference date (default: the one the fixtures were recorded for)")
+    bench.add_argument("--iterations", type=int, default=20, help="Timed runs per stage")
+    bench.add_argument("--sizes", default="1,100,1000", help="Comma-separated batch sizes")
+    bench.add_argument("-w", "--workers", type=int, default=None, help="Batch worker processes")
+    bench.add_argument("--baseline", help="Previous results JSON to compare against")
+    bench.add_argument("--threshold", type=float, default=0.2, help="Allowed p50 slowdown vs the baseline")
+    bench.add_argument("-o", "--output", help="Write the results JSON here")
+
+    server = subparsers.add_parser("serve", help="Run the HTTP report service")
+    server.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    server.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    server.add_argument("-w", "--workers", type=int, default=4, help="Reports built concurrently")
+    server.add_argument("-o", "--output-dir", default="reports/server", help="Directory for generated PDFs")
+    server.add_argument("--peers", metavar="STORE", help="Screener store to rank each ratio against industry peers")
+    server.add_argument("--fixtures", help="Serve offline from a record-fixtures file instead of Yahoo")
+
+    args = parser.parse_args()
+    if args.profile_imports is not None:
+        from src.import_profile import DEFAULT_IMPORT_BUDGET_MS, profile_imports
+
+        budget = args.profile_imports if args.profile_imports >= 0 else DEFAULT_IMPORT_BUDGET_MS
+        exit(0 if profile_imports("main", budget) else 1)
+
+    args.throttle = None
+    if not args.no_throttle:
+        from src.throttle import install_throttle
+
+        args.throttle = {"rate": args.rate_limit, "burst": args.burst, "retries": args.retries}
+        install_throttle(**args.throttle)
+
+    tracer = None
+    if args.trace or args.metrics:
+        from src.tracing import enable_tracing
+
+        tracer = enable_tracing()
+    try:
+        run_command(args)
+    finally:
+        if tracer is not None:
+            if args.trace and args.command != "batch":
+                tracer.write_trace(args.trace)
+            if args.metrics:
+                tracer.write_metrics(args.metrics)
+
+
+if __name__ == "__main__":
+    main()
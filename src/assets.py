@@ -0,0 +1,174 @@
+# src/assets.py
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Optional
+
+from src.tracing import count, span
+
+DEFAULT_ASSET_PATH = os.path.join("cache", "assets")
+LOGO_URL = "https://logo.clearbit.com/{domain}"
+
+# (connect, read) timeouts in seconds: a slow logo host must never hold up a report
+DEFAULT_TIMEOUT = (3.05, 5)
+
+# Logos (and misses) kept in memory per LogoCache, most recently used last; the rest stay on disk
+MAX_MEMORY_LOGOS = 256
+
+logger = logging.getLogger(__name__)
+
+_http = None
+_http_lock = threading.Lock()
+
+
+def get_http_session():
+    """Shared pooled requests.Session, so batch runs reuse TLS connections to the logo host."""
+    global _http
+    with _http_lock:
+        if _http is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            _http = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+            _http.mount("https://", adapter)
+            _http.mount("http://", adapter)
+        return _http
+
+
+def fetch_bytes(url: str, timeout=DEFAULT_TIMEOUT, content_type: Optional[str] = None) -> Optional[bytes]:
+    """
+    GET a URL through the pooled session. Returns the body, or None on a non-200 response
+    or when the Content-Type does not start with `content_type`.
+    """
+    response = get_http_session().get(url, timeout=timeout)
+    if response.status_code != 200 or not response.content:
+        return None
+    if content_type and not response.headers.get("Content-Type", "").startswith(content_type):
+        return None
+    return response.content
+
+
+def website_domain(website: Optional[str]) -> Optional[str]:
+    """Reduce a company website to a bare domain ("https://www.apple.com/" -> "apple.com")."""
+    if not website or website == "N/A":
+        return None
+    domain = website.replace("https://", "").replace("http://", "").replace("www.", "").strip("/")
+    return domain.split("/")[0] or None
+
+
+class LogoCache:
+    """
+    Content-addressed on-disk logo store.
+    Blobs live under `blobs/<sha256>`, and a small JSON index per domain points at the blob
+    (or records a miss). Hits are served from memory or disk, and misses are negatively cached
+    for `negative_ttl` so unknown domains are not retried on every report.
+    At most `max_memory` domains are kept in memory, least recently used first out.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_ASSET_PATH,
+        ttl: timedelta = timedelta(days=30),
+        negative_ttl: timedelta = timedelta(days=1),
+        url_template: str = LOGO_URL,
+        timeout=DEFAULT_TIMEOUT,
+        max_memory: int = MAX_MEMORY_LOGOS
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.url_template = url_template
+        self.timeout = timeout
+        self.max_memory = max_memory
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(path, "blobs"), exist_ok=True)
+        os.makedirs(os.path.join(path, "index"), exist_ok=True)
+
+    def _index_path(self, domain: str) -> str:
+        return os.path.join(self.path, "index", re.sub(r"[^A-Za-z0-9.-]", "_", domain.lower()) + ".json")
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.path, "blobs", digest)
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _read_index(self, domain: str) -> Optional[dict]:
+        try:
+            with open(self._index_path(domain)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _read_blob(self, digest: str) -> Optional[bytes]:
+        try:
+            with open(self._blob_path(digest), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def get(self, domain: Optional[str]) -> Optional[bytes]:
+        """Return the logo bytes for a domain, fetching them only if the cache has nothing fresh."""
+        if not domain:
+            return None
+        with self._lock:
+            remembered = self._memory.get(domain)
+            if remembered is not None and remembered[1] <= time.time():
+                del self._memory[domain]
+                remembered = None
+            elif remembered is not None:
+                self._memory.move_to_end(domain)
+        if remembered is not None:
+            count("report_cache_requests_total", cache="logos", result="hit")
+            return remembered[0]
+
+        entry = self._read_index(domain)
+        if entry is not None:
+            ttl = self.negative_ttl if entry.get("missing") else self.ttl
+            if time.time() - entry["fetched_at"] < ttl.total_seconds():
+                logo = None if entry.get("missing") else self._read_blob(entry["sha256"])
+                if logo is not None or entry.get("missing"):
+                    count("report_cache_requests_total", cache="logos", result="hit")
+                    return self._remember(domain, logo, entry["fetched_at"] + ttl.total_seconds())
+
+        count("report_cache_requests_total", cache="logos", result="miss")
+        try:
+            with span("upstream.logo", domain=domain) as s:
+                logo = fetch_bytes(self.url_template.format(domain=domain), timeout=self.timeout, content_type="image/")
+                s.record_payload(logo or b"", field="logo")
+        except Exception as e:
+            # Network trouble is not a real miss: serve a stale copy if there is one, and cache nothing
+            logger.warning("Could not fetch logo for %s: %s", domain, e)
+            stale = self._read_blob(entry["sha256"]) if entry and not entry.get("missing") else None
+            return stale
+
+        if logo is None:
+            entry = {"domain": domain, "fetched_at": time.time(), "missing": True}
+        else:
+            digest = hashlib.sha256(logo).hexdigest()
+            if not os.path.exists(self._blob_path(digest)):
+                self._write_atomic(self._blob_path(digest), logo)
+            entry = {"domain": domain, "fetched_at": time.time(), "sha256": digest}
+        self._write_atomic(self._index_path(domain), json.dumps(entry).encode())
+        ttl = self.ttl if logo is not None else self.negative_ttl
+        return self._remember(domain, logo, entry["fetched_at"] + ttl.total_seconds())
+
+    def _remember(self, domain: str, logo: Optional[bytes], expires: float) -> Optional[bytes]:
+        with self._lock:
+            self._memory[domain] = (logo, expires)
+            self._memory.move_to_end(domain)
+            while len(self._memory) > self.max_memory:
+                self._memory.popitem(last=False)
+        return logo
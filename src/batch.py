@@ -0,0 +1,225 @@
+# src/batch.py
+
+import csv
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from src.tracing import get_tracer
+
+MANIFEST_NAME = "manifest.json"
+
+# Fresh pools a job is resubmitted to after a worker crash broke the one it was queued on
+MAX_POOL_RESTARTS = 2
+
+logger = logging.getLogger(__name__)
+
+
+def load_jobs(path: str) -> List[Tuple[str, str]]:
+    """
+    Read (ticker, reference_date) pairs from a CSV or JSON file.
+    - CSV: a header row with `ticker` and `reference_date` (or `date`) columns
+    - JSON: a list of {"ticker": ..., "reference_date": ...} objects or [ticker, date] pairs
+    """
+    with open(path, newline="") as f:
+        if path.lower().endswith(".json"):
+            records = json.load(f)
+        else:
+            records = list(csv.DictReader(f))
+
+    jobs = []
+    for record in records:
+        if isinstance(record, dict):
+            ticker = record.get("ticker")
+            date = record.get("reference_date") or record.get("date")
+        else:
+            ticker, date = record
+        if ticker and date:
+            jobs.append((ticker.strip().upper(), date.strip()))
+    return jobs
+
+
+def output_path(output_dir: str, ticker: str, reference_date: str) -> str:
+    return os.path.join(output_dir, f"{ticker}_{reference_date}.pdf")
+
+
+def init_worker(
+    fixtures: Optional[str] = None, aliases: Optional[Dict[str, str]] = None, throttle: Optional[dict] = None
+) -> None:
+    """
+    Worker initializer: serve every session from recorded fixtures instead of Yahoo, or route
+    upstream calls through the shared rate limiter (`throttle` holds install_throttle's arguments).
+    """
+    if fixtures:
+        from src.fixtures import ReplayProvider
+        from src.session import set_default_provider
+
+        set_default_provider(ReplayProvider.from_file(fixtures, aliases))
+    elif throttle is not None:
+        from src.throttle import install_throttle
+
+        install_throttle(**throttle)
+
+
+def _run_job(
+    ticker: str,
+    reference_date: str,
+    output_dir: str,
+    name: str,
+    cache_dir: Optional[str],
+    trace_files: bool,
+    metrics: bool,
+    peer_store: Optional[str],
+    options: dict
+) -> dict:
+    """Worker entry point: build one report and never raise, so the pool keeps going."""
+    from src.incremental import ChartCache
+    from src.peers import get_peer_stats
+    from src.pipeline import generate_report
+    from src.price_store import PriceStore
+    from src.statement_cache import StatementCache
+    from src.throttle import upstream_totals
+    from src.tracing import disable_tracing, enable_tracing
+
+    start = time.perf_counter()
+    upstream_before = upstream_totals()
+    save_path = output_path(output_dir, ticker, reference_date)
+    entry = {"ticker": ticker, "reference_date": reference_date, "path": save_path}
+    tracer = enable_tracing() if trace_files or metrics else None
+    try:
+        date = datetime.strptime(reference_date, "%Y-%m-%d")
+        if cache_dir:
+            cache = StatementCache(os.path.join(cache_dir, "statements.sqlite"))
+            price_store = PriceStore(os.path.join(cache_dir, "prices"))
+            chart_cache = ChartCache(os.path.join(cache_dir, "charts"))
+        else:
+            cache, price_store, chart_cache = StatementCache(), PriceStore(), ChartCache()
+        generate_report(
+            ticker, date, save_path=save_path, name=name, cache=cache, price_store=price_store,
+            chart_cache=chart_cache, peers=get_peer_stats(peer_store) if peer_store else None, **options
+        )
+        entry["status"] = "ok"
+    except Exception as e:
+        entry["status"] = "failed"
+        entry["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if tracer is not None:
+            disable_tracing()
+            if trace_files:
+                tracer.write_trace(f"{save_path}.trace.json")
+            if metrics:
+                entry["metrics"] = tracer.snapshot()
+    if upstream_before is not None:
+        # Workers run one job at a time, so the provider's counters moved for this job only
+        upstream_after = upstream_totals()
+        entry["upstream"] = {k: round(upstream_after[k] - upstream_before[k], 3) for k in upstream_after}
+    entry["seconds"] = round(time.perf_counter() - start, 3)
+    return entry
+
+
+def run_batch(
+    jobs: List[Tuple[str, str]],
+    output_dir: str,
+    workers: Optional[int] = None,
+    resume: bool = False,
+    name: str = "Younes Sbihi",
+    fixtures: Optional[str] = None,
+    aliases: Optional[Dict[str, str]] = None,
+    cache_dir: Optional[str] = None,
+    trace_files: bool = False,
+    metrics: bool = False,
+    throttle: Optional[dict] = None,
+    peer_store: Optional[str] = None,
+    **options
+) -> dict:
+    """
+    Generate reports for many (ticker, reference_date) pairs across a process pool.
+    Writes the PDFs and a manifest of successes, failures and timings to `output_dir`.
+    With `resume`, jobs whose PDF already exists are skipped.
+    With `fixtures`, workers replay recorded data (see src.fixtures) instead of calling Yahoo;
+    `cache_dir` keeps the statement, price and chart caches out of the default `cache/` directory.
+    Reports whose section inputs are unchanged keep their existing PDF (`incremental=False` rebuilds).
+    With `trace_files`, each report's spans go to `<pdf>.trace.json`; with `metrics`, the workers'
+    metrics are merged into this process's tracer (see src.tracing), if one is enabled.
+    With `throttle` (install_throttle arguments), every worker draws from one shared rate limiter
+    and each job's retries and failed upstream calls are recorded in the manifest.
+    `peer_store` is a screener store directory whose industry peers each ratio is ranked against.
+    Extra keyword options (e.g. `frequency`, `filing_lag`) are passed to generate_report.
+    Jobs lost to a crashed worker are rerun on a fresh pool, up to MAX_POOL_RESTARTS times.
+    Progress is logged through this module's logger.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    entries = []
+
+    pending = []
+    for ticker, reference_date in dict.fromkeys(jobs):
+        path = output_path(output_dir, ticker, reference_date)
+        if resume and os.path.exists(path) and os.path.getsize(path) > 0:
+            entries.append({"ticker": ticker, "reference_date": reference_date, "path": path, "status": "skipped"})
+        else:
+            pending.append((ticker, reference_date))
+
+    total = len(entries) + len(pending)
+    for restart in range(MAX_POOL_RESTARTS + 1):
+        if not pending:
+            break
+        crashed = []
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(pending)), initializer=init_worker, initargs=(fixtures, aliases, throttle)
+        ) as pool:
+            futures = {
+                pool.submit(
+                    _run_job, ticker, reference_date, output_dir, name, cache_dir, trace_files, metrics, peer_store,
+                    options
+                ): (ticker, reference_date)
+                for ticker, reference_date in pending
+            }
+            for future in as_completed(futures):
+                ticker, reference_date = futures[future]
+                try:
+                    entry = future.result()
+                except BrokenProcessPool as e:
+                    # A crashed worker takes every queued job down with it; rerun those on a fresh pool
+                    if restart < MAX_POOL_RESTARTS:
+                        crashed.append((ticker, reference_date))
+                        continue
+                    entry = {
+                        "ticker": ticker,
+                        "reference_date": reference_date,
+                        "path": output_path(output_dir, ticker, reference_date),
+                        "status": "failed",
+                        "error": f"Worker crashed: {e}",
+                    }
+                snapshot = entry.pop("metrics", None)
+                if snapshot and get_tracer() is not None:
+                    get_tracer().merge(snapshot)
+                entries.append(entry)
+                logger.info("[%d/%d] %s %s: %s", len(entries), total, ticker, reference_date, entry["status"])
+        if crashed:
+            logger.warning("Worker pool broke, resubmitting %d jobs to a fresh pool", len(crashed))
+        pending = crashed
+
+    manifest = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "workers": workers,
+        "total_seconds": round(time.perf_counter() - start, 3),
+        "counts": {
+            status: sum(1 for e in entries if e["status"] == status)
+            for status in ("ok", "failed", "skipped")
+        },
+        "upstream": {
+            key: round(sum(e.get("upstream", {}).get(key, 0) for e in entries), 3)
+            for key in ("calls", "retries", "failures", "throttled_seconds")
+        },
+        "jobs": sorted(entries, key=lambda e: (e["ticker"], e["reference_date"])),
+    }
+    with open(os.path.join(output_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
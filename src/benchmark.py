@@ -0,0 +1,241 @@
+# src/benchmark.py
+
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from src.fixtures import ReplayProvider, load_fixtures, universe_aliases
+from src.session import TickerSession
+
+DEFAULT_FIXTURES_PATH = os.path.join("benchmarks", "fixtures.pkl")
+DEFAULT_BATCH_SIZES = (1, 100, 1000)
+
+# A stage counts as regressed when its p50 is this much slower than the baseline's
+DEFAULT_REGRESSION_THRESHOLD = 0.2
+
+# Timings below this are dominated by timer noise and never count as regressions
+MIN_COMPARABLE_SECONDS = 0.001
+
+
+def percentiles(samples: List[float]) -> dict:
+    """p50/p95/p99/max/mean of a list of durations in seconds (nearest-rank)."""
+    ordered = sorted(samples)
+    rank = lambda q: ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+    return {
+        "runs": len(ordered),
+        "p50": round(rank(0.50), 6),
+        "p95": round(rank(0.95), 6),
+        "p99": round(rank(0.99), 6),
+        "max": round(ordered[-1], 6),
+        "mean": round(sum(ordered) / len(ordered), 6),
+    }
+
+
+def peak_rss_mb(children: bool = False) -> float:
+    """High-water resident set size of this process (or of its reaped children) in MB."""
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    return round(usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def time_stage(fn: Callable[[], object], iterations: int, warmup: int = 1) -> dict:
+    """Run `fn` a few times untimed, then `iterations` times, and summarise the durations."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def _report_inputs(ticker: str, reference_date: datetime, provider: ReplayProvider) -> dict:
+    """Every section create_pdf_report needs, gathered once so the PDF stage is timed on its own."""
+    from src.data_loader import get_all_financials
+    from src.extended_data import get_extended_fundamental_data
+    from src.options_analytics import get_options_analytics
+    from src.ratio_calculator import calculate_ratios
+    from src.report_builder import (
+        get_company_overview,
+        get_earnings_calendar,
+        get_report_charts
+    )
+    from src.utils import get_two_closest_columns
+
+    session = TickerSession(ticker, provider)
+    financials = get_all_financials(ticker, session)
+    current_date, previous_date = get_two_closest_columns(financials["balance_sheet"], reference_date)
+    return {
+        "ticker": ticker,
+        "overview": get_company_overview(ticker, session),
+        "ratios": calculate_ratios(financials, current_date, previous_date),
+        "chart_path": None,
+        "earnings": get_earnings_calendar(ticker, session),
+        "options": get_options_analytics(ticker, session),
+        "extended_data": get_extended_fundamental_data(ticker, session),
+        "charts": get_report_charts(ticker, reference_date, session=session),
+    }
+
+
+def bench_stages(ticker: str, reference_date: datetime, provider: ReplayProvider, iterations: int, workdir: str) -> dict:
+    """
+    Time each stage of one report against replayed data. Every iteration that fetches uses a
+    fresh session, so the memoized results of the previous one are not reused.
+    """
+    from src.data_loader import get_all_financials
+    from src.pdf_report import create_pdf_report
+    from src.pipeline import generate_report
+    from src.ratio_calculator import calculate_ratios
+    from src.report_builder import plot_stock_price
+    from src.utils import get_two_closest_columns
+
+    fresh = lambda: TickerSession(ticker, provider)
+    financials = get_all_financials(ticker, fresh())
+    current_date, previous_date = get_two_closest_columns(financials["balance_sheet"], reference_date)
+    inputs = _report_inputs(ticker, reference_date, provider)
+    pdf_path = os.path.join(workdir, f"{ticker}_bench.pdf")
+
+    stages = {
+        "get_all_financials": lambda: get_all_financials(ticker, fresh()),
+        "calculate_ratios": lambda: calculate_ratios(financials, current_date, previous_date),
+        "plot_stock_price": lambda: plot_stock_price(ticker, reference_date, session=fresh()),
+        # Incremental skipping is off: every iteration must build the whole PDF
+        "create_pdf_report": lambda: create_pdf_report(save_path=pdf_path, incremental=False, **inputs),
+        "generate_report": lambda: generate_report(
+            ticker, reference_date, save_path=pdf_path, session=fresh(), fetch_logo=False, incremental=False
+        ),
+    }
+    results = {}
+    for stage, fn in stages.items():
+        results[stage] = time_stage(fn, iterations)
+        results[stage]["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+def bench_batch(
+    fixtures_path: str,
+    tickers: List[str],
+    reference_date: datetime,
+    size: int,
+    workers: Optional[int],
+    workdir: str
+) -> dict:
+    """Run a batch of `size` reports over a universe cycled from the recorded tickers."""
+    from src.batch import run_batch
+
+    aliases = universe_aliases(tickers, size)
+    output_dir = os.path.join(workdir, f"batch_{size}")
+    date = reference_date.strftime("%Y-%m-%d")
+    manifest = run_batch(
+        [(ticker, date) for ticker in aliases],
+        output_dir,
+        workers=workers,
+        fixtures=fixtures_path,
+        aliases=aliases,
+        cache_dir=os.path.join(output_dir, "cache"),
+        fetch_logo=False,
+    )
+    seconds = [job["seconds"] for job in manifest["jobs"] if "seconds" in job]
+    return {
+        "size": size,
+        "workers": manifest["workers"],
+        "total_seconds": manifest["total_seconds"],
+        "reports_per_second": round(size / manifest["total_seconds"], 3) if manifest["total_seconds"] else None,
+        "failed": manifest["counts"]["failed"],
+        "job_latency": percentiles(seconds) if seconds else None,
+        "peak_rss_mb_workers": peak_rss_mb(children=True),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> List[str]:
+    """Regressions of `results` against a previous run: p50 stage latency and per-batch wall time."""
+    regressions = []
+
+    def check(label: str, current: Optional[float], previous: Optional[float]) -> None:
+        if current is None or not previous or max(current, previous) < MIN_COMPARABLE_SECONDS:
+            return
+        change = current / previous - 1
+        if change > threshold:
+            regressions.append(f"{label}: {previous:.4f}s -> {current:.4f}s (+{change:.0%})")
+
+    for stage, stats in results.get("stages", {}).items():
+        check(f"{stage} p50", stats["p50"], baseline.get("stages", {}).get(stage, {}).get("p50"))
+    for size, stats in results.get("batches", {}).items():
+        check(f"batch {size} total", stats["total_seconds"], baseline.get("batches", {}).get(size, {}).get("total_seconds"))
+    return regressions
+
+
+def run_benchmarks(
+    fixtures_path: str = DEFAULT_FIXTURES_PATH,
+    reference_date: Optional[datetime] = None,
+    iterations: int = 20,
+    batch_sizes=DEFAULT_BATCH_SIZES,
+    workers: Optional[int] = None
+) -> dict:
+    """
+    Benchmark the report stages and batch throughput entirely offline, from fixtures recorded
+    with record_fixtures. Results are plain JSON-serialisable data.
+    """
+    recorded = load_fixtures(fixtures_path)
+    tickers = sorted(recorded["tickers"])
+    if not tickers:
+        raise ValueError(f"No recorded tickers in {fixtures_path}")
+    if reference_date is None:
+        reference_date = datetime.strptime(recorded["reference_date"], "%Y-%m-%d")
+    provider = ReplayProvider(recorded["tickers"])
+
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "fixtures": fixtures_path,
+        "ticker": tickers[0],
+        "reference_date": reference_date.strftime("%Y-%m-%d"),
+        "python": sys.version.split()[0],
+        "cpus": os.cpu_count(),
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        results["stages"] = bench_stages(tickers[0], reference_date, provider, iterations, workdir)
+        results["batches"] = {
+            str(size): bench_batch(fixtures_path, tickers, reference_date, size, workers, workdir)
+            for size in batch_sizes
+        }
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+def format_results(results: dict, regressions: Optional[List[str]] = None) -> str:
+    lines = [f"{'stage':<20} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9} {'rss MB':>8}"]
+    for stage, s in results["stages"].items():
+        lines.append(
+            f"{stage:<20} {s['p50']:>9.4f} {s['p95']:>9.4f} {s['p99']:>9.4f} {s['max']:>9.4f} {s['peak_rss_mb']:>8.1f}"
+        )
+    lines.append("")
+    lines.append(f"{'batch':<8} {'workers':>7} {'total s':>9} {'rep/s':>8} {'job p50':>9} {'job p99':>9} {'failed':>6}")
+    for size, b in results["batches"].items():
+        latency = b["job_latency"] or {"p50": 0.0, "p99": 0.0}
+        lines.append(
+            f"{size:<8} {b['workers']:>7} {b['total_seconds']:>9.3f} {b['reports_per_second'] or 0:>8.2f} "
+            f"{latency['p50']:>9.4f} {latency['p99']:>9.4f} {b['failed']:>6}"
+        )
+    lines.append("")
+    lines.append(f"Peak RSS: {results['peak_rss_mb']} MB (benchmark process)")
+    if regressions is not None:
+        lines.append("Regressions: " + ("\n  " + "\n  ".join(regressions) if regressions else "none"))
+    return "\n".join(lines)
+
+
+def load_results(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_results(results: dict, path: str) -> None:
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
@@ -0,0 +1,113 @@
+# src/charts.py
+
+import io
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from matplotlib import rcParams
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import pandas as pd
+
+from src.tracing import traced
+
+# Idle figures per chart template, shared by every thread: a render checks one out and puts it
+# back, so reports rendered on short-lived section threads still reuse figures. Renders never
+# touch the pyplot state machine or the filesystem.
+_templates: Dict[str, List[tuple]] = {}
+_templates_lock = threading.Lock()
+
+_SUBPLOT_SIDES = ("left", "right", "bottom", "top")
+
+
+@contextmanager
+def template(name: str, figsize: Tuple[float, float] = (10, 4)):
+    """A cleared (figure, axes) pair for a chart template, held by the caller until the block exits."""
+    with _templates_lock:
+        idle = _templates.setdefault(name, [])
+        entry = idle.pop() if idle else None
+    if entry is None:
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        entry = (fig, fig.add_subplot())
+    fig, ax = entry
+    ax.clear()
+    # Undo the previous render's tight_layout, so a chart comes out the same on any figure
+    fig.subplots_adjust(**{side: rcParams[f"figure.subplot.{side}"] for side in _SUBPLOT_SIDES})
+    try:
+        yield entry
+    finally:
+        with _templates_lock:
+            _templates[name].append(entry)
+
+
+@traced()
+def to_png(fig: Figure, dpi: int = 100) -> bytes:
+    """Render a figure to in-memory PNG bytes."""
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi)
+    return buffer.getvalue()
+
+
+@traced()
+def render_price_chart(hist: pd.DataFrame, ticker: str, title: Optional[str] = None) -> bytes:
+    """Close price line chart."""
+    with template("price") as (fig, ax):
+        ax.plot(hist.index, hist["Close"], label="Close Price")
+        ax.set_title(title or f"{ticker} Stock Price (Last 5 Years)")
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Price (USD)")
+        ax.grid(True)
+        return to_png(fig)
+
+
+@traced()
+def render_total_return_chart(frame: pd.DataFrame, ticker: str) -> bytes:
+    """Split-adjusted price against dividend-reinvested total return, both rebased to 100."""
+    with template("total_return") as (fig, ax):
+        ax.plot(frame.index, frame["Price"], label="Price (split-adjusted)")
+        ax.plot(frame.index, frame["Total Return"], label="Total return (dividends reinvested)")
+        ax.set_title(f"{ticker} Total Return (Last 5 Years)")
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Growth of 100")
+        ax.grid(True)
+        ax.legend(loc="best", fontsize=8)
+        return to_png(fig)
+
+
+@traced()
+def render_ratio_history_chart(ratio_frame: pd.DataFrame, ticker: str, metrics: Iterable[str]) -> bytes:
+    """One line per ratio across reporting periods (ratio x period frame, as from calculate_ratio_frame)."""
+    with template("ratio_history") as (fig, ax):
+        history = ratio_frame.loc[list(metrics)].T.sort_index()
+        for metric in history.columns:
+            ax.plot(history.index, history[metric], marker="o", label=metric)
+        ax.set_title(f"{ticker} Ratio History")
+        ax.set_xlabel("Reporting Date")
+        ax.grid(True)
+        ax.legend(loc="best", fontsize=8)
+        return to_png(fig)
+
+
+@traced()
+def render_dividends_chart(dividends: pd.Series, ticker: str) -> bytes:
+    """Dividend per share at each payment date."""
+    with template("dividends") as (fig, ax):
+        ax.step(dividends.index, dividends.values, where="post", label="Dividend")
+        ax.set_title(f"{ticker} Dividends per Share")
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Dividend (USD)")
+        ax.grid(True)
+        return to_png(fig)
+
+
+def render_charts(charts: Dict[str, Callable[[], Optional[bytes]]]) -> Dict[str, bytes]:
+    """Render several charts for one report; charts that return None are left out."""
+    rendered = {}
+    for title, render in charts.items():
+        png = render()
+        if png is not None:
+            rendered[title] = png
+    return rendered
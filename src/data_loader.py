@@ -1,34 +1,79 @@
 # src/data_loader.py
 
-import yfinance as yf
 import pandas as pd
+from datetime import datetime
+from typing import Iterable, Optional
+from src.session import TickerSession, get_session
+from src.statement_cache import StatementCache
+from src.periods import FREQUENCIES, ttm_view
+from src.tracing import count, span, traced
 
-def get_ticker_data(ticker: str) -> yf.Ticker:
-    """Return a yfinance Ticker object."""
-    return yf.Ticker(ticker)
+def get_ticker_data(ticker: str, session: Optional[TickerSession] = None) -> TickerSession:
+    """Return the shared data session for a ticker."""
+    return session or get_session(ticker)
 
-def get_balance_sheet(ticker: str) -> pd.DataFrame:
-    """Return the most recent annual balance sheet as a DataFrame."""
-    ticker_obj = get_ticker_data(ticker)
-    bs = ticker_obj.balance_sheet
+def get_balance_sheet(ticker: str, session: Optional[TickerSession] = None, quarterly: bool = False) -> pd.DataFrame:
+    """Return the most recent annual (or quarterly) balance sheet as a DataFrame."""
+    bs = get_ticker_data(ticker, session).get("quarterly_balance_sheet" if quarterly else "balance_sheet")
     return bs if not bs.empty else pd.DataFrame()
 
-def get_income_statement(ticker: str) -> pd.DataFrame:
-    """Return the most recent annual income statement as a DataFrame."""
-    ticker_obj = get_ticker_data(ticker)
-    is_df = ticker_obj.financials
+def get_income_statement(ticker: str, session: Optional[TickerSession] = None, quarterly: bool = False) -> pd.DataFrame:
+    """Return the most recent annual (or quarterly) income statement as a DataFrame."""
+    is_df = get_ticker_data(ticker, session).get("quarterly_financials" if quarterly else "financials")
     return is_df if not is_df.empty else pd.DataFrame()
 
-def get_cash_flow(ticker: str) -> pd.DataFrame:
-    """Return the most recent annual cash flow statement as a DataFrame."""
-    ticker_obj = get_ticker_data(ticker)
-    cf = ticker_obj.cashflow
+def get_cash_flow(ticker: str, session: Optional[TickerSession] = None, quarterly: bool = False) -> pd.DataFrame:
+    """Return the most recent annual (or quarterly) cash flow statement as a DataFrame."""
+    cf = get_ticker_data(ticker, session).get("quarterly_cashflow" if quarterly else "cashflow")
     return cf if not cf.empty else pd.DataFrame()
 
-def get_all_financials(ticker: str) -> dict:
-    """Return all financials as a dictionary of DataFrames."""
-    return {
-        "balance_sheet": get_balance_sheet(ticker),
-        "income_statement": get_income_statement(ticker),
-        "cash_flow": get_cash_flow(ticker),
-    }
\ No newline at end of file
+def _load_statement(ticker: str, statement: str, session: TickerSession, cache: Optional[StatementCache],
+                    as_of: Optional[datetime], quarterly: bool) -> pd.DataFrame:
+    """One statement from the cache if it has it, otherwise from the session (then cached)."""
+    cache_key = f"quarterly_{statement}" if quarterly else statement
+    with span("data_loader.statement", ticker=ticker, statement=cache_key) as s:
+        df = cache.get(ticker, cache_key, as_of=as_of) if cache else None
+        if cache:
+            s.set("cache", "hit" if df is not None else "miss")
+            count("report_cache_requests_total", cache="statements", result="hit" if df is not None else "miss")
+        if df is None and as_of is not None and cache:
+            df = pd.DataFrame()
+        elif df is None:
+            df = STATEMENT_GETTERS[statement](ticker, session, quarterly=quarterly)
+            if cache and not df.empty:
+                cache.put(ticker, cache_key, df)
+        return df
+
+STATEMENT_GETTERS = {
+    "balance_sheet": get_balance_sheet,
+    "income_statement": get_income_statement,
+    "cash_flow": get_cash_flow,
+}
+
+@traced()
+def get_all_financials(
+    ticker: str,
+    session: Optional[TickerSession] = None,
+    cache: Optional[StatementCache] = None,
+    as_of: Optional[datetime] = None,
+    statements: Optional[Iterable[str]] = None,
+    frequency: str = "annual"
+) -> dict:
+    """
+    Return all financials as a dictionary of DataFrames.
+    `statements` restricts the fetch, e.g. to `required_statements(metrics)` from the ratio registry.
+    With a cache, fresh snapshots are served locally and new fetches are stored.
+    With `as_of`, the snapshot that existed on that date is returned (empty if none).
+    `frequency` is "annual", "quarterly" or "ttm" (quarterly balance sheets with
+    trailing-twelve-month income and cash flow statements).
+    """
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Unknown frequency '{frequency}' (expected one of {', '.join(FREQUENCIES)})")
+    quarterly = frequency != "annual"
+
+    session = get_ticker_data(ticker, session)
+    financials = {
+        statement: _load_statement(ticker, statement, session, cache, as_of, quarterly)
+        for statement in statements or STATEMENT_GETTERS
+    }
+    return ttm_view(financials) if frequency == "ttm" else financials
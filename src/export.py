@@ -0,0 +1,265 @@
+# src/export.py
+
+import json
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.batch import init_worker
+from src.extended_data import get_extended_fundamental_data
+from src.orchestrator import is_unavailable, run_sections
+from src.pipeline import load_financials_at
+from src.ratio_calculator import calculate_ratios
+from src.report_builder import get_company_overview, get_earnings_calendar
+from src.session import TickerSession, get_session
+from src.statement_cache import StatementCache
+
+# Bump when a field is renamed or its meaning changes; adding fields keeps the version
+EXPORT_SCHEMA_VERSION = 1
+
+EXPORT_FORMATS = ("json", "csv", "parquet")
+
+# Long row layout shared by CSV and Parquet: one value per row, numeric or text
+ROW_COLUMNS = ["ticker", "reference_date", "section", "group", "field", "value", "text"]
+
+logger = logging.getLogger(__name__)
+
+
+def collect_report_data(
+    ticker: str,
+    reference_date: datetime,
+    session: Optional[TickerSession] = None,
+    cache: Optional[StatementCache] = None,
+    frequency: str = "annual",
+    filing_lag: Optional[timedelta] = None,
+    section_timeout: float = 30,
+    deadline: float = 45
+) -> dict:
+    """
+    The numbers behind a report, without rendering any chart or PDF (neither matplotlib
+    nor fpdf is imported). Sections that fail are None and listed under "errors".
+    """
+    ticker = ticker.strip().upper()
+    session = session or get_session(ticker)
+    financials, current_date, previous_date = load_financials_at(
+        ticker, reference_date, session, cache, frequency, filing_lag
+    )
+    sections = run_sections({
+        "overview": lambda: get_company_overview(ticker, session),
+        "ratios": lambda: calculate_ratios(financials, current_date, previous_date, frequency=frequency),
+        "earnings": lambda: get_earnings_calendar(ticker, session),
+        "extended_data": lambda: get_extended_fundamental_data(ticker, session),
+    }, section_timeout=section_timeout, deadline=deadline, label="export")
+
+    errors = {name: value.reason for name, value in sections.items() if is_unavailable(value)}
+    extended = sections["extended_data"]
+    if not is_unavailable(extended):
+        errors.update({f"extended_data.{k}": v.reason for k, v in extended.items() if is_unavailable(v)})
+        sections["extended_data"] = {k: None if is_unavailable(v) else v for k, v in extended.items()}
+
+    return {
+        "schema_version": EXPORT_SCHEMA_VERSION,
+        "ticker": ticker,
+        "reference_date": reference_date.strftime("%Y-%m-%d"),
+        "frequency": frequency,
+        "current_period": pd.Timestamp(current_date).strftime("%Y-%m-%d"),
+        "previous_period": pd.Timestamp(previous_date).strftime("%Y-%m-%d"),
+        **{name: None if is_unavailable(value) else value for name, value in sections.items()},
+        "errors": errors,
+    }
+
+
+def to_jsonable(value: Any) -> Any:
+    """Plain JSON types for anything a section returns (frames become {row: {column: value}})."""
+    if isinstance(value, DataFrame):
+        return {str(row): to_jsonable(values) for row, values in value.to_dict(orient="index").items()}
+    if isinstance(value, pd.Series):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _flatten(value: Any, prefix: str = "") -> List[Tuple[str, Any]]:
+    """(field, scalar) pairs, nested keys joined with '|' (e.g. "0q|avg" for a frame cell)."""
+    if isinstance(value, dict):
+        pairs = []
+        for key, item in value.items():
+            pairs += _flatten(item, f"{prefix}|{key}" if prefix else str(key))
+        return pairs
+    if isinstance(value, list):
+        return [(prefix, json.dumps(value))]
+    return [(prefix, value)]
+
+
+def report_rows(data: dict) -> DataFrame:
+    """Long rows (ROW_COLUMNS) for one collect_report_data result."""
+    rows = []
+
+    def add(section: str, group: str, field: str, value: Any) -> None:
+        number = value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+        rows.append((
+            data["ticker"], data["reference_date"], section, group, field,
+            float(number) if number is not None else np.nan,
+            None if number is not None or value is None else str(value),
+        ))
+
+    for field in ("frequency", "current_period", "previous_period"):
+        add("meta", "", field, data[field])
+    for section in ("overview", "earnings"):
+        for field, value in _flatten(to_jsonable(data[section] or {})):
+            add(section, "", field, value)
+    for group, metrics in (data["ratios"] or {}).items():
+        for metric, value in metrics.items():
+            add("ratios", group, metric, value)
+    for label, block in (data["extended_data"] or {}).items():
+        for field, value in _flatten(to_jsonable(block)):
+            add("extended_data", label, field, value)
+    for section, reason in data["errors"].items():
+        add("errors", "", section, reason)
+
+    frame = DataFrame(rows, columns=ROW_COLUMNS)
+    frame["value"] = frame["value"].astype("float64")
+    return frame
+
+
+class ExportWriter:
+    """
+    Writes export results as they arrive: one JSON document per ticker and date in a directory,
+    or rows appended to a single CSV or Parquet file with a fixed schema.
+    """
+
+    def __init__(self, output: str, fmt: str = "json"):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format '{fmt}' (expected one of {', '.join(EXPORT_FORMATS)})")
+        self.output = output
+        self.fmt = fmt
+        self._parquet = None
+        if fmt == "json":
+            os.makedirs(output, exist_ok=True)
+        else:
+            if os.path.dirname(output):
+                os.makedirs(os.path.dirname(output), exist_ok=True)
+            if os.path.exists(output):
+                os.remove(output)
+
+    def write(self, data: dict) -> str:
+        if self.fmt == "json":
+            path = os.path.join(self.output, f"{data['ticker']}_{data['reference_date']}.json")
+            with open(path, "w") as f:
+                json.dump(to_jsonable(data), f, indent=2)
+            return path
+
+        rows = report_rows(data)
+        if self.fmt == "csv":
+            rows.to_csv(self.output, mode="a", header=not os.path.exists(self.output), index=False)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.output, row_schema())
+            self._parquet.write_table(pa.Table.from_pandas(rows, schema=row_schema(), preserve_index=False))
+        return self.output
+
+    def close(self) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+
+
+def row_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("ticker", pa.string()),
+        ("reference_date", pa.string()),
+        ("section", pa.string()),
+        ("group", pa.string()),
+        ("field", pa.string()),
+        ("value", pa.float64()),
+        ("text", pa.string()),
+    ])
+
+
+def _export_job(ticker: str, reference_date: str, options: dict) -> Tuple[dict, Optional[dict]]:
+    """Worker entry point: collect one ticker's data and never raise."""
+    start = time.perf_counter()
+    entry = {"ticker": ticker, "reference_date": reference_date}
+    data = None
+    try:
+        data = collect_report_data(
+            ticker, datetime.strptime(reference_date, "%Y-%m-%d"), cache=StatementCache(), **options
+        )
+        entry["status"] = "ok"
+    except Exception as e:
+        entry["status"] = "failed"
+        entry["error"] = f"{type(e).__name__}: {e}"
+    entry["seconds"] = round(time.perf_counter() - start, 3)
+    return entry, data
+
+
+def run_export(
+    jobs: List[Tuple[str, str]],
+    output: str,
+    fmt: str = "json",
+    workers: Optional[int] = None,
+    throttle: Optional[dict] = None,
+    **options
+) -> dict:
+    """
+    Export the report data for many (ticker, reference_date) pairs across a process pool.
+    `output` is a directory for JSON, or the CSV/Parquet file the rows are appended to.
+    `throttle` routes every worker through the shared rate limiter (see batch.init_worker).
+    Extra keyword options (e.g. `frequency`, `filing_lag`) are passed to collect_report_data.
+    Progress is logged through this module's logger.
+    """
+    writer = ExportWriter(output, fmt)
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    entries = []
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max(1, min(workers, len(jobs))), initializer=init_worker, initargs=(None, None, throttle)
+        ) as pool:
+            futures = [
+                pool.submit(_export_job, ticker, reference_date, options)
+                for ticker, reference_date in dict.fromkeys(jobs)
+            ]
+            for future in as_completed(futures):
+                entry, data = future.result()
+                if data is not None:
+                    entry["path"] = writer.write(data)
+                entries.append(entry)
+                logger.info(
+                    "[%d/%d] %s %s: %s", len(entries), len(futures), entry["ticker"], entry["reference_date"],
+                    entry["status"]
+                )
+    finally:
+        writer.close()
+
+    return {
+        "format": fmt,
+        "output": output,
+        "total_seconds": round(time.perf_counter() - start, 3),
+        "counts": {status: sum(1 for e in entries if e["status"] == status) for status in ("ok", "failed")},
+        "jobs": sorted(entries, key=lambda e: (e["ticker"], e["reference_date"])),
+    }
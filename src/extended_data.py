@@ -1,19 +1,23 @@
-import yfinance as yf
+from typing import Optional
+from src.orchestrator import run_sections
+from src.session import TickerSession, get_session
 
-def get_extended_fundamental_data(ticker_symbol: str) -> dict:
-    ticker = yf.Ticker(ticker_symbol)
+def get_extended_fundamental_data(
+    ticker_symbol: str,
+    session: Optional[TickerSession] = None,
+    timeout: Optional[float] = 30.0
+) -> dict:
+    ticker = session or get_session(ticker_symbol)
 
-    def safe_get(func):
-        try:
-            return func()
-        except Exception:
-            return None
+    # The six estimate endpoints are independent, so they are fetched concurrently
+    results = run_sections({
+        "analyst_price_targets": lambda: ticker.get("get_analyst_price_targets"),
+        "recommendations": lambda: ticker.get("get_recommendations").tail(5),
+        "eps_trend": lambda: ticker.get("get_eps_trend"),
+        "earnings_estimate": lambda: ticker.get("get_earnings_estimate"),
+        "revenue_estimate": lambda: ticker.get("get_revenue_estimate"),
+        "growth_estimates": lambda: ticker.get("get_growth_estimates"),
+    }, section_timeout=timeout, deadline=None, label="extended_data")
 
-    return {
-        "analyst_price_targets": safe_get(ticker.get_analyst_price_targets),
-        "recommendations": safe_get(lambda: ticker.get_recommendations().tail(5)),
-        "eps_trend": safe_get(ticker.get_eps_trend),
-        "earnings_estimate": safe_get(ticker.get_earnings_estimate),
-        "revenue_estimate": safe_get(ticker.get_revenue_estimate),
-        "growth_estimates": safe_get(ticker.get_growth_estimates),
-    }
\ No newline at end of file
+    # Failed endpoints stay SectionUnavailable (with the reason) so the report can say so
+    return results
@@ -0,0 +1,152 @@
+# src/fixtures.py
+
+import itertools
+import os
+import pickle
+import threading
+import types
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.session import DataProvider, YFinanceProvider, get_default_provider
+
+# Recorded fixtures: {ticker: {(field, args, kwargs): value}}, the same keys TickerSession memoizes on
+Fixtures = Dict[str, Dict[tuple, Any]]
+
+
+def fixture_key(field: str, args: tuple, kwargs: dict) -> tuple:
+    return field, args, tuple(sorted(kwargs.items()))
+
+
+def _portable(value: Any) -> Any:
+    # yfinance returns option chains as a dynamically created namedtuple, which does not pickle
+    if hasattr(value, "calls") and hasattr(value, "puts"):
+        return types.SimpleNamespace(
+            calls=value.calls, puts=value.puts, underlying=getattr(value, "underlying", None)
+        )
+    return value
+
+
+class RecordingProvider(DataProvider):
+    """Wraps another provider and records every successful response for later replay."""
+
+    def __init__(self, inner: Optional[DataProvider] = None):
+        # The default provider may be the rate-limited one: recording goes through it too
+        self.inner = inner or get_default_provider() or YFinanceProvider()
+        self.fixtures: Fixtures = {}
+        self._lock = threading.Lock()
+
+    def open(self, ticker: str) -> Any:
+        return ticker, self.inner.open(ticker)
+
+    def fetch(self, handle: Any, field: str, *args, **kwargs) -> Any:
+        ticker, inner_handle = handle
+        value = _portable(self.inner.fetch(inner_handle, field, *args, **kwargs))
+        with self._lock:
+            self.fixtures.setdefault(ticker, {})[fixture_key(field, args, kwargs)] = value
+        return value
+
+    def save(self, path: str, reference_date: Optional[str] = None) -> None:
+        save_fixtures(self.fixtures, path, reference_date)
+
+
+class ReplayProvider(DataProvider):
+    """
+    Serves recorded fixtures with no network access.
+    Price history requests for a range that was not recorded as such are sliced out of the
+    recorded history. With `aliases`, extra tickers replay another ticker's data, which is
+    how benchmark universes larger than the recorded set are built.
+    """
+
+    def __init__(self, fixtures: Fixtures, aliases: Optional[Dict[str, str]] = None):
+        self.fixtures = fixtures
+        self.aliases = aliases or {}
+
+    @classmethod
+    def from_file(cls, path: str, aliases: Optional[Dict[str, str]] = None) -> "ReplayProvider":
+        return cls(load_fixtures(path)["tickers"], aliases)
+
+    def open(self, ticker: str) -> Dict[tuple, Any]:
+        ticker = self.aliases.get(ticker.upper(), ticker.upper())
+        if ticker not in self.fixtures:
+            raise KeyError(f"No recorded fixtures for {ticker}")
+        return self.fixtures[ticker]
+
+    def fetch(self, handle: Dict[tuple, Any], field: str, *args, **kwargs) -> Any:
+        key = fixture_key(field, args, kwargs)
+        if key in handle:
+            return handle[key]
+        if field == "history":
+            return self._slice_history(handle, kwargs.get("start"), kwargs.get("end"))
+        if field == "option_chain":
+            # Any recorded expiry stands in for one that was not recorded
+            chains = [v for k, v in handle.items() if k[0] == "option_chain"]
+            if chains:
+                return chains[0]
+        raise KeyError(f"No recorded response for {field}{args or ''}")
+
+    def _slice_history(self, handle: Dict[tuple, Any], start, end):
+        import pandas as pd
+
+        recorded = [v for k, v in handle.items() if k[0] == "history" and not v.empty]
+        if not recorded:
+            raise KeyError("No recorded price history")
+        hist = max(recorded, key=len)
+        index = hist.index.tz_localize(None) if getattr(hist.index, "tz", None) else hist.index
+        mask = (index >= pd.Timestamp(start or index.min())) & (index < pd.Timestamp(end or "2262-01-01"))
+        return hist[mask]
+
+
+def save_fixtures(fixtures: Fixtures, path: str, reference_date: Optional[str] = None) -> None:
+    """Pickle recorded fixtures along with the reference date they were recorded for."""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        pickle.dump({"reference_date": reference_date, "tickers": fixtures}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_fixtures(path: str) -> dict:
+    """{"reference_date": ..., "tickers": Fixtures} as written by save_fixtures."""
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def universe_aliases(recorded: Iterable[str], size: int) -> Dict[str, str]:
+    """Synthetic tickers (e.g. AAPL_0001) cycling over the recorded ones, to build a universe of `size`."""
+    recorded = sorted(recorded)
+    return {
+        f"{ticker}_{i:04d}": ticker
+        for i, ticker in zip(range(size), itertools.cycle(recorded))
+    }
+
+
+def record_fixtures(tickers: List[str], reference_date: datetime, path: str, name: str = "Analyst") -> Dict[str, str]:
+    """
+    Run the full report flow for each ticker against Yahoo and record every response to `path`.
+    Returns per-ticker errors (tickers that failed are recorded as far as they got).
+    """
+    import tempfile
+    from src.pipeline import generate_report
+    from src.session import TickerSession
+
+    provider = RecordingProvider()
+    errors = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for ticker in tickers:
+            session = TickerSession(ticker, provider)
+            try:
+                generate_report(
+                    ticker,
+                    reference_date,
+                    save_path=os.path.join(tmp, f"{ticker}.pdf"),
+                    name=name,
+                    session=session,
+                    fetch_logo=False,
+                )
+                session.get("quarterly_balance_sheet")
+                session.get("quarterly_financials")
+                session.get("quarterly_cashflow")
+            except Exception as e:
+                errors[ticker] = f"{type(e).__name__}: {e}"
+    provider.save(path, reference_date.strftime("%Y-%m-%d"))
+    return errors
@@ -0,0 +1,55 @@
+# src/import_profile.py
+
+import os
+import subprocess
+import sys
+from typing import List, Tuple
+
+# Cumulative import time allowed for the CLI entry point, in milliseconds
+DEFAULT_IMPORT_BUDGET_MS = 150
+
+# Dependencies that must only be loaded by the section that needs them
+HEAVY_MODULES = ("yfinance", "pandas", "numpy", "matplotlib", "fpdf", "requests", "pyarrow")
+
+
+def measure_imports(module: str = "main") -> List[Tuple[str, int, int]]:
+    """
+    Import a module in a fresh interpreter with `-X importtime`.
+    Returns (name, self_us, cumulative_us) for every module it loaded.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=root,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings.append((name.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+
+def profile_imports(module: str = "main", budget_ms: float = DEFAULT_IMPORT_BUDGET_MS, top: int = 15) -> bool:
+    """Print the slowest imports of a module and check them against the budget. Returns True if within it."""
+    timings = measure_imports(module)
+    total_us = next((cumulative for name, _, cumulative in timings if name == module), 0)
+    heavy = sorted({name.split(".")[0] for name, _, _ in timings if name.split(".")[0] in HEAVY_MODULES})
+
+    print(f"Slowest imports for '{module}' (cumulative):")
+    for name, _, cumulative in sorted(timings, key=lambda t: t[2], reverse=True)[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name.strip()}")
+    print(f"Total: {total_us / 1000:.1f} ms (budget {budget_ms:.0f} ms)")
+
+    ok = total_us / 1000 <= budget_ms
+    if heavy:
+        print(f"Heavy dependencies imported eagerly: {', '.join(heavy)}")
+        ok = False
+    print("OK" if ok else "Import budget exceeded")
+    return ok
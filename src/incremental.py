@@ -0,0 +1,146 @@
+# src/incremental.py
+
+import hashlib
+import json
+import os
+import threading
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.orchestrator import is_unavailable
+from src.tracing import count
+
+DEFAULT_CHART_PATH = os.path.join("cache", "charts")
+
+# Bump when the PDF layout changes so existing reports are rebuilt even if their inputs did not
+RENDER_VERSION = 3
+
+# Bump when a chart's look changes so cached PNGs are not reused
+CHART_VERSION = 2
+
+
+def _feed(h, value: Any) -> None:
+    """Feed a canonical, type-tagged encoding of `value` into a hash object."""
+    if value is None:
+        h.update(b"N;")
+    elif is_unavailable(value):
+        h.update(b"U" + value.reason.encode() + b";")
+    elif isinstance(value, (bytes, bytearray)):
+        h.update(b"B%d:" % len(value))
+        h.update(value)
+    elif isinstance(value, str):
+        encoded = value.encode()
+        h.update(b"S%d:" % len(encoded) + encoded)
+    elif isinstance(value, np.ndarray) and value.dtype != object:
+        h.update(f"A{value.dtype.str}{value.shape}:".encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, np.generic):
+        _feed(h, value.item())
+    elif isinstance(value, (bool, int, float)):
+        h.update(b"F" + repr(value).encode() + b";")
+    elif isinstance(value, (pd.Timestamp, datetime, date)):
+        h.update(b"T" + value.isoformat().encode() + b";")
+    elif isinstance(value, (pd.DataFrame, pd.Series)):
+        h.update(b"D")
+        _feed(h, [str(c) for c in value.columns] if isinstance(value, pd.DataFrame) else str(value.name))
+        _feed(h, [str(i) for i in value.index])
+        try:
+            h.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+        except TypeError:  # Unhashable cells (lists, dicts): fall back to their text form
+            h.update(value.to_csv().encode())
+    elif isinstance(value, dict):
+        h.update(b"M%d:" % len(value))
+        for key in sorted(value, key=str):
+            _feed(h, str(key))
+            _feed(h, value[key])
+    elif isinstance(value, (list, tuple)):
+        h.update(b"L%d:" % len(value))
+        for item in value:
+            _feed(h, item)
+    else:
+        _feed(h, repr(value))
+
+
+def content_hash(*values: Any) -> str:
+    """Stable SHA-256 of section inputs (dicts, frames, bytes, scalars), independent of dict order."""
+    h = hashlib.sha256()
+    for value in values:
+        _feed(h, value)
+    return h.hexdigest()
+
+
+def manifest_path(pdf_path: str) -> str:
+    return f"{pdf_path}.manifest.json"
+
+
+def read_manifest(pdf_path: str) -> Optional[dict]:
+    try:
+        with open(manifest_path(pdf_path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_current(pdf_path: str, hashes: Dict[str, str]) -> bool:
+    """Whether the PDF on disk was built from exactly these section inputs by this layout version."""
+    previous = read_manifest(pdf_path)
+    return (
+        previous is not None
+        and previous.get("render_version") == RENDER_VERSION
+        and previous.get("sections") == hashes
+        and os.path.exists(pdf_path)
+    )
+
+
+def write_manifest(pdf_path: str, hashes: Dict[str, str], rebuilt: bool) -> dict:
+    """Record the section hashes next to the PDF, with the sections whose inputs changed."""
+    previous = read_manifest(pdf_path) or {}
+    old = previous.get("sections", {}) if previous.get("render_version") == RENDER_VERSION else {}
+    manifest = {
+        "render_version": RENDER_VERSION,
+        "checked": datetime.now().isoformat(timespec="seconds"),
+        "built": datetime.now().isoformat(timespec="seconds") if rebuilt else previous.get("built"),
+        "rebuilt": rebuilt,
+        "regenerated": sorted(name for name, digest in hashes.items() if old.get(name) != digest),
+        "removed": sorted(name for name in old if name not in hashes),
+        "sections": hashes,
+    }
+    tmp = f"{manifest_path(pdf_path)}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, manifest_path(pdf_path))
+    return manifest
+
+
+class ChartCache:
+    """
+    Rendered chart PNGs keyed by a hash of the chart kind and its input data, so a chart whose
+    data has not changed is never drawn twice (files are `<sha256>.png` under `path`).
+    """
+
+    def __init__(self, path: str = DEFAULT_CHART_PATH):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def get_or_render(self, kind: str, data: Any, render: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+        key = content_hash(CHART_VERSION, kind, data)
+        path = os.path.join(self.path, f"{key}.png")
+        try:
+            with open(path, "rb") as f:
+                png = f.read()
+            count("report_cache_requests_total", cache="charts", result="hit")
+            return png
+        except OSError:
+            pass
+
+        count("report_cache_requests_total", cache="charts", result="miss")
+        png = render()
+        if png is not None:
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(png)
+            os.replace(tmp, path)
+        return png
@@ -0,0 +1,306 @@
+# src/options_analytics.py
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.session import TickerSession, get_session
+from src.tracing import traced
+
+# Flat continuously compounded rate used for pricing; close enough for IV and Greeks in a report
+DEFAULT_RISK_FREE_RATE = 0.04
+
+# Options are treated as expiring at the 16:00 close of their expiry date
+EXPIRY_HOUR = 16
+
+# Chain columns quoted upstream; a contract's price, years, IV and Greeks are derived from these
+QUOTE_COLUMNS = ("contractSymbol", "expiry", "type", "strike", "bid", "ask", "lastPrice", "openInterest", "volume")
+
+# Volatility search bracket for the implied vol solver
+MIN_VOL, MAX_VOL = 1e-4, 5.0
+
+# Abramowitz & Stegun 7.1.26 coefficients (|error| < 1.5e-7 on erf)
+_AS_P = 0.3275911
+_AS_A = (0.254829592, -0.284496736, 1.421413741, -1.453152027, 1.061405429)
+
+
+def norm_cdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal CDF via the A&S erf approximation, vectorized (no scipy needed)."""
+    x = np.asarray(x, dtype=float)
+    z = np.abs(x) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + _AS_P * z)
+    a1, a2, a3, a4, a5 = _AS_A
+    erf = 1.0 - ((((a5 * t + a4) * t + a3) * t + a2) * t + a1) * t * np.exp(-z * z)
+    return 0.5 * (1.0 + np.sign(x) * erf)
+
+
+def norm_pdf(x: np.ndarray) -> np.ndarray:
+    return np.exp(-0.5 * np.square(x)) / np.sqrt(2.0 * np.pi)
+
+
+def _d1_d2(spot, strike, years, rate, vol, dividend_yield):
+    vol_sqrt_t = vol * np.sqrt(years)
+    d1 = (np.log(spot / strike) + (rate - dividend_yield + 0.5 * vol * vol) * years) / vol_sqrt_t
+    return d1, d1 - vol_sqrt_t
+
+
+def bs_price(spot, strike, years, rate, vol, is_call, dividend_yield=0.0) -> np.ndarray:
+    """Black-Scholes-Merton prices for arrays of European calls (is_call=True) and puts."""
+    d1, d2 = _d1_d2(spot, strike, years, rate, vol, dividend_yield)
+    spot_pv = spot * np.exp(-dividend_yield * years)
+    strike_pv = strike * np.exp(-rate * years)
+    call = spot_pv * norm_cdf(d1) - strike_pv * norm_cdf(d2)
+    put = strike_pv * norm_cdf(-d2) - spot_pv * norm_cdf(-d1)
+    return np.where(is_call, call, put)
+
+
+def implied_vol(
+    price,
+    spot,
+    strike,
+    years,
+    is_call,
+    rate: float = DEFAULT_RISK_FREE_RATE,
+    dividend_yield: float = 0.0,
+    tol: float = 1e-6,
+    max_iter: int = 50
+) -> np.ndarray:
+    """
+    Implied volatility for a whole chain at once: Newton steps on vega, kept inside a
+    shrinking [low, high] bracket and replaced by bisection whenever a step would leave it.
+    Prices outside the no-arbitrage bounds, or that do not converge, come back as NaN.
+    """
+    price, spot, strike, years, is_call = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (price, spot, strike, years)), np.asarray(is_call, dtype=bool)
+    )
+    spot_pv = spot * np.exp(-dividend_yield * years)
+    strike_pv = strike * np.exp(-rate * years)
+    lower = np.where(is_call, np.maximum(spot_pv - strike_pv, 0), np.maximum(strike_pv - spot_pv, 0))
+    upper = np.where(is_call, spot_pv, strike_pv)
+    valid = np.isfinite(price) & (years > 0) & (price > lower) & (price < upper) & (strike > 0)
+
+    vol = np.full(price.shape, 0.3)
+    low = np.full(price.shape, MIN_VOL)
+    high = np.full(price.shape, MAX_VOL)
+    done = ~valid
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for _ in range(max_iter):
+            d1, _d2 = _d1_d2(spot, strike, years, rate, vol, dividend_yield)
+            diff = bs_price(spot, strike, years, rate, vol, is_call, dividend_yield) - price
+            done |= np.abs(diff) < tol
+            if done.all():
+                break
+            # Prices rise with volatility, so the sign of the error moves one side of the bracket
+            high = np.where(diff > 0, vol, high)
+            low = np.where(diff < 0, vol, low)
+            vega = spot_pv * norm_pdf(d1) * np.sqrt(years)
+            step = vol - diff / vega
+            bisect = ~np.isfinite(step) | (step <= low) | (step >= high)
+            vol = np.where(done, vol, np.where(bisect, 0.5 * (low + high), step))
+    return np.where(valid & done, vol, np.nan)
+
+
+def greeks(
+    spot,
+    strike,
+    years,
+    vol,
+    is_call,
+    rate: float = DEFAULT_RISK_FREE_RATE,
+    dividend_yield: float = 0.0
+) -> Dict[str, np.ndarray]:
+    """Delta, gamma, vega (per vol point), theta (per calendar day) and rho (per rate point)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1, d2 = _d1_d2(spot, strike, years, rate, vol, dividend_yield)
+        carry = np.exp(-dividend_yield * years)
+        discount = np.exp(-rate * years)
+        sqrt_t = np.sqrt(years)
+        pdf = norm_pdf(d1)
+        n_d1, n_d2 = norm_cdf(d1), norm_cdf(d2)
+
+        decay = -spot * carry * pdf * vol / (2 * sqrt_t)
+        theta_call = decay - rate * strike * discount * n_d2 + dividend_yield * spot * carry * n_d1
+        theta_put = decay + rate * strike * discount * (1 - n_d2) - dividend_yield * spot * carry * (1 - n_d1)
+        return {
+            "delta": np.where(is_call, carry * n_d1, carry * (n_d1 - 1)),
+            "gamma": carry * pdf / (spot * vol * sqrt_t),
+            "vega": spot * carry * pdf * sqrt_t / 100,
+            "theta": np.where(is_call, theta_call, theta_put) / 365,
+            "rho": np.where(is_call, strike * years * discount * n_d2, -strike * years * discount * (1 - n_d2)) / 100,
+        }
+
+
+def fetch_chains(session: TickerSession, expiries: Iterable[str], workers: int = 8) -> Dict[str, object]:
+    """Option chains for many expiries, fetched concurrently through the shared session."""
+    expiries = list(expiries)
+    if not expiries:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(workers, len(expiries))) as pool:
+        chains = pool.map(lambda expiry: session.get("option_chain", expiry), expiries)
+        return dict(zip(expiries, chains))
+
+
+def chain_frame(chains: Dict[str, object], valuation_time: datetime) -> pd.DataFrame:
+    """Every contract of every expiry in one frame, with a mid price and the years to expiry."""
+    frames = []
+    for expiry, chain in chains.items():
+        for kind, df in (("call", chain.calls), ("put", chain.puts)):
+            if df is None or df.empty:
+                continue
+            frames.append(df.assign(expiry=expiry, type=kind))
+    if not frames:
+        return pd.DataFrame()
+
+    contracts = pd.concat(frames, ignore_index=True)
+    for column in ("bid", "ask", "lastPrice", "openInterest", "volume"):
+        contracts[column] = pd.to_numeric(contracts.get(column), errors="coerce")
+    quoted = (contracts["bid"] > 0) & (contracts["ask"] >= contracts["bid"])
+    contracts["price"] = np.where(quoted, (contracts["bid"] + contracts["ask"]) / 2, contracts["lastPrice"])
+
+    expiry_time = pd.to_datetime(contracts["expiry"]) + pd.Timedelta(hours=EXPIRY_HOUR)
+    contracts["years"] = (expiry_time - pd.Timestamp(valuation_time)).dt.total_seconds() / (365 * 24 * 3600)
+    return contracts
+
+
+@traced()
+def analyze_chain(
+    contracts: pd.DataFrame,
+    spot: float,
+    rate: float = DEFAULT_RISK_FREE_RATE,
+    dividend_yield: float = 0.0
+) -> pd.DataFrame:
+    """Add implied volatility and Greeks columns to a chain_frame, computed for all contracts at once."""
+    if contracts.empty:
+        return contracts
+    strike = contracts["strike"].to_numpy(dtype=float)
+    years = contracts["years"].to_numpy(dtype=float)
+    is_call = (contracts["type"] == "call").to_numpy()
+
+    vol = implied_vol(contracts["price"].to_numpy(dtype=float), spot, strike, years, is_call, rate, dividend_yield)
+    result = contracts.assign(iv=vol)
+    for name, values in greeks(spot, strike, years, vol, is_call, rate, dividend_yield).items():
+        result[name] = values
+    return result
+
+
+def max_pain(contracts: pd.DataFrame) -> float:
+    """Settlement strike at which option holders' total payout (by open interest) is smallest."""
+    strikes = np.unique(contracts["strike"].to_numpy(dtype=float))
+    if len(strikes) == 0:
+        return np.nan
+    strike = contracts["strike"].to_numpy(dtype=float)
+    oi = contracts["openInterest"].fillna(0).to_numpy(dtype=float)
+    is_call = (contracts["type"] == "call").to_numpy()
+
+    # settlements x contracts payoff matrix
+    settle = strikes[:, None]
+    payoff = np.where(is_call, np.maximum(settle - strike, 0), np.maximum(strike - settle, 0))
+    return float(strikes[np.argmin(payoff @ oi)])
+
+
+def _iv_at_delta(group: pd.DataFrame, target: float) -> float:
+    """IV interpolated at a delta (e.g. 0.25 for calls, -0.25 for puts) within one expiry and side."""
+    points = group.dropna(subset=["iv", "delta"]).sort_values("delta")
+    if len(points) < 2 or not points["delta"].min() <= target <= points["delta"].max():
+        return np.nan
+    return float(np.interp(target, points["delta"], points["iv"]))
+
+
+def term_structure(analyzed: pd.DataFrame, spot: float) -> pd.DataFrame:
+    """
+    Per expiry: days to expiry, at-the-money IV (mean of the call and put nearest the spot),
+    25-delta risk reversal (call IV minus put IV, the skew), put/call open interest and max pain.
+    """
+    rows = []
+    for expiry, group in analyzed.groupby("expiry", sort=True):
+        calls, puts = group[group["type"] == "call"], group[group["type"] == "put"]
+        atm = [
+            side.loc[(side["strike"] - spot).abs().idxmin(), "iv"]
+            for side in (calls, puts) if not side.empty
+        ]
+        call_oi, put_oi = calls["openInterest"].sum(), puts["openInterest"].sum()
+        rows.append({
+            "expiry": expiry,
+            "days": round(float(group["years"].iloc[0]) * 365, 1),
+            "atm_iv": float(np.nanmean(atm)) if atm and not np.isnan(atm).all() else np.nan,
+            "risk_reversal_25d": _iv_at_delta(calls, 0.25) - _iv_at_delta(puts, -0.25),
+            "put_call_oi": put_oi / call_oi if call_oi else np.nan,
+            "max_pain": max_pain(group),
+            "contracts": len(group),
+        })
+    return pd.DataFrame(rows)
+
+
+def spot_price(info: dict) -> Optional[float]:
+    for field in ("currentPrice", "regularMarketPrice", "previousClose"):
+        value = info.get(field)
+        if isinstance(value, (int, float)) and value > 0:
+            return float(value)
+    return None
+
+
+def dividend_yield_fraction(info: dict) -> float:
+    """
+    Continuous dividend yield as a fraction. `trailingAnnualDividendYield` is already one;
+    `dividendYield` is reported in percent (0.44 means 0.44%).
+    """
+    trailing = info.get("trailingAnnualDividendYield")
+    if isinstance(trailing, (int, float)) and trailing == trailing and trailing >= 0:
+        return float(trailing)
+    value = info.get("dividendYield")
+    if isinstance(value, (int, float)) and value == value and value > 0:
+        return float(value) / 100
+    return 0.0
+
+
+@traced()
+def get_options_analytics(
+    ticker: str,
+    session: Optional[TickerSession] = None,
+    max_expiries: Optional[int] = None,
+    rate: float = DEFAULT_RISK_FREE_RATE,
+    valuation_time: Optional[datetime] = None,
+    workers: int = 8
+) -> dict:
+    """
+    Options analytics across all listed expiries (or the first `max_expiries`).
+    Option data is only available as of now, so contracts are valued at `valuation_time`
+    (default: the current time) whatever the report's reference date.
+    "inputs" holds the raw quotes, spot and rates everything else is derived from, so the
+    report hashes those rather than Greeks that move with the clock.
+    """
+    session = session or get_session(ticker)
+    expiries = list(session.get("options") or [])[:max_expiries]
+    summary = {"available_expirations": expiries, "nearest_expiry": expiries[0] if expiries else "N/A"}
+    if not expiries:
+        return {**summary, "contracts": pd.DataFrame(), "term_structure": pd.DataFrame()}
+
+    info = session.get("info") or {}
+    spot = spot_price(info)
+    if spot is None:
+        raise ValueError("No current price available to value the options")
+    dividend_yield = dividend_yield_fraction(info)
+
+    contracts = chain_frame(fetch_chains(session, expiries, workers), valuation_time or datetime.now())
+    analyzed = analyze_chain(contracts, spot, rate, dividend_yield)
+    structure = term_structure(analyzed, spot) if not analyzed.empty else pd.DataFrame()
+
+    total_call_oi = analyzed.loc[analyzed["type"] == "call", "openInterest"].sum() if not analyzed.empty else 0
+    total_put_oi = analyzed.loc[analyzed["type"] == "put", "openInterest"].sum() if not analyzed.empty else 0
+    return {
+        **summary,
+        "spot": spot,
+        "contracts": analyzed,
+        "term_structure": structure,
+        "put_call_oi": total_put_oi / total_call_oi if total_call_oi else None,
+        "max_pain": structure["max_pain"].iloc[0] if not structure.empty else None,
+        "inputs": {
+            "spot": spot,
+            "rate": rate,
+            "dividend_yield": dividend_yield,
+            "quotes": contracts[[c for c in QUOTE_COLUMNS if c in contracts.columns]] if not contracts.empty else None,
+        },
+    }
@@ -0,0 +1,84 @@
+# src/orchestrator.py
+
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from typing import Any, Callable, Dict, Optional
+
+from src.tracing import count, span
+
+
+class SectionUnavailable:
+    """Placeholder for a report section that failed or missed its deadline."""
+
+    def __init__(self, reason: str):
+        self.reason = reason
+
+    def __str__(self) -> str:
+        return f"unavailable ({self.reason})"
+
+    def __repr__(self) -> str:
+        return f"SectionUnavailable({self.reason!r})"
+
+
+def is_unavailable(value: Any) -> bool:
+    return isinstance(value, SectionUnavailable)
+
+
+def _run_in_thread(func: Callable[[], Any]) -> Future:
+    # Daemon threads: a late upstream call must not keep the process alive after the PDF is written
+    future = Future()
+    # Run in a copy of the caller's context so the section's spans nest under the caller's
+    context = contextvars.copy_context()
+
+    def target():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(context.run(func))
+        except Exception as e:
+            future.set_exception(e)
+
+    threading.Thread(target=target, daemon=True).start()
+    return future
+
+
+def _traced_section(name: str, func: Callable[[], Any]) -> Callable[[], Any]:
+    def run():
+        with span(name):
+            return func()
+    return run
+
+
+def run_sections(
+    sections: Dict[str, Callable[[], Any]],
+    section_timeout: Optional[float] = 30.0,
+    deadline: Optional[float] = 60.0,
+    label: str = "section"
+) -> Dict[str, Any]:
+    """
+    Run independent report sections concurrently.
+    Each section gets `section_timeout` seconds, and the whole batch `deadline` seconds.
+    Sections that raise or run late come back as SectionUnavailable instead of blocking the report;
+    with tracing enabled each one is a `<label>.<name>` span and every such placeholder is counted.
+    """
+    start = time.monotonic()
+    futures = {name: _run_in_thread(_traced_section(f"{label}.{name}", func)) for name, func in sections.items()}
+
+    limits = [t for t in (section_timeout, deadline) if t is not None]
+    cutoff = start + min(limits) if limits else None
+
+    results = {}
+    for name, future in futures.items():
+        timeout = max(0.0, cutoff - time.monotonic()) if cutoff is not None else None
+        try:
+            results[name] = future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            results[name] = SectionUnavailable("timed out")
+        except Exception as e:
+            results[name] = SectionUnavailable(f"{type(e).__name__}: {e}")
+        if is_unavailable(results[name]):
+            count("report_swallowed_errors_total", section=f"{label}.{name}", reason=results[name].reason.split(":")[0])
+    return results
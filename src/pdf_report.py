@@ -1,80 +1,62 @@
 from fpdf import FPDF
+from fpdf.enums import XPos, YPos
 from datetime import datetime
+import io
 import os
-import requests
+import threading
+from src.incremental import content_hash, is_current, write_manifest
+from src.options_analytics import QUOTE_COLUMNS
+from src.orchestrator import is_unavailable
+from src.ratio_registry import REGISTRY
+from src.total_return import summary_rows
+from src.tracing import span, traced
 
-# Optional: Ratio explanations
+# Ratio explanations come from the ratio registry
 RATIO_EXPLANATIONS = {
-    # Liquidity
-    "Current Ratio": "Measures ability to cover short-term liabilities with current assets.",
-    "Quick Ratio": "Measures liquidity without relying on inventory.",
-    "Cash Ratio": "Measures immediate liquidity using cash and near-cash assets.",
-    "Operating Cash Flow Ratio": "Shows ability to cover short-term liabilities using operating cash flow.",
-    "Cash Conversion Cycle": "Time (in days) to convert inventory and receivables into cash, after paying suppliers.",
-
-    # Profitability
-    "Gross Profit Margin": "Shows how much of revenue is left after direct costs.",
-    "Operating Margin": "Shows operational efficiency before interest and tax.",
-    "Net Profit Margin": "Shows how much profit is generated from total revenue.",
-    "Return on Assets (ROA)": "Shows how effectively the company uses its assets.",
-    "Return on Equity (ROE)": "Indicates how well equity capital is used to generate profit.",
-    "EBIT Margin": "Shows earnings before interest and taxes as a percentage of revenue.",
-    "Return on Capital Employed (ROCE)": "Shows how efficiently capital employed is used to generate EBIT.",
-
-    # Efficiency
-    "Inventory Turnover": "Measures how many times inventory is sold per year.",
-    "Receivables Turnover": "Shows how efficiently receivables are collected.",
-    "Payables Turnover": "Shows how fast the company pays its suppliers.",
-    "Asset Turnover": "Measures how efficiently assets generate revenue.",
-    "Working Capital Turnover": "Shows how effectively working capital is used to generate sales.",
-    "Fixed Asset Turnover": "Measures how efficiently fixed assets (e.g., PPE) generate revenue.",
-
-    # Leverage
-    "Debt-to-Equity": "Shows financial leverage via debt vs equity.",
-    "Debt Ratio": "Percentage of assets financed by debt.",
-    "Interest Coverage": "Shows how easily interest expenses are paid.",
-    "Debt-to-Capital": "Debt as a share of total capital (debt + equity).",
-    "Equity Multiplier": "Indicates financial leverage via total assets relative to equity.",
-    "Capitalization Ratio (LT Debt)": "Long-term debt as a portion of total permanent capital (LT debt + equity).",
-
-    # Return & Valuation
-    "Book Value per Share": "Equity value on a per-share basis.",
-    "Free Cash Flow Margin": "Shows what portion of revenue is actual free cash.",
-    "Return on Invested Capital (ROIC)": "Shows return generated on invested funds.",
-    "Earnings Per Share (EPS - Basic)": "Net income divided by basic shares.",
-    "Earnings Per Share (EPS - Diluted)": "Net income per share including dilution.",
-    "Cash Return on Assets (CROA)": "Shows how effectively assets generate cash from operations."
-    # Note: Free Cash Flow Yield can be added here if implemented.
+    name: metric.explanation for name, metric in REGISTRY.items() if metric.explanation
 }
 
+# Rows formatted and laid out at a time by add_dataframe, so a large frame is never fully stringified
+TABLE_CHUNK_ROWS = 1000
+
+# Larger DataFrames skip cell() and are written straight into the page content
+FAST_TABLE_ROWS = 500
+
 class PDFReport(FPDF):
     def header(self):
         if self.page_no() == 1:
             return
         self.set_font("Helvetica", "B", 14)
         self.set_text_color(80, 80, 80)
-        self.cell(0, 10, "Company Financial Report", ln=True, align="C")
+        self.cell(0, 10, "Company Financial Report", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align="C")
         self.ln(5)
 
-    def add_cover_page(self, ticker: str, company_name: str, name: str, logo_url: str):
+    def add_cover_page(self, ticker: str, company_name: str, name: str, logo_url: str = None, logo: bytes = None):
         self.add_page()
         self.set_font("Helvetica", "B", 22)
         self.ln(40)
-        self.cell(0, 15, f"Financial Report for {company_name} ({ticker})", ln=True, align="C")
+        self.cell(
+            0, 15, f"Financial Report for {company_name} ({ticker})", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align="C"
+        )
 
         self.set_font("Helvetica", size=14)
         self.ln(10)
-        self.cell(0, 10, f"Author: {name}", ln=True, align="C")
-        self.cell(0, 10, f"Date: {datetime.today().strftime('%Y-%m-%d')}", ln=True, align="C")
+        self.cell(0, 10, f"Author: {name}", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align="C")
+        self.cell(
+            0, 10, f"Date: {datetime.today().strftime('%Y-%m-%d')}", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align="C"
+        )
+
+        if logo is None and logo_url:
+            try:
+                from src.assets import fetch_bytes
 
-        if logo_url:
+                logo = fetch_bytes(logo_url, content_type="image/")
+            except Exception as e:
+                print("Could not load logo:", e)
+        if logo:
             try:
-                img_path = f"{ticker}_logo.png"
-                with open(img_path, "wb") as f:
-                    f.write(requests.get(logo_url).content)
                 self.ln(20)
-                self.image(img_path, x=80, w=50)
-                os.remove(img_path)
+                self.image(io.BytesIO(logo), x=80, w=50)
             except Exception as e:
                 print("Could not load logo:", e)
 
@@ -85,7 +67,7 @@ class PDFReport(FPDF):
         self.set_font("Helvetica", "B", 12)
         self.set_text_color(30, 30, 30)
         self.set_x(self.l_margin)
-        self.cell(0, 10, title, ln=True)
+        self.cell(0, 10, title, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         self.ln(2)
 
     def add_paragraph(self, text):
@@ -94,6 +76,29 @@ class PDFReport(FPDF):
         self.multi_cell(0, 8, text)
         self.ln(2)
 
+    def string_width(self, text: str) -> float:
+        """get_string_width for the current font, cached per font and string (table cells repeat a lot)."""
+        caches = self.__dict__.setdefault("_string_widths", {})
+        cache = caches.setdefault((self.font_family, self.font_style, self.font_size_pt), {})
+        width = cache.get(text)
+        if width is None:
+            width = cache[text] = self.get_string_width(text)
+        return width
+
+    def fit_text(self, text: str, width: float) -> str:
+        """`text` clipped with "..." so it fits in `width` with the cell margins."""
+        room = width - 2 * self.c_margin
+        if self.string_width(text) <= room:
+            return text
+        lo, hi = 0, len(text)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.string_width(text[:mid] + "...") <= room:
+                lo = mid
+            else:
+                hi = mid - 1
+        return text[:lo] + "..."
+
     def add_key_values(self, data: dict, label_width=50):
         self.set_font("Helvetica", size=10)
         self.set_text_color(0, 0, 0)
@@ -102,16 +107,16 @@ class PDFReport(FPDF):
         for key, value in data.items():
             val = str(value)
             self.set_x(self.l_margin)
-            if self.get_string_width(val) > max_width - label_width:
+            if self.string_width(val) > max_width - label_width:
                 self.set_font("Helvetica", "B", 10)
-                self.cell(label_width, 8, f"{key}:", ln=True)
+                self.cell(label_width, 8, f"{key}:", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
                 self.set_font("Helvetica", "", 10)
                 self.multi_cell(0, 8, val)
             else:
                 self.set_font("Helvetica", "B", 10)
                 self.cell(label_width, 8, f"{key}:", border=0)
                 self.set_font("Helvetica", "", 10)
-                self.cell(0, 8, val, ln=True)
+                self.cell(0, 8, val, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         self.ln(4)
 
     def add_table(self, rows: list, col_widths=None):
@@ -137,9 +142,160 @@ class PDFReport(FPDF):
             self.ln()
         self.ln(4)
 
-    def add_image(self, path, w=180):
-        if os.path.exists(path):
-            self.image(path, w=w)
+    def _draw_table_header(self, header, col_widths, font_size, row_height):
+        if self.get_y() + 2 * row_height > self.h - self.b_margin:
+            self.add_page()  # Never leave a header alone at the bottom of a page
+        self.set_font("Helvetica", "B", font_size)
+        self.set_text_color(0, 0, 0)
+        self.set_fill_color(230, 230, 230)
+        self.set_draw_color(0, 0, 0)
+        x, y = self.l_margin, self.get_y()
+        self.rect(x, y, sum(col_widths), row_height, style="DF")
+        baseline = y + row_height / 2 + 0.35 * self.font_size
+        for text, width in zip(header, col_widths):
+            self.text(x + self.c_margin, baseline, self.fit_text(str(text), width))
+            x += width
+        self._draw_column_rules(col_widths, y, y + row_height)
+        self.set_y(y + row_height)
+
+    def _draw_column_rules(self, col_widths, top, bottom):
+        x = self.l_margin
+        for width in [0] + list(col_widths):
+            x += width
+            self.line(x, top, x, bottom)
+
+    def _draw_table_cells(self, header, rows, col_widths, font_size, row_height):
+        """Body rows as bordered cell()s, with the header repeated after each page break."""
+        self.set_font("Helvetica", size=font_size)
+        self.set_text_color(0, 0, 0)
+        for row in rows:
+            if self.get_y() + row_height > self.h - self.b_margin:
+                self.add_page()
+                self._draw_table_header(header, col_widths, font_size, row_height)
+                self.set_font("Helvetica", size=font_size)
+            self.set_x(self.l_margin)
+            for text, width in zip(row, col_widths):
+                self.cell(width, row_height, self.fit_text(str(text), width), border="LRB")
+            self.ln(row_height)
+
+    def _fast_tables(self) -> bool:
+        # The fast path writes page content through fpdf2 internals: only use what is there
+        font = self.current_font
+        return (
+            getattr(font, "type", None) == "core"
+            and isinstance(getattr(font, "cw", None), dict)
+            and hasattr(font, "encode_text")
+            and hasattr(self, "current_font_is_set_on_page")
+            and callable(getattr(self, "_set_font_for_page", None))
+            and callable(getattr(self, "_out", None))
+        )
+
+    def _draw_table_rows(self, header, rows, col_widths, font_size, row_height):
+        """
+        Body rows written straight into the page content: each row is one batch of text and
+        rule operators, with core-font character widths summed directly, instead of a bordered
+        cell() per value. Falls back to _draw_table_cells where fpdf2 does not expose what this needs.
+        """
+        self.set_font("Helvetica", size=font_size)
+        if not self._fast_tables():
+            return self._draw_table_cells(header, rows, col_widths, font_size, row_height)
+        self.set_fill_color(0, 0, 0)  # Text is painted with the fill colour
+        font = self.current_font
+        char_widths = font.cw
+        scale = self.font_size_pt * 0.001 / self.k
+        bottom = self.h - self.b_margin
+        k, h = self.k, self.h
+        x0 = self.l_margin
+        x1 = x0 + sum(col_widths)
+        lefts = [x0 + sum(col_widths[:i]) + self.c_margin for i in range(len(col_widths))]
+        starts = [f"BT {x * k:.2f} " for x in lefts]
+        rooms = [w - 2 * self.c_margin for w in col_widths]
+        rule = f"{x0 * k:.2f} {{y:.2f}} m {x1 * k:.2f} {{y:.2f}} l S"
+
+        def encoded(text, room):
+            if not text.isascii():
+                text = self.normalize_text(text)  # Raises like cell() for characters the font lacks
+            try:
+                width = sum(map(char_widths.__getitem__, text)) * scale
+            except KeyError:
+                width = self.string_width(text)
+            if width > room:
+                text = self.fit_text(text, room + 2 * self.c_margin)
+            return font.encode_text(text)
+
+        top = self.get_y()
+        y = top
+        for row in rows:
+            if y + row_height > bottom:
+                self._draw_column_rules(col_widths, top, y)
+                self.add_page()
+                self._draw_table_header(header, col_widths, font_size, row_height)
+                self.set_font("Helvetica", size=font_size)
+                self.set_fill_color(0, 0, 0)
+                top = y = self.get_y()
+            baseline = y + row_height / 2 + 0.35 * self.font_size
+            y += row_height
+            if not self.current_font_is_set_on_page:
+                self._out(self._set_font_for_page(font, self.font_size_pt))
+            td = f"{(h - baseline) * k:.2f} Td "
+            ops = [start + td + encoded(str(text), room) + " ET" for text, start, room in zip(row, starts, rooms)]
+            ops.append(rule.format(y=(h - y) * k))
+            self._out(" ".join(ops))
+        self._draw_column_rules(col_widths, top, y)
+        self.set_y(y)
+
+    def add_dataframe(self, df, col_widths=None, font_size=8, row_height=5, index=True, float_format="{:,.4g}"):
+        """
+        DataFrame as a table: rows are formatted and drawn TABLE_CHUNK_ROWS at a time,
+        cells are clipped to their column and the header is repeated on every page.
+        Frames of more than FAST_TABLE_ROWS rows are written straight into the page content
+        (see _draw_table_rows); smaller ones use plain cell()s.
+        Column widths default to the widest header or cell of the first chunk, scaled to the page.
+        """
+        frame = df.reset_index() if index else df
+        header = [str(c) for c in frame.columns]
+        self.set_font("Helvetica", size=font_size)
+
+        def formatted(chunk):
+            columns = []
+            for name in chunk.columns:
+                values = chunk[name]
+                if values.dtype.kind == "f":
+                    columns.append(values.map(lambda v: "" if v != v else float_format.format(v)).tolist())
+                else:
+                    columns.append(values.map(lambda v: "" if v is None or v != v else str(v)).tolist())
+            return list(zip(*columns))
+
+        first = formatted(frame.iloc[:TABLE_CHUNK_ROWS])
+        if not col_widths:
+            epw = self.w - 2 * self.l_margin
+            widths = [self.string_width(h) + 2 * self.c_margin for h in header]
+            for row in first:
+                widths = [max(w, self.string_width(t) + 2 * self.c_margin) for w, t in zip(widths, row)]
+            col_widths = [w * epw / sum(widths) for w in widths]
+
+        draw = self._draw_table_rows if len(frame) > FAST_TABLE_ROWS else self._draw_table_cells
+        self._draw_table_header(header, col_widths, font_size, row_height)
+        draw(header, first, col_widths, font_size, row_height)
+        for start in range(TABLE_CHUNK_ROWS, len(frame), TABLE_CHUNK_ROWS):
+            draw(header, formatted(frame.iloc[start:start + TABLE_CHUNK_ROWS]), col_widths, font_size, row_height)
+        self.ln(4)
+
+    def add_unavailable(self, reason=None):
+        self.set_font("Helvetica", "I", 10)
+        self.set_text_color(150, 150, 150)
+        self.set_x(self.l_margin)
+        text = f"Section unavailable ({reason})" if reason else "Section unavailable"
+        self.cell(0, 8, text, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        self.ln(2)
+
+    def add_image(self, image, w=180):
+        """Embed an image from in-memory PNG bytes or from a file path."""
+        if isinstance(image, (bytes, bytearray)):
+            self.image(io.BytesIO(image), w=w)
+            self.ln(5)
+        elif image and os.path.exists(image):
+            self.image(image, w=w)
             self.ln(5)
 
     def add_ratio_explanations(self, metrics: dict):
@@ -154,59 +310,270 @@ class PDFReport(FPDF):
                 if self.get_string_width(text) > max_width:
                     self.multi_cell(0, 6, text)
                 else:
-                    self.cell(0, 6, text, ln=True)
+                    self.cell(0, 6, text, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         self.ln(2)
 
     def save(self, path):
-        self.output(path)
+        # Written beside the target and renamed over it, so a reader of `path` (the report
+        # server serving an earlier job's PDF) never sees a half-written file
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            self.output(tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+def _fmt(value, pattern="{:.2f}"):
+    return "N/A" if value is None or value != value else pattern.format(value)
+
+
+# Metric, value, industry median, percentile (of the 190 mm usable width)
+RATIO_PEER_WIDTHS = [85, 30, 40, 35]
+
+
+def ratio_peer_rows(rows: list, peers: dict) -> list:
+    """Ratio table rows with the industry median and percentile rank next to each metric."""
+    extended = [tuple(rows[0]) + ("Industry Median", "Percentile")]
+    for metric, value in rows[1:]:
+        peer = peers.get(metric) or {}
+        percentile = peer.get("percentile")
+        extended.append((
+            metric,
+            value,
+            _fmt(peer.get("median")),
+            "N/A" if percentile is None else f"{percentile:.0f} of {peer['peers']}",
+        ))
+    return extended
+
+
+def add_options_analytics(pdf: PDFReport, options: dict, max_expiries: int = 12):
+    """Options overview plus the per-expiry term structure table (from get_options_analytics)."""
+    contracts = options.get("contracts")
+    priced = int(contracts["iv"].notna().sum()) if contracts is not None and not contracts.empty else 0
+    pdf.add_key_values({
+        "Spot": _fmt(options.get("spot")),
+        "Expirations": len(options["available_expirations"]),
+        "Contracts Priced": f"{priced} of {0 if contracts is None else len(contracts)}",
+        "Put/Call Open Interest": _fmt(options.get("put_call_oi")),
+        "Max Pain (Nearest Expiry)": _fmt(options.get("max_pain")),
+    })
+    structure = options["term_structure"]
+    if structure is None or structure.empty:
+        return
+    rows = [("Expiry", "Days", "ATM IV", "25d Risk Rev.", "Put/Call OI", "Max Pain")]
+    for row in structure.head(max_expiries).itertuples():
+        rows.append((
+            row.expiry,
+            _fmt(row.days, "{:.0f}"),
+            _fmt(row.atm_iv, "{:.1%}"),
+            _fmt(row.risk_reversal_25d, "{:+.1%}"),
+            _fmt(row.put_call_oi),
+            _fmt(row.max_pain),
+        ))
+    pdf.add_table(rows)
+
+
+def _image_input(image):
+    # Charts given as file paths are hashed by their bytes, so a redrawn file counts as changed
+    if isinstance(image, str) and os.path.exists(image):
+        with open(image, "rb") as f:
+            return f.read()
+    return image
+
+
+def _options_input(options):
+    # The raw chain, spot and rates rather than the IVs and Greeks, which move with the valuation time
+    if is_unavailable(options) or "inputs" not in options:
+        return options
+    return {key: options.get(key) for key in ("available_expirations", "nearest_expiry", "inputs")}
+
+
+def _appendix_input(table, options):
+    # A contract table's derived columns come from the options inputs, hashed in their place
+    if is_unavailable(options) or "inputs" not in options or not hasattr(table, "reset_index"):
+        return table
+    quoted = table.reset_index()
+    return quoted[[c for c in quoted.columns if c in QUOTE_COLUMNS]], _options_input(options)
 
+
+def section_hashes(
+    ticker, name, overview, ratios, charts, earnings, options, extended_data, logo=None, peers=None, returns=None,
+    appendix=None
+) -> dict:
+    """
+    Content hash of each report section's inputs, keyed "cover", "overview", "chart:<title>",
+    "ratios:<section>", "earnings", "options", "extended_data:<label>" and "appendix:<title>".
+    The cover date is left out, so an unchanged report is not rebuilt just because a day passed.
+    """
+    hashes = {
+        "cover": content_hash(ticker, name, logo),
+        "overview": content_hash(overview),
+        "earnings": content_hash(earnings),
+        "options": content_hash(_options_input(options)),
+        "peers": content_hash(peers),
+        "returns": content_hash(returns),
+    }
+    for group, key, value in (("chart", "charts", charts), ("ratios", "ratios", ratios),
+                              ("extended_data", "extended_data", extended_data),
+                              ("appendix", "appendix", appendix or {})):
+        if is_unavailable(value):
+            hashes[key] = content_hash(value)
+            continue
+        for title, item in value.items():
+            if group == "chart":
+                item = _image_input(item)
+            elif group == "appendix":
+                item = _appendix_input(item, options)
+            hashes[f"{group}:{title}"] = content_hash(item)
+    return hashes
+
+
+@traced()
 def create_pdf_report(
     ticker: str,
     overview: dict,
     ratios: dict,
-    chart_path: str,
+    chart_path,
     earnings: dict,
     options: dict,
     extended_data: dict,
     save_path="report.pdf",
     name="Analyst",
-    logo_url=None
+    logo_url=None,
+    charts=None,
+    logo=None,
+    incremental=True,
+    peers=None,
+    returns=None,
+    appendix=None
 ):
+    """
+    Build the PDF report. `chart_path` is the price chart as PNG bytes or a file path;
+    alternatively `charts` maps section titles to chart images, rendered in order.
+    `logo` is the cover logo as image bytes (e.g. from LogoCache); `logo_url` is only fetched without it.
+    With `incremental`, the hashes of every section's inputs are kept in `<save_path>.manifest.json`
+    and the PDF is left as it is when none of them changed (see section_hashes).
+    `peers` maps metrics to their industry "median" and "percentile" (see peers.rank_ratios),
+    shown as extra columns of the ratio tables. `returns` is a total-return summary
+    (see total_return.ticker_total_return), shown after the charts. `appendix` maps titles to
+    DataFrames printed in full at the end, however many rows they have (see PDFReport.add_dataframe).
+    """
+    if charts is None:
+        charts = {"Stock Price (Last 5 Years)": chart_path}
+    hashes = None
+    if incremental:
+        with span("pdf.hash"):
+            hashes = section_hashes(ticker, name, overview, ratios, charts, earnings, options, extended_data,
+                                    logo if logo is not None else logo_url, peers, returns, appendix)
+        if is_current(save_path, hashes):
+            write_manifest(save_path, hashes, rebuilt=False)
+            return save_path
+
     pdf = PDFReport()
+    if is_unavailable(overview):
+        overview_missing, overview = overview, {}
+    else:
+        overview_missing = None
     company_name = overview.get("longName") or overview.get("name") or ticker
-    pdf.add_cover_page(ticker=ticker, company_name=company_name, name=name, logo_url=logo_url)
-    pdf.add_section_title("Company Overview")
-    pdf.add_key_values(overview)
+    with span("pdf.cover"):
+        pdf.add_cover_page(ticker=ticker, company_name=company_name, name=name, logo_url=logo_url, logo=logo)
+    with span("pdf.overview"):
+        pdf.add_section_title("Company Overview")
+        if overview_missing:
+            pdf.add_unavailable(overview_missing.reason)
+        else:
+            pdf.add_key_values(overview)
 
-    pdf.add_section_title("Stock Price (Last 5 Years)")
-    pdf.add_image(chart_path)
+    with span("pdf.charts"):
+        if is_unavailable(charts):
+            pdf.add_section_title("Charts")
+            pdf.add_unavailable(charts.reason)
+            charts = {}
+        for title, image in charts.items():
+            pdf.add_section_title(title)
+            if is_unavailable(image):
+                pdf.add_unavailable(image.reason)
+            else:
+                pdf.add_image(image)
 
-    for section, metrics in ratios.items():
-        pdf.add_section_title(section)
-        rows = [("Metric", "Value")] + [(k, f"{v:.2f}" if isinstance(v, float) else v) for k, v in metrics.items()]
-        pdf.add_table(rows)
-        pdf.add_ratio_explanations(metrics)
+    if returns is not None:
+        with span("pdf.returns"):
+            pdf.add_section_title("Performance")
+            if is_unavailable(returns):
+                pdf.add_unavailable(returns.reason)
+            else:
+                pdf.add_key_values(summary_rows(returns), label_width=80)
 
-    pdf.add_section_title("Earnings Calendar")
-    pdf.add_key_values(earnings)
+    with span("pdf.ratios"):
+        if is_unavailable(ratios):
+            pdf.add_section_title("Financial Ratios")
+            pdf.add_unavailable(ratios.reason)
+            ratios = {}
+        if is_unavailable(peers):
+            pdf.add_section_title("Industry Comparison")
+            pdf.add_unavailable(peers.reason)
+            peers = None
+        for section, metrics in ratios.items():
+            pdf.add_section_title(section)
+            rows = [("Metric", "Value")] + [(k, f"{v:.2f}" if isinstance(v, float) else v) for k, v in metrics.items()]
+            if peers:
+                pdf.add_table(ratio_peer_rows(rows, peers), col_widths=RATIO_PEER_WIDTHS)
+            else:
+                pdf.add_table(rows)
+            pdf.add_ratio_explanations(metrics)
 
-    pdf.add_section_title("Options Summary")
-    pdf.add_key_values({
-        "Available Expirations": ", ".join(options['available_expirations'][:5]),
-        "Nearest Expiry": options['nearest_expiry']
-    })
+    with span("pdf.earnings"):
+        pdf.add_section_title("Earnings Calendar")
+        if is_unavailable(earnings):
+            pdf.add_unavailable(earnings.reason)
+        else:
+            pdf.add_key_values(earnings)
 
-    pdf.add_section_title("Extended Fundamentals")
-    for label, data in extended_data.items():
-        if data is None or (hasattr(data, 'empty') and data.empty):
-            continue  # Skip None or empty DataFrames
-        pdf.add_section_title(label)
-        if isinstance(data, dict):
-            pdf.add_key_values(data)
-        elif hasattr(data, 'to_dict'):
-            pdf.add_key_values(data.to_dict())
+    with span("pdf.options"):
+        pdf.add_section_title("Options Summary")
+        if is_unavailable(options):
+            pdf.add_unavailable(options.reason)
+        elif "term_structure" in options:
+            add_options_analytics(pdf, options)
         else:
-            pdf.add_paragraph(str(data))
+            pdf.add_key_values({
+                "Available Expirations": ", ".join(options['available_expirations'][:5]),
+                "Nearest Expiry": options.get('nearest_expiry', "N/A")
+            })
+
+    with span("pdf.extended_data"):
+        pdf.add_section_title("Extended Fundamentals")
+        if is_unavailable(extended_data):
+            pdf.add_unavailable(extended_data.reason)
+            extended_data = {}
+        for label, data in extended_data.items():
+            if is_unavailable(data):
+                pdf.add_section_title(label)
+                pdf.add_unavailable(data.reason)
+                continue
+            if data is None or (hasattr(data, 'empty') and data.empty):
+                continue  # Skip None or empty DataFrames
+            pdf.add_section_title(label)
+            if isinstance(data, dict):
+                pdf.add_key_values(data)
+            elif hasattr(data, 'to_dict'):
+                pdf.add_key_values(data.to_dict())
+            else:
+                pdf.add_paragraph(str(data))
+
+    if appendix:
+        with span("pdf.appendix"):
+            for title, data in appendix.items():
+                pdf.add_page()
+                pdf.add_section_title(title)
+                if is_unavailable(data):
+                    pdf.add_unavailable(data.reason)
+                else:
+                    pdf.add_dataframe(data)
 
-    pdf.save(save_path)
+    with span("pdf.output"):
+        pdf.save(save_path)
+    if hashes is not None:
+        write_manifest(save_path, hashes, rebuilt=True)
     return save_path
\ No newline at end of file
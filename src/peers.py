@@ -0,0 +1,143 @@
+# src/peers.py
+
+import os
+import pickle
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.ratio_registry import report_metrics
+from src.screener import DEFAULT_STORE_PATH, PROFILE_FILE, ScreenerStore
+
+PEER_GROUPS = ("industry", "sector")
+
+# Fewer peers than this in a group and period gives no comparison
+MIN_PEERS = 3
+
+
+def peer_file(store: ScreenerStore, by: str) -> str:
+    # Underscore prefix: Parquet dataset discovery skips it when the store is read
+    return os.path.join(store.path, f"_peers_{by}.pkl")
+
+
+def build_peer_table(store: ScreenerStore, by: str = "industry") -> DataFrame:
+    """
+    Every report ratio for every ticker in the store from one vectorized pass, grouped by the
+    ticker's `by` profile field and fiscal year. Indexed by (group, year, metric), with the
+    sorted peer values, their median and count. A ticker contributes its latest period per year.
+    """
+    if by not in PEER_GROUPS:
+        raise ValueError(f"Unknown peer grouping '{by}' (expected one of {', '.join(PEER_GROUPS)})")
+    ratios = store.compute(report_metrics())
+    groups = store.profiles().get(by, pd.Series(dtype=object))
+    if ratios.empty or groups.empty:
+        return DataFrame(columns=["values", "median", "count"])
+
+    long = ratios.rename_axis(columns="metric").stack().rename("value").reset_index()
+    long["group"] = long["ticker"].map(groups)
+    long = long[long["group"].notna() & (long["group"] != "N/A") & np.isfinite(long["value"].astype(float))]
+    long["year"] = pd.to_datetime(long["period"]).dt.year
+    long = (
+        long.sort_values("period", ascending=False)
+        .drop_duplicates(["ticker", "year", "metric"])
+        .sort_values(["group", "year", "metric", "value"])
+    )
+
+    table = long.groupby(["group", "year", "metric"], sort=True)["value"].agg(["median", "count"])
+    # Rows are already in group order, so each group's sorted values are one contiguous slice
+    values = np.split(long["value"].to_numpy(dtype=float), np.cumsum(table["count"].to_numpy())[:-1])
+    table["values"] = pd.Series(values, index=table.index, dtype=object)
+    return table
+
+
+def percentile_rank(values: np.ndarray, value: float) -> float:
+    """Share of peers below `value` (ties count half), in percent (NaN for NaN). `values` must be sorted."""
+    if np.isnan(value):
+        return float("nan")
+    below = np.searchsorted(values, value, side="left")
+    at_or_below = np.searchsorted(values, value, side="right")
+    return float((below + at_or_below) / 2 / len(values) * 100)
+
+
+class PeerStats:
+    """
+    Per-industry ratio distributions for a screener store, built once and kept next to the
+    store's data (rebuilt after the next ingest), so comparing a report against its peers is
+    a lookup rather than a fetch per peer.
+    """
+
+    def __init__(self, store: Optional[ScreenerStore] = None, by: str = "industry", min_peers: int = MIN_PEERS):
+        self.store = store or ScreenerStore()
+        self.by = by
+        self.min_peers = min_peers
+        self._table: Optional[DataFrame] = None
+        self._lock = threading.Lock()
+
+    def table(self) -> DataFrame:
+        """The peer table, from memory, the store's cached copy, or built (and cached) from the store."""
+        path = peer_file(self.store, self.by)
+        with self._lock:
+            # An ingest deletes the cached copy, so a table in memory without one is out of date
+            if self._table is not None and not os.path.exists(path):
+                self._table = None
+            if self._table is None:
+                try:
+                    with open(path, "rb") as f:
+                        self._table = pickle.load(f)
+                except (OSError, pickle.UnpicklingError, EOFError):
+                    self._table = build_peer_table(self.store, self.by)
+                    tmp = f"{path}.{os.getpid()}.tmp"
+                    with open(tmp, "wb") as f:
+                        pickle.dump(self._table, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    os.replace(tmp, path)
+            return self._table
+
+    def distributions(self, group: Optional[str], period: datetime) -> Dict[str, tuple]:
+        """{metric: (sorted peer values, median)} for a group in the fiscal year of `period`."""
+        table = self.table()
+        if not group or table.empty:
+            return {}
+        key = (group, pd.Timestamp(period).year)
+        try:
+            rows = table.loc[key]
+        except KeyError:
+            return {}
+        rows = rows[rows["count"] >= self.min_peers]
+        return {metric: (row["values"], row["median"]) for metric, row in rows.iterrows()}
+
+
+_shared: Dict[tuple, PeerStats] = {}
+_shared_lock = threading.Lock()
+
+
+def get_peer_stats(path: str = DEFAULT_STORE_PATH, by: str = "industry") -> Optional[PeerStats]:
+    """The process-wide PeerStats for a screener store, or None if no profiles were ingested into it."""
+    if not os.path.exists(os.path.join(path, PROFILE_FILE)):
+        return None
+    with _shared_lock:
+        if (path, by) not in _shared:
+            _shared[(path, by)] = PeerStats(ScreenerStore(path), by)
+        return _shared[(path, by)]
+
+
+def rank_ratios(ratios: dict, distributions: Dict[str, tuple]) -> Dict[str, dict]:
+    """
+    Industry median, percentile rank and peer count for each metric of a calculate_ratios
+    result that has a peer distribution.
+    """
+    ranks = {}
+    for metrics in ratios.values():
+        for metric, value in metrics.items():
+            if metric not in distributions:
+                continue
+            values, median = distributions[metric]
+            ranks[metric] = {
+                "median": float(median),
+                "percentile": None if value is None or np.isnan(value) else percentile_rank(values, value),
+                "peers": len(values),
+            }
+    return ranks
@@ -0,0 +1,102 @@
+# src/periods.py
+
+from datetime import timedelta
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+FREQUENCIES = ("annual", "quarterly", "ttm")
+
+# Flow statements are summed over four quarters for the TTM view; balance sheets are point in time
+FLOW_STATEMENTS = ("income_statement", "cash_flow")
+
+# Four consecutive quarter ends span roughly 9 months; anything much wider has a gap
+MAX_TTM_SPAN = timedelta(days=300)
+
+
+class PeriodResolver:
+    """
+    Point-in-time lookup of reporting columns for many reference dates at once.
+    The sorted date index is built once per statement; each resolve call is a handful of
+    vectorized searchsorted passes, whatever the number of reference dates.
+    `filing_lag` shifts every reference date back so a period only counts once it would
+    have been published, which avoids look-ahead bias in backtests.
+    """
+
+    def __init__(self, columns: Iterable, filing_lag: Optional[timedelta] = None):
+        self.columns = sorted(columns)
+        self.index = pd.DatetimeIndex(self.columns).as_unit("ns")
+        self._ns = self.index.asi8
+        self.filing_lag = pd.Timedelta(filing_lag or 0)
+
+    def resolve_positions(self, reference_dates) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        For each reference date, the position of the latest column on or before it and of the
+        column closest to one year before that one (-1 where there is none).
+        """
+        refs = pd.DatetimeIndex(pd.to_datetime(reference_dates)).as_unit("ns") - self.filing_lag
+        n = len(self._ns)
+        current = np.searchsorted(self._ns, refs.asi8, side="right") - 1
+        previous = np.full(len(refs), -1)
+        valid = current >= 0
+        if n == 0 or not valid.any():
+            return np.where(valid, current, -1), previous
+
+        latest = self.index[np.clip(current, 0, n - 1)]
+        target = (latest - pd.DateOffset(years=1)).as_unit("ns").asi8
+
+        # Candidates on either side of the target, restricted to columns strictly before `current`
+        below = np.searchsorted(self._ns, target, side="right") - 1
+        above = below + 1
+        below_ok = valid & (below >= 0) & (below < current)
+        above_ok = valid & (above < current)
+
+        distance_below = np.abs(target - self._ns[np.clip(below, 0, n - 1)])
+        distance_above = np.abs(self._ns[np.clip(above, 0, n - 1)] - target)
+        # Ties go to the more recent column, as in get_two_closest_columns
+        use_above = above_ok & (~below_ok | (distance_above <= distance_below))
+        previous = np.where(use_above, above, np.where(below_ok, below, -1))
+        return np.where(valid, current, -1), previous
+
+    def resolve(self, reference_dates) -> DataFrame:
+        """Current and previous reporting dates (NaT where missing) for each reference date."""
+        current, previous = self.resolve_positions(reference_dates)
+        return DataFrame(
+            {"current": self._dates(current), "previous": self._dates(previous)},
+            index=pd.DatetimeIndex(pd.to_datetime(reference_dates), name="reference_date"),
+        )
+
+    def _dates(self, positions: np.ndarray) -> pd.DatetimeIndex:
+        dates = np.full(len(positions), np.datetime64("NaT"), dtype="datetime64[ns]")
+        found = positions >= 0
+        dates[found] = self.index.values[positions[found]]
+        return pd.DatetimeIndex(dates)
+
+    def resolve_one(self, reference_date) -> Tuple[Optional[object], Optional[object]]:
+        """Single reference date, returning the original column labels (or None)."""
+        current, previous = self.resolve_positions([reference_date])
+        as_label = lambda position: self.columns[position] if position >= 0 else None
+        return as_label(current[0]), as_label(previous[0])
+
+
+def ttm_statement(quarterly: DataFrame) -> DataFrame:
+    """Trailing-twelve-month flows: each quarter end sums that quarter and the three before it."""
+    if quarterly.empty:
+        return quarterly
+    ordered = quarterly.apply(pd.to_numeric, errors="coerce")[sorted(quarterly.columns)]
+    summed = ordered.T.rolling(4, min_periods=4).sum().T
+
+    dates = pd.DatetimeIndex(ordered.columns)
+    span = dates - dates.to_series().shift(3).to_numpy()
+    complete = np.asarray(span <= MAX_TTM_SPAN)
+    return summed.loc[:, complete][sorted(summed.columns[complete], reverse=True)]
+
+
+def ttm_view(quarterly: dict) -> dict:
+    """Build the TTM statements from quarterly ones (balance sheets are kept as reported)."""
+    return {
+        statement: ttm_statement(df) if statement in FLOW_STATEMENTS else df
+        for statement, df in quarterly.items()
+    }
@@ -0,0 +1,170 @@
+# src/pipeline.py
+
+from datetime import datetime, timedelta
+from typing import Optional
+from src.session import TickerSession, get_session
+from src.data_loader import get_all_financials
+from src.statement_cache import StatementCache
+from src.utils import get_two_closest_columns
+from src.ratio_calculator import calculate_ratio_frame, calculate_ratios
+from src.report_builder import (
+    RATIO_HISTORY_METRICS,
+    get_company_overview,
+    get_report_charts,
+    get_dividends_and_splits,
+    get_earnings_calendar,
+    get_total_return
+)
+from src.options_analytics import get_options_analytics
+from src.extended_data import get_extended_fundamental_data
+from src.orchestrator import is_unavailable, run_sections
+from src.assets import LogoCache, website_domain
+from src.incremental import ChartCache
+from src.peers import PeerStats, rank_ratios
+from src.price_store import PriceStore
+from src.tracing import traced
+
+
+# Option contract columns printed in the report appendix, in order
+APPENDIX_CONTRACT_COLUMNS = [
+    "contractSymbol", "expiry", "type", "strike", "bid", "ask", "openInterest", "iv", "delta", "gamma", "vega", "theta"
+]
+
+
+class ReportError(Exception):
+    """Raised when a report cannot be produced for the requested ticker and date."""
+
+
+_logo_cache: Optional[LogoCache] = None
+
+
+def get_logo(info: dict, logo_cache: Optional[LogoCache] = None) -> Optional[bytes]:
+    """Company logo bytes for the overview's website, served from the shared logo cache."""
+    global _logo_cache
+    if logo_cache is None:
+        _logo_cache = _logo_cache or LogoCache()
+        logo_cache = _logo_cache
+    return logo_cache.get(website_domain(info.get("website")))
+
+
+def load_financials_at(
+    ticker: str,
+    reference_date: datetime,
+    session: TickerSession,
+    cache: Optional[StatementCache] = None,
+    frequency: str = "annual",
+    filing_lag: Optional[timedelta] = None
+) -> tuple:
+    """Financial statements plus the current and previous reporting dates for a reference date."""
+    financials = get_all_financials(ticker, session, cache=cache, frequency=frequency)
+    current_date, previous_date = get_two_closest_columns(financials["balance_sheet"], reference_date, filing_lag)
+    if not current_date or not previous_date:
+        raise ReportError("Not enough financial data around the selected date.")
+    return financials, current_date, previous_date
+
+
+@traced("report.generate_report")
+def generate_report(
+    ticker: str,
+    reference_date: datetime,
+    save_path: Optional[str] = None,
+    name: str = "Younes Sbihi",
+    session: Optional[TickerSession] = None,
+    cache: Optional[StatementCache] = None,
+    logo_cache: Optional[LogoCache] = None,
+    price_store: Optional[PriceStore] = None,
+    frequency: str = "annual",
+    filing_lag: Optional[timedelta] = None,
+    section_timeout: float = 30,
+    deadline: float = 45,
+    fetch_logo: bool = True,
+    chart_cache: Optional[ChartCache] = None,
+    incremental: bool = True,
+    peers: Optional[PeerStats] = None,
+    appendix: bool = False
+) -> str:
+    """
+    Fetch every section for a ticker at a reference date and write the PDF report.
+    `frequency` picks annual, quarterly or TTM statements for the ratios; `filing_lag` only
+    uses reporting periods that would have been published by the reference date.
+    `fetch_logo=False` leaves the logo out, for runs that must stay offline.
+    `chart_cache` reuses charts rendered from identical data; with `incremental` an existing PDF
+    whose section inputs are all unchanged is kept instead of being rebuilt.
+    With `peers`, each ratio is shown with its industry median and percentile rank.
+    `appendix` adds every priced option contract as a table at the end of the report.
+    """
+    ticker = ticker.strip().upper()
+    save_path = save_path or f"{ticker}_report.pdf"
+    session = session or get_session(ticker)
+
+    financials, current_date, previous_date = load_financials_at(
+        ticker, reference_date, session, cache, frequency, filing_lag
+    )
+
+    # Collect all sections concurrently; late or failing sections are rendered as unavailable
+    sections = run_sections({
+        "ratios": lambda: calculate_ratios(financials, current_date, previous_date, frequency=frequency),
+        "overview": lambda: get_company_overview(ticker, session),
+        "charts": lambda: get_report_charts(
+            ticker,
+            reference_date,
+            ratio_frame=calculate_ratio_frame(financials, metrics=RATIO_HISTORY_METRICS, frequency=frequency),
+            session=session,
+            price_store=price_store,
+            chart_cache=chart_cache
+        ),
+        "returns": lambda: get_total_return(ticker, reference_date, session, price_store)["summary"],
+        "divs_splits": lambda: get_dividends_and_splits(ticker, session, price_store),
+        "earnings": lambda: get_earnings_calendar(ticker, session),
+        "options": lambda: get_options_analytics(ticker, session),
+        "extended_data": lambda: get_extended_fundamental_data(ticker, session),
+        # The overview is memoized by the session, so the logo lookup reuses the same fetch
+        "logo": lambda: get_logo(get_company_overview(ticker, session), logo_cache) if fetch_logo else None,
+        "peers": lambda: peers.distributions(
+            get_company_overview(ticker, session).get("industry"), current_date
+        ) if peers is not None else None,
+    }, section_timeout=section_timeout, deadline=deadline, label="report")
+
+    info = sections["overview"]
+    divs_splits = sections["divs_splits"]
+
+    # Enhance overview with dividend and split history
+    if not is_unavailable(info) and not is_unavailable(divs_splits):
+        info["Latest Dividends"] = ", ".join([
+            f"{d.date().isoformat()}: {v}" for d, v in divs_splits['dividends'].tail().items()
+        ])
+        info["Stock Splits"] = ", ".join([
+            f"{d.date().isoformat()}: {v}" for d, v in divs_splits['splits'].tail().items()
+        ])
+
+    peer_ranks = sections["peers"]
+    if peer_ranks is not None and not is_unavailable(peer_ranks) and not is_unavailable(sections["ratios"]):
+        peer_ranks = rank_ratios(sections["ratios"], peer_ranks)
+
+    contract_appendix = None
+    options = sections["options"]
+    if appendix and not is_unavailable(options) and options.get("contracts") is not None:
+        contracts = options["contracts"]
+        columns = [c for c in APPENDIX_CONTRACT_COLUMNS if c in contracts.columns]
+        contract_appendix = {"Appendix: Option Contracts": contracts[columns].set_index(columns[0])}
+
+    # Generate the final PDF report (fpdf is only loaded once there is something to render)
+    from src.pdf_report import create_pdf_report
+
+    return create_pdf_report(
+        ticker=ticker,
+        overview=info,
+        ratios=sections["ratios"],
+        chart_path=None,
+        earnings=sections["earnings"],
+        options=sections["options"],
+        extended_data=sections["extended_data"],
+        save_path=save_path,
+        name=name,
+        charts=sections["charts"],
+        logo=None if is_unavailable(sections["logo"]) else sections["logo"],
+        incremental=incremental,
+        peers=peer_ranks,
+        returns=sections["returns"],
+        appendix=contract_appendix
+    )
@@ -0,0 +1,264 @@
+# src/price_store.py
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.session import TickerSession, get_session
+from src.tracing import count, span
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows: fall back to in-process locking only
+    fcntl = None
+
+DEFAULT_PRICE_PATH = os.path.join("cache", "prices")
+
+# How far back actions() looks for dividends and splits by default
+ACTIONS_LOOKBACK = timedelta(days=10 * 365)
+
+# No exchange is closed this long: an empty answer for a longer range is a failed fetch,
+# not a range without trading days, and is not recorded as covered
+MAX_CLOSED_DAYS = 7
+
+PRICE_DTYPE = np.dtype([
+    ("ts", "<i8"),  # trading day, ns since epoch (exchange-local date)
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("adj_close", "<f8"),
+    ("volume", "<f8"),
+    ("dividend", "<f8"),
+    ("split", "<f8"),
+])
+
+# Fields Yahoo restates after a split (prices and per-share dividends divide, volume multiplies)
+PRICE_FIELDS = ("open", "high", "low", "close", "adj_close", "dividend")
+
+FRAME_COLUMNS = {
+    "open": "Open",
+    "high": "High",
+    "low": "Low",
+    "close": "Close",
+    "adj_close": "Adj Close",
+    "volume": "Volume",
+    "dividend": "Dividends",
+    "split": "Stock Splits",
+}
+
+
+def _to_ns(value) -> int:
+    return pd.Timestamp(value).normalize().value
+
+
+def _as_date(value) -> date:
+    return pd.Timestamp(value).date()
+
+
+def _today() -> date:
+    return date.today()
+
+
+def restate(existing: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """
+    Bring stored records in line with Yahoo's adjustment as of `new`, records fetched later
+    that may carry splits and dividends the stored ones predate. Prices and dividends are
+    divided by every later split (volume multiplied), and the dividend-adjusted close is scaled
+    by (1 - dividend / previous close) for every later dividend, as Yahoo does.
+    """
+    existing = np.array(existing)
+    if not len(existing) or not len(new):
+        return existing
+    split = np.where(np.isfinite(new["split"]) & (new["split"] > 0), new["split"], 1.0)
+    ratio = float(np.prod(split))
+    if ratio != 1.0:
+        for field in PRICE_FIELDS:
+            existing[field] /= ratio
+        existing["volume"] *= ratio
+
+    closes = np.concatenate([existing["close"][-1:], new["close"][:-1]])  # Close before each new record
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factors = np.where((new["dividend"] > 0) & (closes > 0), 1 - new["dividend"] / closes, 1.0)
+    existing["adj_close"] *= float(np.prod(factors[np.isfinite(factors)]))
+    return existing
+
+
+class PriceStore:
+    """
+    Local daily price history, one binary file of PRICE_DTYPE records per ticker.
+    Each request fetches only the dates not already covered and serves windows as zero-copy
+    slices of a memory-mapped view. Dividends and splits are stored on the same records.
+    Records are adjusted like yfinance history (auto_adjust=False): prices and dividends are
+    split-adjusted and "adj_close" is also dividend-adjusted, as of the latest fill. Every fill
+    runs up to today, and when it brings a new split or dividend the stored history is
+    restated to match (see restate), so the file never mixes two adjustment bases.
+    """
+
+    def __init__(self, path: str = DEFAULT_PRICE_PATH):
+        self.path = path
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def _dir(self, ticker: str) -> str:
+        return os.path.join(self.path, ticker.upper())
+
+    def _data_path(self, ticker: str) -> str:
+        return os.path.join(self._dir(ticker), "prices.bin")
+
+    def _meta_path(self, ticker: str) -> str:
+        return os.path.join(self._dir(ticker), "meta.json")
+
+    @contextmanager
+    def _locked(self, ticker: str):
+        """Serialize writers for a ticker across threads and, where supported, processes."""
+        with self._locks_guard:
+            lock = self._locks.setdefault(ticker.upper(), threading.Lock())
+        with lock:
+            os.makedirs(self._dir(ticker), exist_ok=True)
+            with open(os.path.join(self._dir(ticker), ".lock"), "w") as handle:
+                if fcntl:
+                    fcntl.flock(handle, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl:
+                        fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def coverage(self, ticker: str) -> Optional[Tuple[date, date]]:
+        """Date range [start, end) already fetched for a ticker, if any."""
+        try:
+            with open(self._meta_path(ticker)) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return date.fromisoformat(meta["start"]), date.fromisoformat(meta["end"])
+
+    def records(self, ticker: str) -> np.ndarray:
+        """Memory-mapped view of all stored records, sorted by date."""
+        path = self._data_path(ticker)
+        try:
+            # Only whole records: a writer may be appending the next one right now
+            complete = os.path.getsize(path) // PRICE_DTYPE.itemsize
+        except OSError:
+            complete = 0
+        if complete == 0:
+            return np.empty(0, dtype=PRICE_DTYPE)
+        return np.memmap(path, dtype=PRICE_DTYPE, mode="r", shape=(complete,))
+
+    def _fetch(self, session: TickerSession, start: date, end: date) -> np.ndarray:
+        hist = session.get(
+            "history", start=start.isoformat(), end=end.isoformat(), auto_adjust=False, actions=True
+        )
+        if hist is None or hist.empty:
+            return np.empty(0, dtype=PRICE_DTYPE)
+
+        index = hist.index.tz_localize(None) if getattr(hist.index, "tz", None) else hist.index
+        records = np.zeros(len(hist), dtype=PRICE_DTYPE)
+        records["ts"] = index.normalize().as_unit("ns").asi8
+        for field, column in FRAME_COLUMNS.items():
+            if column in hist.columns:
+                records[field] = hist[column].to_numpy(dtype=float)
+            elif field == "adj_close":
+                records[field] = hist["Close"].to_numpy(dtype=float)
+        _, unique = np.unique(records["ts"], return_index=True)
+        return records[unique]
+
+    def _replace(self, ticker: str, records: np.ndarray) -> None:
+        path = self._data_path(ticker)
+        tmp = f"{path}.tmp"
+        records.tofile(tmp)
+        os.replace(tmp, path)
+
+    def _write(self, ticker: str, before: np.ndarray, after: np.ndarray, start: date, end: date) -> None:
+        existing = self.records(ticker)
+        if len(existing) and len(after):
+            after = after[after["ts"] > existing["ts"][-1]]
+        if len(existing) and len(after) and (np.any(after["split"] > 0) or np.any(after["dividend"] > 0)):
+            # New splits or dividends restate everything stored before them
+            self._replace(ticker, restate(existing, after))
+            existing = self.records(ticker)
+        if len(before):
+            # Back-filling older dates is the rare case: rewrite the file once with the new head
+            if len(existing):
+                before = before[before["ts"] < existing["ts"][0]]
+            self._replace(ticker, np.concatenate([before, np.asarray(existing)]))
+        if len(after):
+            with open(self._data_path(ticker), "ab") as f:
+                after.tofile(f)
+
+        tmp = f"{self._meta_path(ticker)}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"start": start.isoformat(), "end": end.isoformat()}, f)
+        os.replace(tmp, self._meta_path(ticker))
+
+    def ensure(self, ticker: str, start, end, session: Optional[TickerSession] = None) -> None:
+        """
+        Fetch whatever part of [start, end) is not stored yet and merge it in. A fill always
+        runs to today, because Yahoo adjusts what it returns for every split up to today.
+        """
+        start = _as_date(start)
+        today = _today()
+        # Today's bar may still change, so coverage never extends past today
+        end = min(_as_date(end), today)
+        if start >= end:
+            return
+
+        covered = self.coverage(ticker)
+        if covered and covered[0] <= start and end <= covered[1]:
+            count("report_cache_requests_total", cache="prices", result="hit")
+            return
+
+        count("report_cache_requests_total", cache="prices", result="miss")
+        session = session or get_session(ticker)
+        empty = np.empty(0, dtype=PRICE_DTYPE)
+        with span("price_store.fill", ticker=ticker), self._locked(ticker):
+            covered = self.coverage(ticker)  # Another worker may have filled it meanwhile
+            if covered is None:
+                records = self._fetch(session, start, today)
+                if len(records) or (today - start).days <= MAX_CLOSED_DAYS:
+                    self._write(ticker, empty, records, start, today)
+                return
+            if covered[0] <= start and end <= covered[1]:
+                return
+            after = self._fetch(session, covered[1], today) if today > covered[1] else empty
+            if not len(after) and (today - covered[1]).days > MAX_CLOSED_DAYS:
+                today = covered[1]
+            before = self._fetch(session, start, covered[0]) if start < covered[0] else empty
+            if not len(before) and (covered[0] - start).days > MAX_CLOSED_DAYS:
+                start = covered[0]
+            self._write(ticker, before, after, min(start, covered[0]), max(today, covered[1]))
+
+    def window(self, ticker: str, start, end, session: Optional[TickerSession] = None) -> np.ndarray:
+        """Records in [start, end) as a zero-copy slice of the memory-mapped store."""
+        self.ensure(ticker, start, end, session)
+        records = self.records(ticker)
+        lo, hi = np.searchsorted(records["ts"], [_to_ns(start), _to_ns(end)])
+        return records[lo:hi]
+
+    def history(self, ticker: str, start, end, session: Optional[TickerSession] = None) -> pd.DataFrame:
+        """Window as a DataFrame shaped like yfinance history (Open, High, Low, Close, ...)."""
+        records = self.window(ticker, start, end, session)
+        return pd.DataFrame(
+            {column: records[field] for field, column in FRAME_COLUMNS.items()},
+            index=pd.DatetimeIndex(records["ts"].astype("datetime64[ns]"), name="Date"),
+        )
+
+    def actions(self, ticker: str, start=None, end=None, session: Optional[TickerSession] = None) -> dict:
+        """Dividends and stock splits from the store, as Series indexed by date (default: the last 10 years)."""
+        today = _today()
+        records = self.window(ticker, start or today - ACTIONS_LOOKBACK, end or today + timedelta(days=1), session)
+        index = pd.DatetimeIndex(records["ts"].astype("datetime64[ns]"), name="Date")
+        dividends = pd.Series(records["dividend"], index=index, name="Dividends")
+        splits = pd.Series(records["split"], index=index, name="Stock Splits")
+        return {
+            "dividends": dividends[dividends != 0],
+            "splits": splits[splits != 0],
+        }
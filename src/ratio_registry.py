@@ -0,0 +1,330 @@
+# src/ratio_registry.py
+
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+# Prefixes used to reference statement line items as metric inputs, e.g. "bs:Total Assets"
+STATEMENTS = {
+    "bs": "balance_sheet",
+    "is": "income_statement",
+    "cf": "cash_flow",
+}
+
+
+# Inputs that are properties of the reporting period rather than line items, e.g.
+# "param:periods_per_year", with their values for annual statements
+PARAMETERS = {
+    "periods_per_year": 1.0,
+}
+
+
+def frequency_parameters(frequency: str = "annual") -> Dict[str, float]:
+    """Parameter values for statements of a frequency: single quarters are annualized, TTM already is."""
+    return {**PARAMETERS, "periods_per_year": 4.0 if frequency == "quarterly" else 1.0}
+
+
+class Metric:
+    """
+    A registered metric: its inputs (line items such as "bs:Total Assets" or other metric names),
+    a formula over the input Series, and, for report ratios, a section and explanation.
+    Metrics without a section are intermediates and are not shown in reports.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        inputs: List[str],
+        formula: Callable[..., pd.Series],
+        section: Optional[str] = None,
+        explanation: Optional[str] = None
+    ):
+        self.name = name
+        self.inputs = inputs
+        self.formula = formula
+        self.section = section
+        self.explanation = explanation
+
+    def __repr__(self) -> str:
+        return f"Metric({self.name!r}, inputs={self.inputs!r}, section={self.section!r})"
+
+
+REGISTRY: Dict[str, Metric] = {}
+
+
+def register(
+    name: str,
+    inputs: List[str],
+    formula: Callable[..., pd.Series],
+    section: Optional[str] = None,
+    explanation: Optional[str] = None
+) -> Metric:
+    """
+    Add a metric to the registry; report ratios keep their registration order.
+    Metric inputs may be registered later, they are resolved when a plan is compiled.
+    """
+    for item in inputs:
+        prefix, _, key = item.partition(":")
+        if key and prefix == "param":
+            if key not in PARAMETERS:
+                raise ValueError(f"Metric '{name}' references unknown parameter in '{item}'")
+        elif key and prefix not in STATEMENTS:
+            raise ValueError(f"Metric '{name}' references unknown statement in '{item}'")
+    metric = Metric(name, inputs, formula, section, explanation)
+    REGISTRY[name] = metric
+    compile_plan.cache_clear()
+    return metric
+
+
+# Formula helpers (all column-wise over periods ordered newest first)
+
+def divide(numerator: pd.Series, denominator: pd.Series) -> pd.Series:
+    """Column-wise safe_divide: NaN where either side is missing or the denominator is zero."""
+    return (numerator / denominator.where(denominator != 0)).round(4)
+
+def prior(series: pd.Series) -> pd.Series:
+    """
+    Value of the previous (older) period for each column; periods are ordered newest first.
+    With (ticker, period) columns the shift stays within each ticker.
+    """
+    if isinstance(series.index, pd.MultiIndex):
+        return series.groupby(level=0, sort=False).shift(-1)
+    return series.shift(-1)
+
+def mean_with_prior(series: pd.Series) -> pd.Series:
+    """Average of each period with the previous one (NaN for the oldest period)."""
+    return (series + prior(series)) / 2
+
+def nonzero(series: pd.Series) -> pd.Series:
+    """Mask of values that are present and truthy, mirroring `if x` on Optional floats."""
+    return series.notna() & (series != 0)
+
+def annualized(flow: pd.Series, periods_per_year: pd.Series) -> pd.Series:
+    """A flow over one reporting period scaled to a year (single quarters times four)."""
+    return flow * periods_per_year
+
+def days(turnover: pd.Series) -> pd.Series:
+    """Days in a year per (annual) turnover (e.g. DIO from inventory turnover)."""
+    return divide(pd.Series(365.0, index=turnover.index), turnover)
+
+
+class RatioPlan:
+    """Evaluation order for a set of requested metrics: their dependency DAG, topologically sorted."""
+
+    def __init__(self, metrics: Tuple[str, ...], order: List[str], line_items: Dict[str, List[str]]):
+        self.metrics = metrics
+        self.order = order
+        self.line_items = line_items
+
+    @property
+    def statements(self) -> List[str]:
+        """Statements that must be loaded to evaluate the plan."""
+        return list(self.line_items)
+
+
+@lru_cache(maxsize=None)
+def compile_plan(metrics: Tuple[str, ...]) -> RatioPlan:
+    """Resolve the requested metrics and everything they depend on, each exactly once."""
+    order: List[str] = []
+    line_items: Dict[str, List[str]] = {}
+    state: Dict[str, str] = {}
+
+    def visit(name: str):
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Circular metric dependency through '{name}'")
+        if name.startswith("param:"):
+            pass
+        elif ":" in name:
+            prefix, item = name.split(":", 1)
+            line_items.setdefault(STATEMENTS[prefix], []).append(item)
+        else:
+            if name not in REGISTRY:
+                raise KeyError(f"Unknown metric '{name}'")
+            state[name] = "visiting"
+            for dependency in REGISTRY[name].inputs:
+                visit(dependency)
+        state[name] = "done"
+        order.append(name)
+
+    for metric in metrics:
+        visit(metric)
+    return RatioPlan(metrics, order, line_items)
+
+
+def report_metrics(section: Optional[str] = None) -> List[str]:
+    """Names of the metrics shown in reports, optionally for one section."""
+    return [
+        m.name for m in REGISTRY.values()
+        if m.section is not None and (section is None or m.section == section)
+    ]
+
+
+def report_sections() -> Dict[str, List[str]]:
+    """Report metrics grouped by section, in registration order."""
+    sections: Dict[str, List[str]] = {}
+    for name in report_metrics():
+        sections.setdefault(REGISTRY[name].section, []).append(name)
+    return sections
+
+
+def required_statements(metrics: Iterable[str]) -> List[str]:
+    """Statements needed to compute the given metrics."""
+    return compile_plan(tuple(metrics)).statements
+
+
+def evaluate(
+    financials: dict,
+    metrics: Optional[Iterable[str]] = None,
+    periods: Optional[list] = None,
+    parameters: Optional[Dict[str, float]] = None
+) -> DataFrame:
+    """
+    Compute only the requested metrics (default: all report metrics) and the intermediates they need.
+    Returns a metric x period DataFrame with columns newest first.
+    `periods` may also be a (ticker, period) MultiIndex, already ordered newest first within each
+    ticker, to evaluate a whole universe in one pass.
+    `parameters` overrides PARAMETERS, e.g. frequency_parameters("quarterly") for quarterly statements.
+    """
+    parameters = {**PARAMETERS, **(parameters or {})}
+    plan = compile_plan(tuple(metrics) if metrics is not None else tuple(report_metrics()))
+
+    if periods is None:
+        found = set()
+        for statement in plan.statements:
+            found.update(financials.get(statement, DataFrame()).columns)
+        periods = list(found)
+    if not isinstance(periods, pd.MultiIndex):
+        periods = sorted(periods, reverse=True)
+    missing = pd.Series(np.nan, index=periods, dtype=float)
+
+    frames = {}
+    for statement, items in plan.line_items.items():
+        df = financials.get(statement, DataFrame())
+        df = df.loc[~df.index.duplicated()]
+        frames[statement] = df.reindex(index=df.index.intersection(items), columns=periods).apply(
+            pd.to_numeric, errors="coerce"
+        )
+
+    values: Dict[str, pd.Series] = {}
+    for node in plan.order:
+        if node.startswith("param:"):
+            values[node] = pd.Series(float(parameters[node[len("param:"):]]), index=periods)
+        elif ":" in node:
+            prefix, item = node.split(":", 1)
+            df = frames[STATEMENTS[prefix]]
+            values[node] = df.loc[item].astype(float) if item in df.index else missing
+        else:
+            metric = REGISTRY[node]
+            values[node] = metric.formula(*(values[i] for i in metric.inputs))
+
+    return DataFrame({name: values[name] for name in plan.metrics}, index=periods).T
+
+
+# Intermediates
+
+register("Operating Cash Flow",
+         ["cf:Operating Cash Flow", "cf:Cash Flow From Continuing Operating Activities"],
+         lambda ocf, continuing: ocf.where(nonzero(ocf), continuing))
+register("Working Capital", ["bs:Current Assets", "bs:Current Liabilities"], lambda ca, cl: ca - cl)
+register("Average Total Assets", ["bs:Total Assets"], mean_with_prior)
+register("Average Equity", ["bs:Stockholders Equity"], mean_with_prior)
+register("Average Inventory", ["bs:Inventory"], mean_with_prior)
+register("Average Receivables", ["bs:Receivables"], mean_with_prior)
+register("Average Payables", ["bs:Accounts Payable"], mean_with_prior)
+
+register("Days Inventory Outstanding", ["Inventory Turnover"], days)
+register("Days Sales Outstanding", ["Receivables Turnover"], days)
+register("Days Payables Outstanding", ["Payables Turnover"], days)
+
+# Liquidity
+register("Current Ratio", ["bs:Current Assets", "bs:Current Liabilities"], divide,
+         "Liquidity", "Measures ability to cover short-term liabilities with current assets.")
+register("Quick Ratio", ["bs:Current Assets", "bs:Inventory", "bs:Current Liabilities"],
+         lambda ca, inv, cl: divide((ca - inv).where(nonzero(ca) & nonzero(inv)), cl),
+         "Liquidity", "Measures liquidity without relying on inventory.")
+register("Cash Ratio", ["bs:Cash And Cash Equivalents", "bs:Other Short Term Investments", "bs:Current Liabilities"],
+         lambda cce, sti, cl: divide(cce.fillna(0) + sti.fillna(0), cl),
+         "Liquidity", "Measures immediate liquidity using cash and near-cash assets.")
+register("Operating Cash Flow Ratio", ["Operating Cash Flow", "bs:Current Liabilities", "param:periods_per_year"],
+         lambda ocf, cl, n: divide(annualized(ocf, n), cl),
+         "Liquidity", "Shows ability to cover short-term liabilities using operating cash flow.")
+register("Cash Conversion Cycle", ["Days Sales Outstanding", "Days Inventory Outstanding", "Days Payables Outstanding"],
+         lambda dso, dio, dpo: (dso + dio - dpo).where(nonzero(dso) & nonzero(dio) & nonzero(dpo)).round(2),
+         "Liquidity", "Time (in days) to convert inventory and receivables into cash, after paying suppliers.")
+
+# Profitability
+register("Gross Profit Margin", ["is:Gross Profit", "is:Total Revenue"], divide,
+         "Profitability", "Shows how much of revenue is left after direct costs.")
+register("Operating Margin", ["is:Operating Income", "is:Total Revenue"], divide,
+         "Profitability", "Shows operational efficiency before interest and tax.")
+register("Net Profit Margin", ["is:Net Income", "is:Total Revenue"], divide,
+         "Profitability", "Shows how much profit is generated from total revenue.")
+register("Return on Assets (ROA)", ["is:Net Income", "Average Total Assets", "param:periods_per_year"],
+         lambda income, assets, n: divide(annualized(income, n), assets),
+         "Profitability", "Shows how effectively the company uses its assets.")
+register("Return on Equity (ROE)", ["is:Net Income", "Average Equity", "param:periods_per_year"],
+         lambda income, equity, n: divide(annualized(income, n), equity),
+         "Profitability", "Indicates how well equity capital is used to generate profit.")
+register("EBIT Margin", ["is:EBIT", "is:Total Revenue"], divide,
+         "Profitability", "Shows earnings before interest and taxes as a percentage of revenue.")
+register("Return on Capital Employed (ROCE)",
+         ["is:EBIT", "bs:Total Assets", "bs:Current Liabilities", "param:periods_per_year"],
+         lambda ebit, ta, cl, n: divide(annualized(ebit, n), ta - cl),
+         "Profitability", "Shows how efficiently capital employed is used to generate EBIT.")
+
+# Efficiency
+register("Inventory Turnover", ["is:Cost Of Revenue", "Average Inventory", "param:periods_per_year"],
+         lambda cogs, inventory, n: divide(annualized(cogs, n), inventory),
+         "Efficiency", "Measures how many times inventory is sold per year.")
+register("Receivables Turnover", ["is:Total Revenue", "Average Receivables", "param:periods_per_year"],
+         lambda revenue, receivables, n: divide(annualized(revenue, n), receivables),
+         "Efficiency", "Shows how efficiently receivables are collected.")
+register("Payables Turnover", ["is:Cost Of Revenue", "Average Payables", "param:periods_per_year"],
+         lambda cogs, payables, n: divide(annualized(cogs, n), payables),
+         "Efficiency", "Shows how fast the company pays its suppliers.")
+register("Asset Turnover", ["is:Total Revenue", "Average Total Assets", "param:periods_per_year"],
+         lambda revenue, assets, n: divide(annualized(revenue, n), assets),
+         "Efficiency", "Measures how efficiently assets generate revenue.")
+register("Working Capital Turnover", ["is:Total Revenue", "Working Capital", "param:periods_per_year"],
+         lambda revenue, working_capital, n: divide(annualized(revenue, n), working_capital),
+         "Efficiency", "Shows how effectively working capital is used to generate sales.")
+register("Fixed Asset Turnover", ["is:Total Revenue", "bs:Net PPE", "param:periods_per_year"],
+         lambda revenue, ppe, n: divide(annualized(revenue, n), ppe),
+         "Efficiency", "Measures how efficiently fixed assets (e.g., PPE) generate revenue.")
+
+# Leverage
+register("Debt-to-Equity", ["bs:Total Debt", "bs:Stockholders Equity"], divide,
+         "Leverage", "Shows financial leverage via debt vs equity.")
+register("Debt Ratio", ["bs:Total Debt", "bs:Total Assets"], divide,
+         "Leverage", "Percentage of assets financed by debt.")
+register("Interest Coverage", ["is:EBIT", "is:Interest Expense"], divide,
+         "Leverage", "Shows how easily interest expenses are paid.")
+register("Debt-to-Capital", ["bs:Total Debt", "bs:Total Capitalization"], divide,
+         "Leverage", "Debt as a share of total capital (debt + equity).")
+register("Equity Multiplier", ["bs:Total Assets", "bs:Stockholders Equity"], divide,
+         "Leverage", "Indicates financial leverage via total assets relative to equity.")
+register("Capitalization Ratio (LT Debt)", ["bs:Long Term Debt", "bs:Stockholders Equity"],
+         lambda ltd, se: divide(ltd, ltd + se),
+         "Leverage", "Long-term debt as a portion of total permanent capital (LT debt + equity).")
+
+# Return & Valuation
+register("Book Value per Share", ["bs:Stockholders Equity", "bs:Ordinary Shares Number"], divide,
+         "Return & Valuation", "Equity value on a per-share basis.")
+register("Free Cash Flow Margin", ["cf:Free Cash Flow", "is:Total Revenue"], divide,
+         "Return & Valuation", "Shows what portion of revenue is actual free cash.")
+register("Return on Invested Capital (ROIC)", ["is:EBIT", "bs:Invested Capital", "param:periods_per_year"],
+         lambda ebit, capital, n: divide(annualized(ebit, n), capital),
+         "Return & Valuation", "Shows return generated on invested funds.")
+register("Earnings Per Share (EPS - Basic)", ["is:Basic EPS"], lambda eps: eps,
+         "Return & Valuation", "Net income divided by basic shares.")
+register("Earnings Per Share (EPS - Diluted)", ["is:Diluted EPS"], lambda eps: eps,
+         "Return & Valuation", "Net income per share including dilution.")
+register("Cash Return on Assets (CROA)", ["Operating Cash Flow", "Average Total Assets", "param:periods_per_year"],
+         lambda ocf, assets, n: divide(annualized(ocf, n), assets),
+         "Return & Valuation", "Shows how effectively assets generate cash from operations.")
+# Note: Free Cash Flow Yield can be added here with market cap passed externally.
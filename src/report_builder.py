@@ -1,14 +1,19 @@
 # src/report_builder.py
 
-import yfinance as yf
-import matplotlib.pyplot as plt
+import pandas as pd
 from datetime import datetime, timedelta
-import os
+from typing import Optional
+from src.session import TickerSession, get_session
+from src.price_store import PriceStore
+from src.tracing import traced
 
+RATIO_HISTORY_METRICS = ["Return on Equity (ROE)", "Return on Assets (ROA)", "Net Profit Margin"]
 
-def get_company_overview(ticker: str) -> dict:
+
+@traced()
+def get_company_overview(ticker: str, session: Optional[TickerSession] = None) -> dict:
     """Fetch basic metadata and company profile info."""
-    info = yf.Ticker(ticker).info
+    info = (session or get_session(ticker)).get("info")
     return {
         "name": info.get("longName", "N/A"),
         "summary": info.get("longBusinessSummary", "N/A"),
@@ -19,48 +24,154 @@ def get_company_overview(ticker: str) -> dict:
     }
 
 
-def plot_stock_price(ticker: str, reference_date: datetime, save_path: str = "stock_chart.png") -> str:
-    """Plot the stock price for the past 5 years and save as an image."""
+@traced()
+def get_price_history(
+    ticker: str,
+    reference_date: datetime,
+    session: Optional[TickerSession] = None,
+    price_store: Optional[PriceStore] = None
+) -> pd.DataFrame:
+    """
+    Daily price history for the 5 years up to the reference date.
+    With a price store only the dates it does not hold yet are downloaded.
+    """
     end_date = reference_date
     start_date = end_date - timedelta(days=5 * 365)
 
-    ticker_obj = yf.Ticker(ticker)
-    hist = ticker_obj.history(start=start_date.strftime("%Y-%m-%d"), end=end_date.strftime("%Y-%m-%d"))
+    if price_store is not None:
+        hist = price_store.history(ticker, start_date, end_date, session)
+    else:
+        hist = (session or get_session(ticker)).get(
+            "history", start=start_date.strftime("%Y-%m-%d"), end=end_date.strftime("%Y-%m-%d")
+        )
 
     if hist.empty:
         raise ValueError("No historical price data available for the given range.")
-
-    plt.figure(figsize=(10, 4))
-    plt.plot(hist.index, hist['Close'], label="Close Price")
-    plt.title(f"{ticker} Stock Price (Last 5 Years)")
-    plt.xlabel("Date")
-    plt.ylabel("Price (USD)")
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig(save_path)
-    plt.close()
+    return hist
+
+
+@traced()
+def plot_stock_price(
+    ticker: str,
+    reference_date: datetime,
+    save_path: Optional[str] = None,
+    session: Optional[TickerSession] = None
+):
+    """
+    Plot the stock price for the past 5 years.
+    Returns PNG bytes, or writes them to `save_path` and returns the path if one is given.
+    """
+    from src.charts import render_price_chart
+
+    png = render_price_chart(get_price_history(ticker, reference_date, session), ticker)
+    if save_path is None:
+        return png
+    with open(save_path, "wb") as f:
+        f.write(png)
     return save_path
 
 
-def get_dividends_and_splits(ticker: str) -> dict:
+@traced()
+def get_total_return(
+    ticker: str,
+    reference_date: datetime,
+    session: Optional[TickerSession] = None,
+    price_store: Optional[PriceStore] = None
+) -> dict:
+    """
+    Total return over the 5 years of price history (see total_return.ticker_total_return):
+    indices rebased to 100 under "frame" and the statistics under "summary".
+    """
+    from src.total_return import ticker_total_return
+
+    session = session or get_session(ticker)
+    hist = get_price_history(ticker, reference_date, session, price_store)
+    actions = {}
+    if "Dividends" not in hist.columns or "Stock Splits" not in hist.columns:
+        actions = get_dividends_and_splits(ticker, session, price_store)
+    return ticker_total_return(ticker, hist, actions.get("dividends"), actions.get("splits"))
+
+
+@traced()
+def get_report_charts(
+    ticker: str,
+    reference_date: datetime,
+    ratio_frame: Optional[pd.DataFrame] = None,
+    session: Optional[TickerSession] = None,
+    price_store: Optional[PriceStore] = None,
+    chart_cache=None
+) -> dict:
+    """
+    Render all charts for a report to PNG bytes, keyed by section title.
+    With a `chart_cache` (incremental.ChartCache) a chart whose input data is unchanged is not redrawn.
+    """
+    from src.charts import render_charts, render_dividends_chart, render_ratio_history_chart, render_total_return_chart
+
+    session = session or get_session(ticker)
+    start_date = pd.Timestamp(reference_date - timedelta(days=5 * 365))
+
+    def cached(kind, data, render):
+        if chart_cache is None:
+            return render()
+        return chart_cache.get_or_render(kind, (ticker, data), render)
+
+    def total_return():
+        frame = get_total_return(ticker, reference_date, session, price_store)["frame"][["Price", "Total Return"]]
+        return cached("total_return", frame, lambda: render_total_return_chart(frame, ticker))
+
+    def ratio_history():
+        if ratio_frame is None or ratio_frame.shape[1] < 2:
+            return None
+        return cached(
+            "ratio_history",
+            (ratio_frame, RATIO_HISTORY_METRICS),
+            lambda: render_ratio_history_chart(ratio_frame, ticker, RATIO_HISTORY_METRICS)
+        )
+
+    def dividends():
+        divs = get_dividends_and_splits(ticker, session, price_store)["dividends"]
+        if divs is None or divs.empty:
+            return None
+        index = divs.index.tz_localize(None) if getattr(divs.index, "tz", None) else divs.index
+        divs = divs[(index >= start_date) & (index <= pd.Timestamp(reference_date))]
+        if divs.empty:
+            return None
+        return cached("dividends", divs, lambda: render_dividends_chart(divs, ticker))
+
+    return render_charts({
+        "Total Return (Last 5 Years)": total_return,
+        "Ratio History": ratio_history,
+        "Dividends (Last 5 Years)": dividends,
+    })
+
+
+@traced()
+def get_dividends_and_splits(
+    ticker: str,
+    session: Optional[TickerSession] = None,
+    price_store: Optional[PriceStore] = None
+) -> dict:
     """Retrieve historical dividends and stock splits."""
-    ticker_obj = yf.Ticker(ticker)
+    if price_store is not None:
+        return price_store.actions(ticker, session=session)
+    session = session or get_session(ticker)
     return {
-        "dividends": ticker_obj.dividends,
-        "splits": ticker_obj.splits
+        "dividends": session.get("dividends"),
+        "splits": session.get("splits")
     }
 
 
-def get_news(ticker: str, max_items: int = 5) -> list:
+@traced()
+def get_news(ticker: str, max_items: int = 5, session: Optional[TickerSession] = None) -> list:
     """Get recent news headlines."""
-    ticker_obj = yf.Ticker(ticker)
-    return ticker_obj.news[:max_items] if ticker_obj.news else []
+    news = (session or get_session(ticker)).get("news")
+    return news[:max_items] if news else []
 
 
-def get_earnings_calendar(ticker: str) -> dict:
+@traced()
+def get_earnings_calendar(ticker: str, session: Optional[TickerSession] = None) -> dict:
     """Return earnings calendar data: next earnings date, EPS estimate, last reported EPS."""
-    ticker_obj = yf.Ticker(ticker)
-    calendar = ticker_obj.calendar
+    calendar = (session or get_session(ticker)).get("calendar")
 
     next_earnings_date = "N/A"
     eps_estimate = "N/A"
@@ -79,16 +190,17 @@ def get_earnings_calendar(ticker: str) -> dict:
     }
 
 
-def get_options_summary(ticker: str) -> dict:
+@traced()
+def get_options_summary(ticker: str, session: Optional[TickerSession] = None) -> dict:
     """Return available option expiry dates and option chain data for the nearest expiry."""
-    ticker_obj = yf.Ticker(ticker)
-    options = ticker_obj.options
+    session = session or get_session(ticker)
+    options = session.get("options")
 
     if not options:
         return {"available_expirations": [], "calls": None, "puts": None}
 
     expiry = options[0]
-    chain = ticker_obj.option_chain(expiry)
+    chain = session.get("option_chain", expiry)
 
     return {
         "available_expirations": options,
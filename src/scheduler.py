@@ -0,0 +1,259 @@
+# src/scheduler.py
+
+import heapq
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.data_loader import get_all_financials
+from src.incremental import content_hash
+from src.report_builder import get_earnings_calendar
+from src.session import TickerSession
+from src.statement_cache import StatementCache
+
+DEFAULT_STATE_PATH = os.path.join("cache", "scheduler.json")
+
+# Refetch a ticker at least this often even if no earnings date is known
+DEFAULT_TTL = timedelta(days=30)
+
+# Filings reach Yahoo a day or so after the earnings call: look again this often
+# until the new period shows up, for at most DEFAULT_MAX_WAIT after the earnings date
+DEFAULT_RETRY = timedelta(days=1)
+DEFAULT_MAX_WAIT = timedelta(days=14)
+EARNINGS_GRACE = timedelta(days=1)
+
+logger = logging.getLogger(__name__)
+
+
+def _parse(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _earnings_date(value) -> Optional[str]:
+    # get_earnings_calendar gives a date, a datetime or "N/A"
+    if isinstance(value, (date, datetime)):
+        return pd.Timestamp(value).to_pydatetime().replace(tzinfo=None).isoformat()
+    return None
+
+
+def due_time(
+    state: dict,
+    ttl: timedelta = DEFAULT_TTL,
+    retry: timedelta = DEFAULT_RETRY,
+    max_wait: timedelta = DEFAULT_MAX_WAIT
+) -> Tuple[datetime, str]:
+    """When a ticker next needs fetching, and why ("new", "retry", "earnings", "awaiting filing" or "ttl")."""
+    last = _parse(state.get("last_fetched"))
+    if last is None:
+        return datetime.min, "new"
+    if state.get("retry_after"):
+        return _parse(state["retry_after"]), "retry"
+
+    candidates = [(last + ttl, "ttl")]
+    earnings = _parse(state.get("next_earnings"))
+    if earnings is not None and earnings + EARNINGS_GRACE > last:
+        candidates.append((earnings + EARNINGS_GRACE, "earnings"))
+    awaiting = _parse(state.get("awaiting"))
+    if awaiting is not None and last < awaiting + max_wait:
+        candidates.append((last + retry, "awaiting filing"))
+    return min(candidates)
+
+
+class RefreshScheduler:
+    """
+    Refreshes a universe's statements only when they can have changed: after a ticker's earnings
+    date (retrying daily until the new period appears), when its TTL runs out, or on first sight.
+    Per-ticker state (last fetch, next earnings date, latest statement period) lives in a JSON
+    file, and tickers wait in a heap ordered by their next due time. Refreshed statements go to
+    the statement cache, and with an `output_dir` the reports of tickers whose statements
+    changed are regenerated (see batch.run_batch).
+    """
+
+    def __init__(
+        self,
+        tickers: List[str],
+        state_path: str = DEFAULT_STATE_PATH,
+        cache: Optional[StatementCache] = None,
+        ttl: timedelta = DEFAULT_TTL,
+        retry: timedelta = DEFAULT_RETRY,
+        max_wait: timedelta = DEFAULT_MAX_WAIT,
+        frequency: str = "annual",
+        workers: int = 8,
+        output_dir: Optional[str] = None,
+        **report_options
+    ):
+        self.tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+        self.state_path = state_path
+        self.cache = cache or StatementCache()
+        self.ttl = ttl
+        self.retry = retry
+        self.max_wait = max_wait
+        self.frequency = frequency
+        self.workers = workers
+        self.output_dir = output_dir
+        self.report_options = report_options
+        self.state: Dict[str, dict] = self._load()
+        self._heap: List[Tuple[datetime, str]] = []
+        for ticker in self.tickers:
+            self._push(ticker)
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self) -> None:
+        if os.path.dirname(self.state_path):
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp = f"{self.state_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.state_path)
+
+    def _due(self, ticker: str) -> Tuple[datetime, str]:
+        return due_time(self.state.get(ticker, {}), self.ttl, self.retry, self.max_wait)
+
+    def _push(self, ticker: str) -> None:
+        heapq.heappush(self._heap, (self._due(ticker)[0], ticker))
+
+    def next_due(self) -> Optional[datetime]:
+        """Due time of the first ticker in the queue (stale heap entries are dropped on the way)."""
+        while self._heap:
+            due, ticker = self._heap[0]
+            if due == self._due(ticker)[0]:
+                return due
+            heapq.heappop(self._heap)
+        return None
+
+    def refresh(self, ticker: str, now: Optional[datetime] = None) -> dict:
+        """Fetch a ticker's statements and earnings date, store them and update its state."""
+        now = now or datetime.now()
+        state = dict(self.state.get(ticker, {}))
+        try:
+            session = TickerSession(ticker)  # Fresh session: nothing memoized from earlier cycles
+            # TTM reports are built from the quarterly statements, so those are what gets cached
+            quarterly = self.frequency != "annual"
+            financials = get_all_financials(ticker, session, frequency="quarterly" if quarterly else "annual")
+            if all(df.empty for df in financials.values()):
+                raise ValueError("no statement data")
+            calendar = get_earnings_calendar(ticker, session)
+        except Exception as e:
+            state.update(last_error=f"{type(e).__name__}: {e}", retry_after=(now + self.retry).isoformat())
+            self.state[ticker] = state
+            return {"ticker": ticker, "status": "failed", "error": state["last_error"]}
+
+        for statement, df in financials.items():
+            if not df.empty:
+                self.cache.put(ticker, f"quarterly_{statement}" if quarterly else statement, df, fetched_at=now)
+
+        columns = [c for df in financials.values() for c in df.columns]
+        period = pd.Timestamp(max(columns)).date().isoformat() if columns else None
+        digest = content_hash(financials)
+        previous_earnings = _parse(state.get("next_earnings"))
+        new_period = period != state.get("last_period")
+        changed = digest != state.get("statements_hash")
+
+        # An earnings date passed since the last fetch but the new period is not out yet:
+        # keep looking for it daily, up to max_wait
+        last = _parse(state.get("last_fetched"))
+        awaiting = _parse(state.get("awaiting"))
+        if new_period:
+            awaiting = None
+        elif previous_earnings is not None and last is not None and last < previous_earnings + EARNINGS_GRACE <= now:
+            awaiting = previous_earnings
+        elif awaiting is not None and now >= awaiting + self.max_wait:
+            awaiting = None
+
+        state.update(
+            last_fetched=now.isoformat(),
+            next_earnings=_earnings_date(calendar.get("next_earnings_date")),
+            last_period=period,
+            statements_hash=digest,
+            awaiting=awaiting.isoformat() if awaiting else None,
+        )
+        state.pop("retry_after", None)
+        state.pop("last_error", None)
+        self.state[ticker] = state
+        return {"ticker": ticker, "status": "ok", "new_period": new_period, "changed": changed}
+
+    def run_cycle(self, now: Optional[datetime] = None, dry_run: bool = False) -> dict:
+        """Refresh every due ticker (or only list them with `dry_run`) and regenerate changed reports."""
+        now = now or datetime.now()
+        due = []
+        while self.next_due() is not None and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[1])
+        due = list(dict.fromkeys(due))
+        reasons = {ticker: self._due(ticker)[1] for ticker in due}
+        if dry_run:
+            for ticker in due:
+                self._push(ticker)
+            return {"due": [{"ticker": t, "reason": reasons[t]} for t in due], "universe": len(self.tickers)}
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(lambda t: self.refresh(t, now), due))
+        for ticker in due:
+            self._push(ticker)
+        self.save()
+
+        changed = [r["ticker"] for r in results if r["status"] == "ok" and r["changed"]]
+        reports = None
+        if self.output_dir and changed:
+            from src.batch import run_batch
+
+            reference_date = now.strftime("%Y-%m-%d")
+            reports = run_batch(
+                [(ticker, reference_date) for ticker in changed],
+                self.output_dir,
+                frequency=self.frequency,
+                **self.report_options
+            )["counts"]
+        return {
+            "universe": len(self.tickers),
+            "refreshed": [{**r, "reason": reasons[r["ticker"]]} for r in results],
+            "changed": changed,
+            "reports": reports,
+            "seconds": round(time.perf_counter() - start, 3),
+            "next_due": self.next_due().isoformat() if self.next_due() else None,
+        }
+
+    def run_forever(self, poll: timedelta = timedelta(hours=1)) -> None:
+        """
+        Run cycles as tickers come due, sleeping until the next one (checking at least every `poll`).
+        Each cycle's summary is logged through this module's logger.
+        """
+        while True:
+            summary = self.run_cycle()
+            logger.info(format_cycle(summary))
+            next_due = self.next_due()
+            wait = poll.total_seconds()
+            if next_due is not None:
+                wait = min(wait, max(0.0, (next_due - datetime.now()).total_seconds()))
+            time.sleep(max(wait, 1.0))
+
+
+def format_cycle(summary: dict) -> str:
+    """One-line summary of a run_cycle result (the due list for a dry run)."""
+    if "due" in summary:
+        lines = [f"{len(summary['due'])} of {summary['universe']} tickers due"]
+        lines += [f"  {entry['ticker']:<10} {entry['reason']}" for entry in summary["due"]]
+        return "\n".join(lines)
+    refreshed = summary["refreshed"]
+    failed = [r for r in refreshed if r["status"] == "failed"]
+    line = (
+        f"{datetime.now():%Y-%m-%d %H:%M} refreshed {len(refreshed)} of {summary['universe']} tickers "
+        f"in {summary['seconds']}s: {len(summary['changed'])} changed, {len(failed)} failed"
+    )
+    if summary["reports"]:
+        line += f"; reports {summary['reports']['ok']} ok, {summary['reports']['failed']} failed"
+    if summary["next_due"]:
+        line += f"; next due {summary['next_due']}"
+    return "\n".join([line] + [f"  {r['ticker']}: {r['error']}" for r in failed])
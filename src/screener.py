@@ -0,0 +1,255 @@
+# src/screener.py
+
+import glob
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.data_loader import get_all_financials
+from src.ratio_registry import REGISTRY, compile_plan, evaluate, report_metrics, required_statements
+from src.report_builder import get_company_overview
+from src.session import TickerSession
+from src.statement_cache import StatementCache
+
+DEFAULT_STORE_PATH = os.path.join("cache", "screener")
+
+COLUMNS = ["ticker", "statement", "period", "item", "value"]
+
+# Sector and industry per ticker; the leading underscore keeps it out of the Parquet dataset
+PROFILE_FILE = "_profiles.json"
+PROFILE_FIELDS = ("sector", "industry")
+
+_CLAUSE = re.compile(r"^\s*(.+?)\s*(<=|>=|==|!=|<|>)\s*(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)\s*$")
+_OPERATORS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+
+def metric_aliases() -> Dict[str, str]:
+    """
+    Lower-cased names accepted in queries: full metric names plus the short form in
+    parentheses, e.g. "ROE" for "Return on Equity (ROE)".
+    """
+    aliases = {}
+    for name in REGISTRY:
+        aliases[name.lower()] = name
+        match = re.search(r"\(([^()\s]+)\)$", name)
+        if match:
+            aliases.setdefault(match.group(1).lower(), name)
+    return aliases
+
+
+def parse_query(query: str) -> List[Tuple[str, str, float]]:
+    """Parse "ROE > 0.15 and Debt-to-Equity < 1" into (metric, operator, value) clauses."""
+    aliases = metric_aliases()
+    clauses = []
+    for part in re.split(r"\s+and\s+", query.strip(), flags=re.IGNORECASE):
+        match = _CLAUSE.match(part)
+        if not match:
+            raise ValueError(f"Cannot parse condition '{part}' (expected '<metric> <op> <number>')")
+        name, operator, value = match.groups()
+        metric = aliases.get(name.strip().lower())
+        if metric is None:
+            raise ValueError(f"Unknown metric '{name}'")
+        clauses.append((metric, operator, float(value)))
+    return clauses
+
+
+def resolve_metrics(names: Iterable[str]) -> List[str]:
+    """Registry names for metrics given in full or by their short form."""
+    aliases = metric_aliases()
+    metrics = []
+    for name in names:
+        metric = aliases.get(name.strip().lower())
+        if metric is None:
+            raise ValueError(f"Unknown metric '{name}'")
+        metrics.append(metric)
+    return metrics
+
+
+def statement_rows(ticker: str, financials: dict) -> DataFrame:
+    """Flatten one ticker's statements into long (ticker, statement, period, item, value) rows."""
+    frames = []
+    for statement, df in financials.items():
+        if df.empty:
+            continue
+        long = df.apply(pd.to_numeric, errors="coerce").stack().rename("value").reset_index()
+        long.columns = ["item", "period", "value"]
+        long["statement"] = statement
+        frames.append(long)
+    if not frames:
+        return DataFrame(columns=COLUMNS)
+    rows = pd.concat(frames, ignore_index=True)
+    rows["ticker"] = ticker.upper()
+    rows["period"] = pd.to_datetime(rows["period"])
+    # Sorted by item so Parquet row-group statistics let item filters skip most of the file
+    return rows[COLUMNS].sort_values(["item", "period"], ignore_index=True)
+
+
+class ScreenerStore:
+    """
+    Columnar store of statement line items for a universe of tickers (one Parquet file per ticker,
+    read as a single dataset), with cross-sectional ratio screening on top.
+    Computed ratio frames are kept in memory, so repeated queries only apply boolean masks.
+    Each ticker's sector and industry are kept alongside, for peer comparisons (see src.peers).
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._ratios: Dict[tuple, DataFrame] = {}
+
+    def tickers(self) -> List[str]:
+        return sorted(f[:-len(".parquet")] for f in os.listdir(self.path) if f.endswith(".parquet"))
+
+    def ingest(
+        self,
+        tickers: Iterable[str],
+        cache: Optional[StatementCache] = None,
+        workers: int = 8,
+        metrics: Optional[Iterable[str]] = None
+    ) -> Dict[str, str]:
+        """
+        Fetch statements and the sector/industry profile for each ticker and write them to the store.
+        With `metrics`, only the statements those metrics need are fetched (and stored), so later
+        queries on other metrics may find nothing to compute from.
+        Returns per-ticker errors. Cached peer statistics are dropped, as they no longer match.
+        """
+        statements = required_statements(metrics) if metrics is not None else None
+
+        def load(ticker: str) -> dict:
+            # A session of its own, released with the ticker, rather than one of the shared ones
+            session = TickerSession(ticker)
+            rows = statement_rows(ticker, get_all_financials(ticker, session, cache=cache, statements=statements))
+            if rows.empty:
+                raise ValueError("no statement data")
+            rows.to_parquet(os.path.join(self.path, f"{ticker.upper()}.parquet"), index=False, row_group_size=256)
+            overview = get_company_overview(ticker, session)
+            return {field: overview.get(field, "N/A") for field in PROFILE_FIELDS}
+
+        errors = {}
+        profiles = self._read_profiles()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {ticker: pool.submit(load, ticker) for ticker in tickers}
+            for ticker, future in futures.items():
+                try:
+                    profiles[ticker.upper()] = future.result()
+                except Exception as e:
+                    errors[ticker] = f"{type(e).__name__}: {e}"
+        with open(os.path.join(self.path, PROFILE_FILE), "w") as f:
+            json.dump(profiles, f, indent=1, sort_keys=True)
+        for path in glob.glob(os.path.join(self.path, "_peers_*.pkl")):
+            os.remove(path)
+        self._ratios.clear()
+        return errors
+
+    def _read_profiles(self) -> Dict[str, dict]:
+        try:
+            with open(os.path.join(self.path, PROFILE_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def profiles(self) -> DataFrame:
+        """Sector and industry per ticker, indexed by ticker ("N/A" where the profile had none)."""
+        profiles = self._read_profiles()
+        return DataFrame.from_dict(profiles, orient="index", columns=list(PROFILE_FIELDS)).rename_axis("ticker")
+
+    def load_statements(self, line_items: Dict[str, List[str]]) -> dict:
+        """
+        Read only the requested line items for every ticker and pivot each statement to
+        item x (ticker, period), columns ordered newest first within each ticker.
+        """
+        wanted = sorted({item for items in line_items.values() for item in items})
+        if not self.tickers() or not wanted:
+            return {}
+        rows = pd.read_parquet(self.path, columns=COLUMNS, filters=[("item", "in", wanted)])
+
+        financials = {}
+        for statement, items in line_items.items():
+            subset = rows[(rows["statement"] == statement) & rows["item"].isin(items)]
+            financials[statement] = subset.pivot_table(
+                index="item", columns=["ticker", "period"], values="value", aggfunc="first"
+            )
+        return financials
+
+    def compute(self, metrics: Optional[Iterable[str]] = None) -> DataFrame:
+        """Ratios for every ticker and period in one vectorized pass: rows (ticker, period), columns metrics."""
+        metrics = tuple(metrics) if metrics is not None else tuple(report_metrics())
+        if metrics in self._ratios:
+            return self._ratios[metrics]
+
+        plan = compile_plan(metrics)
+        financials = self.load_statements(plan.line_items)
+        keys = pd.concat([df.columns.to_frame(index=False) for df in financials.values()], ignore_index=True)
+        if keys.empty:
+            return DataFrame(columns=list(metrics))
+        keys = keys.drop_duplicates().sort_values(["ticker", "period"], ascending=[True, False])
+        columns = pd.MultiIndex.from_frame(keys)
+
+        result = evaluate(financials, metrics, periods=columns).T
+        self._ratios[metrics] = result
+        return result
+
+    def latest(self, metrics: Optional[Iterable[str]] = None, as_of: Optional[datetime] = None) -> DataFrame:
+        """Most recent period per ticker (on or before `as_of`), indexed by ticker with a `period` column."""
+        ratios = self.compute(metrics)
+        if as_of is not None:
+            ratios = ratios[ratios.index.get_level_values("period") <= pd.Timestamp(as_of)]
+        latest = ratios.groupby(level="ticker", sort=False).head(1)
+        return latest.reset_index(level="period")
+
+    def screen(
+        self,
+        query: str,
+        sort_by: Optional[str] = None,
+        ascending: bool = False,
+        limit: Optional[int] = None,
+        as_of: Optional[datetime] = None
+    ) -> DataFrame:
+        """
+        Filter the universe with a query like "ROE > 0.15 and Debt-to-Equity < 1" on each ticker's
+        latest period. Only the metrics named in the query (and `sort_by`) are computed.
+        """
+        clauses = parse_query(query)
+        metrics = list(dict.fromkeys(metric for metric, _, _ in clauses))
+        if sort_by:
+            sort_by = metric_aliases().get(sort_by.lower(), sort_by)
+            if sort_by not in metrics:
+                metrics.append(sort_by)
+
+        latest = self.latest(metrics, as_of=as_of)
+        mask = np.ones(len(latest), dtype=bool)
+        for metric, operator, value in clauses:
+            column = latest[metric].to_numpy(dtype=float)
+            mask &= _OPERATORS[operator](column, value)  # NaN compares False, so missing data never passes
+
+        result = latest[mask]
+        if sort_by:
+            result = result.sort_values(sort_by, ascending=ascending, na_position="last")
+        return result.head(limit) if limit else result
+
+
+def run_screen(
+    query: str,
+    store: ScreenerStore,
+    sort_by: Optional[str] = None,
+    limit: Optional[int] = None
+) -> Tuple[DataFrame, float]:
+    """Run a screen, returning the matches and how long it took in seconds."""
+    start = time.perf_counter()
+    result = store.screen(query, sort_by=sort_by, limit=limit)
+    return result, time.perf_counter() - start
@@ -0,0 +1,301 @@
+# src/server.py
+
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from src.periods import FREQUENCIES
+from src.session import DataProvider, TickerSession
+
+DEFAULT_SERVER_PATH = os.path.join("reports", "server")
+
+# Sessions (and the PDFs built from them) are reused for this long before data is fetched again
+DEFAULT_SESSION_TTL = timedelta(minutes=15)
+
+JOB_STATES = ("queued", "running", "done", "failed")
+
+# Tickers as Yahoo spells them (BRK-B, BF.B, ^GSPC); anything else never reaches a file path
+TICKER_PATTERN = re.compile(r"^[A-Z0-9.\-^]{1,15}$")
+
+
+class Job:
+    """One report request; identical requests share a job while it is queued, running or fresh."""
+
+    def __init__(self, key: tuple, ticker: str, reference_date: str, options: dict):
+        self.id = uuid.uuid4().hex[:16]
+        self.key = key
+        self.ticker = ticker
+        self.reference_date = reference_date
+        self.options = options
+        self.status = "queued"
+        self.path: Optional[str] = None
+        self.error: Optional[str] = None
+        self.session_generation: Optional[int] = None
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self.done = threading.Event()
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "ticker": self.ticker,
+            "reference_date": self.reference_date,
+            "options": self.options,
+            "status": self.status,
+            "error": self.error,
+            "created": datetime.fromtimestamp(self.created).isoformat(timespec="seconds"),
+            "seconds": round(self.finished - self.created, 3) if self.finished else None,
+            "pdf": f"/reports/{self.id}/pdf" if self.status == "done" else None,
+        }
+
+
+class ReportService:
+    """
+    Report generation kept warm in one process.
+    Requests go to a bounded thread pool; per-ticker sessions, the statement cache, the price
+    store and the logo cache are shared across requests. A request identical to one that is
+    queued or running joins that job, and one whose data session is still current gets the
+    PDF already built from it. Charts drawn from unchanged data come from the chart cache.
+    """
+
+    def __init__(
+        self,
+        output_dir: str = DEFAULT_SERVER_PATH,
+        workers: int = 4,
+        provider: Optional[DataProvider] = None,
+        cache=None,
+        price_store=None,
+        logo_cache=None,
+        chart_cache=None,
+        peers=None,
+        session_ttl: timedelta = DEFAULT_SESSION_TTL,
+        name: str = "Younes Sbihi",
+        fetch_logo: bool = True,
+        max_jobs: int = 1000
+    ):
+        self.output_dir = output_dir
+        self.provider = provider
+        self.cache = cache
+        self.price_store = price_store
+        self.logo_cache = logo_cache
+        self.chart_cache = chart_cache
+        self.peers = peers
+        self.session_ttl = session_ttl
+        self.name = name
+        self.fetch_logo = fetch_logo
+        self.max_jobs = max_jobs
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="report")
+        self.workers = workers
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._by_key: Dict[tuple, Job] = {}
+        self._sessions: Dict[str, Tuple[TickerSession, float, int]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _expired(self, entry: Tuple[TickerSession, float, int]) -> bool:
+        return time.time() - entry[1] > self.session_ttl.total_seconds()
+
+    def _session(self, ticker: str) -> Tuple[TickerSession, int]:
+        """The warm session for a ticker, replaced once it is older than the session TTL."""
+        with self._lock:
+            entry = self._sessions.get(ticker)
+            if entry is None or self._expired(entry):
+                # Drop every expired session, so memory follows the tickers requested recently
+                for stale in [t for t, e in self._sessions.items() if self._expired(e)]:
+                    del self._sessions[stale]
+                self._generation += 1
+                entry = (TickerSession(ticker, self.provider), time.time(), self._generation)
+                self._sessions[ticker] = entry
+            return entry[0], entry[2]
+
+    def _current_generation(self, ticker: str) -> Optional[int]:
+        entry = self._sessions.get(ticker)
+        if entry is None or self._expired(entry):
+            return None
+        return entry[2]
+
+    def submit(self, ticker: str, reference_date: str, frequency: str = "annual", filing_lag_days: int = 0) -> Job:
+        """Queue a report, or return the job that already covers the same request."""
+        ticker = ticker.strip().upper()
+        if not TICKER_PATTERN.fullmatch(ticker):
+            raise ValueError(f"Invalid ticker '{ticker}'")
+        datetime.strptime(reference_date, "%Y-%m-%d")  # Validate before queueing
+        if frequency not in FREQUENCIES:
+            raise ValueError(f"Unknown frequency '{frequency}' (expected one of {', '.join(FREQUENCIES)})")
+        options = {"frequency": frequency, "filing_lag_days": int(filing_lag_days)}
+        key = (ticker, reference_date, frequency, int(filing_lag_days))
+
+        with self._lock:
+            existing = self._by_key.get(key)
+            if existing is not None:
+                if existing.status in ("queued", "running"):
+                    return existing
+                fresh = existing.session_generation == self._current_generation(ticker)
+                if existing.status == "done" and fresh and existing.path and os.path.exists(existing.path):
+                    return existing
+            job = Job(key, ticker, reference_date, options)
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+            self._evict()
+        self.pool.submit(self._run, job)
+        return job
+
+    def _evict(self) -> None:
+        # Drop the oldest finished jobs beyond max_jobs (their PDFs stay on disk)
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            job = self._jobs[job_id]
+            if job.status in ("done", "failed"):
+                del self._jobs[job_id]
+                if self._by_key.get(job.key) is job:
+                    del self._by_key[job.key]
+
+    def _run(self, job: Job) -> None:
+        from src.pipeline import generate_report
+
+        job.status = "running"
+        try:
+            session, generation = self._session(job.ticker)
+            lag = job.options["filing_lag_days"]
+            # One file per request: a rebuild from a new session replaces it, or is skipped
+            # altogether when none of its section inputs changed (see pdf_report.section_hashes).
+            # The PDF is built in a temp file and renamed into place (PDFReport.save), so a GET
+            # for an earlier job serves the old report or the new one, never a partial write
+            path = os.path.join(self.output_dir, f"{job.ticker}_{job.reference_date}_{job.options['frequency']}_{lag}.pdf")
+            job.path = generate_report(
+                job.ticker,
+                datetime.strptime(job.reference_date, "%Y-%m-%d"),
+                save_path=path,
+                name=self.name,
+                session=session,
+                cache=self.cache,
+                logo_cache=self.logo_cache,
+                price_store=self.price_store,
+                chart_cache=self.chart_cache,
+                peers=self.peers,
+                frequency=job.options["frequency"],
+                filing_lag=timedelta(days=lag) if lag else None,
+                fetch_logo=self.fetch_logo
+            )
+            job.session_generation = generation
+            job.status = "done"
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = "failed"
+        job.finished = time.time()
+        job.done.set()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Job]:
+        job = self.get(job_id)
+        if job is not None:
+            job.done.wait(timeout)
+        return job
+
+    def stats(self) -> dict:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {
+            "workers": self.workers,
+            "sessions": len(self._sessions),
+            "jobs": {state: sum(1 for j in jobs if j.status == state) for state in JOB_STATES},
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.pool.shutdown(wait=wait)
+
+
+class ReportRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /reports {"ticker", "date", "frequency"?, "filing_lag_days"?} -> 202 (or 200 if cached) with the job
+    GET  /reports/<id>          -> job status
+    GET  /reports/<id>/pdf      -> the PDF once done (409 while pending)
+    GET  /health                -> worker and job counts
+    """
+
+    service: ReportService = None  # Set on the subclass built by make_server
+    quiet = False
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/reports":
+            return self._send_json(404, {"error": "not found"})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            ticker = body.get("ticker")
+            date = body.get("date") or body.get("reference_date")
+            if not ticker or not date:
+                return self._send_json(400, {"error": "ticker and date are required"})
+            job = self.service.submit(
+                ticker,
+                date,
+                frequency=body.get("frequency", "annual"),
+                filing_lag_days=body.get("filing_lag_days", 0)
+            )
+        except (ValueError, TypeError) as e:
+            return self._send_json(400, {"error": str(e)})
+        self._send_json(200 if job.status == "done" else 202, job.to_dict())
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/health":
+            return self._send_json(200, self.service.stats())
+        match = re.fullmatch(r"/reports/([0-9a-f]+)(/pdf)?/?", self.path)
+        job = self.service.get(match.group(1)) if match else None
+        if job is None:
+            return self._send_json(404, {"error": "unknown report"})
+        if not match.group(2):
+            return self._send_json(200, job.to_dict())
+        if job.status != "done":
+            return self._send_json(409 if job.status != "failed" else 500, job.to_dict())
+
+        with open(job.path, "rb") as f:
+            data = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Content-Disposition", f'attachment; filename="{os.path.basename(job.path)}"')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(service: ReportService, host: str = "127.0.0.1", port: int = 8000, quiet: bool = False) -> ThreadingHTTPServer:
+    """HTTP server bound to a service (port 0 picks a free port, see server.server_address)."""
+    handler = type("BoundReportRequestHandler", (ReportRequestHandler,), {"service": service, "quiet": quiet})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve(service: ReportService, host: str = "127.0.0.1", port: int = 8000) -> None:
+    server = make_server(service, host, port)
+    print(f"Serving reports on http://{host}:{server.server_address[1]} ({service.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown(wait=False)
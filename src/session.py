@@ -0,0 +1,152 @@
+# src/session.py
+
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+
+from src.tracing import count, span
+
+
+class DataProvider(ABC):
+    """Pluggable upstream backend used by TickerSession; a subclass must implement both methods."""
+
+    @abstractmethod
+    def open(self, ticker: str) -> Any:
+        """Return the upstream handle for a ticker."""
+
+    @abstractmethod
+    def fetch(self, handle: Any, field: str, *args, **kwargs) -> Any:
+        """Resolve a field (attribute or method call) on an upstream handle."""
+
+
+class YFinanceProvider(DataProvider):
+    """Default backend that reads from Yahoo Finance through yfinance."""
+
+    def open(self, ticker: str) -> Any:
+        import yfinance as yf  # Deferred: only sessions that actually go upstream pay for it
+
+        return yf.Ticker(ticker)
+
+    def fetch(self, handle: Any, field: str, *args, **kwargs) -> Any:
+        attr = getattr(handle, field)
+        return attr(*args, **kwargs) if callable(attr) else attr
+
+
+class FixtureProvider(DataProvider):
+    """
+    Offline backend serving canned data, e.g. for tests:
+    {"AAPL": {"balance_sheet": df, "history": lambda start, end: df, ...}}
+    Callable values are invoked with the call arguments, plain values are returned as-is.
+    """
+
+    def __init__(self, data: Dict[str, Dict[str, Any]]):
+        self.data = data
+
+    def open(self, ticker: str) -> Dict[str, Any]:
+        return self.data.get(ticker.upper(), {})
+
+    def fetch(self, handle: Dict[str, Any], field: str, *args, **kwargs) -> Any:
+        if field not in handle:
+            raise KeyError(f"No fixture data for '{field}'")
+        value = handle[field]
+        return value(*args, **kwargs) if callable(value) else value
+
+
+class TickerSession:
+    """
+    Shared per-ticker data session.
+    Holds one upstream handle, memoizes every result and merges duplicate
+    requests that are in flight at the same time.
+    """
+
+    def __init__(self, ticker: str, provider: Optional[DataProvider] = None):
+        self.ticker = ticker.upper()
+        self.provider = provider or _default_provider or YFinanceProvider()
+        self._handle = None
+        self.upstream_calls = 0
+        self._results: Dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def handle(self) -> Any:
+        """The upstream handle, opened on first use."""
+        with self._lock:
+            if self._handle is None:
+                self._handle = self.provider.open(self.ticker)
+            return self._handle
+
+    def get(self, field: str, *args, **kwargs) -> Any:
+        """Return a field from the upstream handle, fetching it at most once."""
+        key = (field, args, tuple(sorted(kwargs.items())))
+        with self._lock:
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._results[key] = future
+                self.upstream_calls += 1
+
+        if owner:
+            try:
+                with span(f"upstream.{field}", ticker=self.ticker) as s:
+                    value = self.provider.fetch(self.handle, field, *args, **kwargs)
+                    s.record_payload(value, field=field)
+                future.set_result(value)
+            except Exception as e:
+                # Failures are not memoized so a later call can retry
+                with self._lock:
+                    self._results.pop(key, None)
+                future.set_exception(e)
+        else:
+            count("report_session_memo_hits_total", field=field)
+        return future.result()
+
+    def clear(self) -> None:
+        """Drop all memoized results."""
+        with self._lock:
+            self._results.clear()
+
+
+# Shared sessions kept at once, least recently used dropped first: each holds everything
+# fetched for its ticker, so a long batch or ingest must not keep them all
+MAX_SESSIONS = 64
+
+_sessions: "OrderedDict[str, TickerSession]" = OrderedDict()
+_sessions_lock = threading.Lock()
+_default_provider: Optional[DataProvider] = None
+
+
+def set_default_provider(provider: Optional[DataProvider]) -> None:
+    """
+    Use `provider` for every session created without an explicit one (None restores yfinance),
+    e.g. to run a whole batch worker offline against recorded fixtures.
+    """
+    global _default_provider
+    _default_provider = provider
+    clear_sessions()
+
+
+def get_default_provider() -> Optional[DataProvider]:
+    return _default_provider
+
+
+def get_session(ticker: str, provider: Optional[DataProvider] = None) -> TickerSession:
+    """Return the shared session for a ticker, creating it on first use (at most MAX_SESSIONS are kept)."""
+    key = ticker.upper()
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None or (provider is not None and session.provider is not provider):
+            session = TickerSession(key, provider)
+            _sessions[key] = session
+        _sessions.move_to_end(key)
+        while len(_sessions) > MAX_SESSIONS:
+            _sessions.popitem(last=False)
+        return session
+
+
+def clear_sessions() -> None:
+    """Forget all shared sessions (and their cached results)."""
+    with _sessions_lock:
+        _sessions.clear()
@@ -0,0 +1,103 @@
+# src/statement_cache.py
+
+import os
+import pickle
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_CACHE_PATH = os.path.join("cache", "statements.sqlite")
+
+# Annual statements change about once a year, so a few weeks is plenty
+DEFAULT_TTL = {
+    "balance_sheet": timedelta(days=30),
+    "income_statement": timedelta(days=30),
+    "cash_flow": timedelta(days=30),
+    # Quarterly statements (also the source of the TTM view) change four times as often
+    "quarterly_balance_sheet": timedelta(days=7),
+    "quarterly_income_statement": timedelta(days=7),
+    "quarterly_cash_flow": timedelta(days=7),
+}
+
+
+class StatementCache:
+    """
+    Persistent SQLite store of statement DataFrames, keyed by ticker, statement and fetch date.
+    Every fetch date is kept, so any past snapshot can be read back with `as_of`.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: Optional[Dict[str, timedelta]] = None):
+        self.path = path
+        self.ttl = {**DEFAULT_TTL, **(ttl or {})}
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS statements (
+                    ticker TEXT NOT NULL,
+                    statement TEXT NOT NULL,
+                    fetch_date TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    data BLOB NOT NULL,
+                    PRIMARY KEY (ticker, statement, fetch_date)
+                )
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def put(self, ticker: str, statement: str, df: "pd.DataFrame", fetched_at: Optional[datetime] = None) -> None:
+        """Store a snapshot. A second fetch on the same day replaces that day's snapshot."""
+        fetched_at = fetched_at or datetime.now()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO statements VALUES (?, ?, ?, ?, ?)",
+                (
+                    ticker.upper(),
+                    statement,
+                    fetched_at.date().isoformat(),
+                    fetched_at.timestamp(),
+                    pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL),
+                ),
+            )
+
+    def get(self, ticker: str, statement: str, as_of: Optional[datetime] = None) -> Optional["pd.DataFrame"]:
+        """
+        Return a cached statement or None.
+        - Without `as_of`: the latest snapshot, if it is still within the statement's TTL
+        - With `as_of`: the latest snapshot fetched on or before that date, regardless of TTL
+        """
+        query = "SELECT fetched_at, data FROM statements WHERE ticker = ? AND statement = ?"
+        params = [ticker.upper(), statement]
+        if as_of is not None:
+            query += " AND fetch_date <= ?"
+            params.append(as_of.date().isoformat())
+        query += " ORDER BY fetch_date DESC LIMIT 1"
+
+        with closing(self._connect()) as conn:
+            row = conn.execute(query, params).fetchone()
+        if row is None:
+            return None
+
+        fetched_at, data = row
+        if as_of is None:
+            ttl = self.ttl.get(statement)
+            if ttl is not None and time.time() - fetched_at > ttl.total_seconds():
+                return None
+        return pickle.loads(data)
+
+    def snapshots(self, ticker: str, statement: str) -> list:
+        """List the fetch dates stored for a ticker's statement, newest first."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT fetch_date FROM statements WHERE ticker = ? AND statement = ? ORDER BY fetch_date DESC",
+                (ticker.upper(), statement),
+            ).fetchall()
+        return [datetime.fromisoformat(r[0]) for r in rows]
@@ -0,0 +1,246 @@
+# src/throttle.py
+
+import logging
+import os
+import random
+import re
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from src.session import DataProvider, YFinanceProvider, get_default_provider, set_default_provider
+from src.tracing import count
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows: the bucket is then only shared between threads
+    fcntl = None
+
+DEFAULT_BUCKET_PATH = os.path.join("cache", "upstream.bucket")
+
+# Sustained upstream requests per second and the burst allowed on top, shared by all workers
+DEFAULT_RATE = 2.0
+DEFAULT_BURST = 10
+
+DEFAULT_RETRIES = 4
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 60.0
+
+# Concurrent in-flight calls per endpoint and process; unlisted endpoints use "default"
+DEFAULT_CONCURRENCY = {
+    "history": 4,
+    "option_chain": 4,
+    "default": 8,
+}
+
+_STATE = struct.Struct("dd")  # tokens, last refill (epoch seconds)
+
+logger = logging.getLogger(__name__)
+
+# Substrings of errors worth retrying: throttling, server-side hiccups and dropped connections
+_TRANSIENT_MARKERS = (
+    "too many requests", "rate limit", "ratelimit", "bad gateway", "service unavailable", "gateway timeout",
+    "timed out", "timeout", "temporarily", "connection reset", "connection aborted", "remote end closed",
+)
+
+# A retryable status code in an error message, only where it reads as one ("HTTP Error 429",
+# "status code: 503", "500 Server Error"), never a bare number that may be a row count or date
+_STATUS_IN_MESSAGE = re.compile(
+    r"\b(?:http(?: error)?|status(?: code)?|error code)\s*[:=]?\s*(?:429|50[0-4])\b"
+    r"|\b(?:429|50[0-4])\s+(?:server error|too many requests|internal server error)"
+)
+_TRANSIENT_TYPES = ("Timeout", "ConnectionError", "ConnectTimeout", "ReadTimeout", "YFRateLimitError")
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether an upstream error is likely to go away on retry (rate limits, 5xx, network blips)."""
+    if any(cls.__name__ in _TRANSIENT_TYPES for cls in type(error).__mro__):
+        return True
+    status = _status_code(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    message = str(error).lower()
+    return any(marker in message for marker in _TRANSIENT_MARKERS) or bool(_STATUS_IN_MESSAGE.search(message))
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    # requests errors carry the response, urllib's HTTPError the code itself
+    for value in (getattr(getattr(error, "response", None), "status_code", None),
+                  getattr(error, "status_code", None), getattr(error, "code", None)):
+        if isinstance(value, int) and 100 <= value < 600:
+            return value
+    return None
+
+
+def backoff_delay(attempt: int, base: float = DEFAULT_BASE_DELAY, cap: float = DEFAULT_MAX_DELAY) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt))."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` tokens per second up to `capacity`.
+    With a `path`, the bucket state lives in a 16-byte file locked with flock, so every
+    process on the machine draws from the same budget; without one it is per process.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, capacity: float = DEFAULT_BURST, path: Optional[str] = None):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self.path = path
+        self._lock = threading.Lock()
+        self._state = (float(capacity), time.time())
+        if path and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if not self.path:
+                yield None
+                return
+            with open(self.path, "a+b") as handle:
+                if fcntl:
+                    fcntl.flock(handle, fcntl.LOCK_EX)
+                try:
+                    yield handle
+                finally:
+                    if fcntl:
+                        fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _read(self, handle) -> tuple:
+        if handle is None:
+            return self._state
+        handle.seek(0)
+        data = handle.read(_STATE.size)
+        return _STATE.unpack(data) if len(data) == _STATE.size else (float(self.capacity), time.time())
+
+    def _write(self, handle, tokens: float, updated: float) -> None:
+        if handle is None:
+            self._state = (tokens, updated)
+            return
+        handle.seek(0)
+        handle.truncate()
+        handle.write(_STATE.pack(tokens, updated))
+        handle.flush()
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> float:
+        """Block until `tokens` are available and take them. Returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._locked() as handle:
+                available, updated = self._read(handle)
+                now = time.time()
+                available = min(self.capacity, available + max(0.0, now - updated) * self.rate)
+                if available >= tokens:
+                    self._write(handle, available - tokens, now)
+                    return waited
+                self._write(handle, available, now)
+                wait = (tokens - available) / self.rate
+            if timeout is not None and waited + wait > timeout:
+                raise TimeoutError(f"Rate limiter wait exceeded {timeout}s")
+            time.sleep(wait)
+            waited += wait
+
+
+class ThrottledProvider(DataProvider):
+    """
+    Wraps another provider so every upstream call first takes a token from a shared bucket,
+    runs under a per-endpoint concurrency cap and is retried with jittered exponential
+    backoff on transient errors. Retries and dropped calls are counted (see stats()) and
+    reported rather than swallowed; the final error is re-raised to the caller.
+    """
+
+    def __init__(
+        self,
+        inner: Optional[DataProvider] = None,
+        bucket: Optional[TokenBucket] = None,
+        retries: int = DEFAULT_RETRIES,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        concurrency: Optional[Dict[str, int]] = None
+    ):
+        self.inner = inner or YFinanceProvider()
+        self.bucket = bucket or TokenBucket()
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.concurrency = {**DEFAULT_CONCURRENCY, **(concurrency or {})}
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, field: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if field not in self._semaphores:
+                limit = self.concurrency.get(field, self.concurrency["default"])
+                self._semaphores[field] = threading.BoundedSemaphore(limit)
+            return self._semaphores[field]
+
+    def _record(self, field: str, key: str, value: float = 1) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(field, {"calls": 0, "retries": 0, "failures": 0, "throttled_seconds": 0.0})
+            stats[key] += value
+
+    def open(self, ticker: str) -> Any:
+        return self.inner.open(ticker)
+
+    def fetch(self, handle: Any, field: str, *args, **kwargs) -> Any:
+        attempt = 0
+        while True:
+            waited = self.bucket.acquire()
+            if waited:
+                self._record(field, "throttled_seconds", waited)
+            self._record(field, "calls")
+            try:
+                with self._semaphore(field):
+                    return self.inner.fetch(handle, field, *args, **kwargs)
+            except Exception as e:
+                if not is_transient(e) or attempt >= self.retries:
+                    self._record(field, "failures")
+                    count("report_upstream_failures_total", field=field, transient=is_transient(e))
+                    if attempt:
+                        logger.warning("Upstream %s failed after %d retries: %s: %s", field, attempt, type(e).__name__, e)
+                    raise
+                attempt += 1
+                self._record(field, "retries")
+                count("report_upstream_retries_total", field=field)
+                time.sleep(backoff_delay(attempt, self.base_delay, self.max_delay))
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-endpoint calls, retries, failures and time spent waiting for tokens."""
+        with self._lock:
+            return {field: dict(values) for field, values in self._stats.items()}
+
+    def totals(self) -> Dict[str, float]:
+        totals = {"calls": 0, "retries": 0, "failures": 0, "throttled_seconds": 0.0}
+        for values in self.stats().values():
+            for key in totals:
+                totals[key] += values[key]
+        totals["throttled_seconds"] = round(totals["throttled_seconds"], 3)
+        return totals
+
+
+def install_throttle(
+    rate: float = DEFAULT_RATE,
+    burst: float = DEFAULT_BURST,
+    path: Optional[str] = DEFAULT_BUCKET_PATH,
+    retries: int = DEFAULT_RETRIES
+) -> ThrottledProvider:
+    """Route every default session in this process through a ThrottledProvider sharing `path`."""
+    inner = get_default_provider() or YFinanceProvider()
+    if isinstance(inner, ThrottledProvider):
+        inner = inner.inner
+    provider = ThrottledProvider(inner, TokenBucket(rate, burst, path), retries=retries)
+    set_default_provider(provider)
+    return provider
+
+
+def upstream_totals() -> Optional[Dict[str, float]]:
+    """Totals of the process-wide ThrottledProvider, or None when upstream calls are not throttled."""
+    provider = get_default_provider()
+    return provider.totals() if isinstance(provider, ThrottledProvider) else None
@@ -0,0 +1,230 @@
+# src/total_return.py
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.incremental import content_hash
+from src.tracing import traced
+
+TRADING_DAYS = 252
+
+# Rolling volatility windows in trading days (about 1 month, 3 months and 1 year)
+DEFAULT_WINDOWS = (21, 63, 252)
+
+# Per-ticker results kept in memory, most recently used last
+CACHE_SIZE = 1024
+
+
+def forward_fill(values: np.ndarray) -> np.ndarray:
+    """Carry the last valid value down each column (leading NaNs stay NaN)."""
+    valid = np.isfinite(values)
+    rows = np.where(valid, np.arange(len(values))[:, None], 0)
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    filled = values[rows, np.arange(values.shape[1])]
+    return np.where(valid.cumsum(axis=0) > 0, filled, np.nan)
+
+
+def split_factors(splits: np.ndarray) -> np.ndarray:
+    """Product of the split ratios strictly after each date (1 where no later split)."""
+    ratios = np.where(np.isfinite(splits) & (splits > 0), splits, 1.0)
+    after = np.cumprod(ratios[::-1], axis=0)[::-1]
+    return np.vstack([after[1:], np.ones((1, ratios.shape[1]))])
+
+
+def compute_returns(
+    dates: np.ndarray,
+    prices: np.ndarray,
+    dividends: Optional[np.ndarray] = None,
+    splits: Optional[np.ndarray] = None,
+    windows: Iterable[int] = DEFAULT_WINDOWS,
+    raw_prices: bool = False
+) -> dict:
+    """
+    Price and total-return indices plus summary statistics for many tickers in one array pass.
+    `prices`, `dividends` and `splits` are (dates x tickers) arrays on the shared, sorted `dates`
+    (NaN where a ticker did not trade, 0 or NaN where nothing was paid or split).
+    Dividends are reinvested at the close of their ex-date. yfinance prices and dividends are
+    already split-adjusted; pass `raw_prices=True` for unadjusted series, which are then divided
+    by the splits that followed each date.
+    Indices start at 1 on each ticker's first price; statistics are per ticker (1-D arrays).
+    """
+    prices = np.asarray(prices, dtype=float)
+    dividends = np.zeros_like(prices) if dividends is None else np.nan_to_num(np.asarray(dividends, dtype=float))
+    if raw_prices and splits is not None:
+        factors = split_factors(np.asarray(splits, dtype=float))
+        prices = prices / factors
+        dividends = dividends / factors
+    prices = forward_fill(prices)
+
+    gross = np.ones_like(prices)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gross[1:] = (prices[1:] + dividends[1:]) / prices[:-1]
+    gross = np.where(np.isfinite(gross) & (gross > 0), gross, 1.0)
+    started = np.isfinite(prices)
+    total_index = np.where(started, np.cumprod(gross, axis=0), np.nan)
+    with np.errstate(invalid="ignore"):
+        first_price = prices[np.argmax(started, axis=0), np.arange(prices.shape[1])]
+        price_index = prices / first_price
+
+    # Rolling volatility of log returns from running sums, one pass per window
+    log_returns = np.log(gross)
+    sums = np.vstack([np.zeros((1, prices.shape[1])), np.cumsum(log_returns, axis=0)])
+    squares = np.vstack([np.zeros((1, prices.shape[1])), np.cumsum(log_returns ** 2, axis=0)])
+    volatility = {}
+    for window in windows:
+        rolled = np.full_like(prices, np.nan)
+        if len(prices) > window:
+            s = sums[window + 1:] - sums[1:-window]
+            q = squares[window + 1:] - squares[1:-window]
+            variance = np.maximum(q - s * s / window, 0.0) / (window - 1)
+            rolled[window:] = np.sqrt(variance * TRADING_DAYS)
+        # A window reaching back before the ticker's first price is not a volatility yet
+        rolled[~np.roll(started, window, axis=0) | (np.arange(len(prices)) < window)[:, None]] = np.nan
+        volatility[window] = rolled
+
+    with np.errstate(invalid="ignore"):
+        drawdown = total_index / np.fmax.accumulate(total_index, axis=0) - 1
+    first_date = np.asarray(dates, dtype="datetime64[ns]")[np.argmax(started, axis=0)]
+    years = (np.asarray(dates, dtype="datetime64[ns]")[-1] - first_date) / np.timedelta64(1, "D") / 365.25
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exponent = np.where(years > 0, 1 / years, np.nan)
+        summary = {
+            "total_return": total_index[-1] - 1,
+            "price_return": price_index[-1] - 1,
+            "cagr": total_index[-1] ** exponent - 1,
+            "price_cagr": price_index[-1] ** exponent - 1,
+            "max_drawdown": np.nanmin(np.where(started, drawdown, np.nan), axis=0),
+            "years": years,
+            **{f"volatility_{window}d": values[-1] for window, values in volatility.items()},
+        }
+    return {
+        "price_index": price_index,
+        "total_return_index": total_index,
+        "volatility": volatility,
+        "drawdown": drawdown,
+        "summary": summary,
+    }
+
+
+def _column(history: DataFrame, name: str) -> Optional[np.ndarray]:
+    return history[name].to_numpy(dtype=float) if name in history.columns else None
+
+
+def _on_dates(series: Optional[pd.Series], index: pd.DatetimeIndex) -> Optional[np.ndarray]:
+    # Actions from get_dividends_and_splits, summed onto the history's trading days
+    if series is None or series.empty:
+        return None
+    dates = series.index.tz_localize(None) if getattr(series.index, "tz", None) else series.index
+    return series.groupby(dates.normalize()).sum().reindex(index.normalize(), fill_value=0.0).to_numpy(dtype=float)
+
+
+_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+@traced()
+def ticker_total_return(
+    ticker: str,
+    history: DataFrame,
+    dividends: Optional[pd.Series] = None,
+    splits: Optional[pd.Series] = None,
+    windows: Iterable[int] = DEFAULT_WINDOWS,
+    raw_prices: bool = False
+) -> dict:
+    """
+    Total return for one ticker from a yfinance-style history frame. Dividends and splits come
+    from its "Dividends" and "Stock Splits" columns, or from the given Series when it has none.
+    Prices are taken as split-adjusted, as yfinance and the price store (which restates its
+    history after every split) serve them; pass `raw_prices=True` for unadjusted closes.
+    Returns {"frame": Price / Total Return indices (100 at the start) and rolling volatilities,
+    "summary": statistics}. Results are cached per ticker and input content.
+    """
+    index = history.index.tz_localize(None) if getattr(history.index, "tz", None) else history.index
+    close = history["Close"].to_numpy(dtype=float)
+    divs = _column(history, "Dividends")
+    divs = divs if divs is not None else _on_dates(dividends, index)
+    split_ratios = _column(history, "Stock Splits")
+    split_ratios = split_ratios if split_ratios is not None else _on_dates(splits, index)
+    windows = tuple(windows)
+
+    key = (ticker, windows, raw_prices, content_hash(index.asi8.tobytes(), close.tobytes(), divs, split_ratios))
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    as_2d = lambda values: None if values is None else values[:, None]
+    result = compute_returns(
+        index.to_numpy(), close[:, None], as_2d(divs), as_2d(split_ratios), windows, raw_prices
+    )
+    frame = DataFrame({
+        "Price": result["price_index"][:, 0] * 100,
+        "Total Return": result["total_return_index"][:, 0] * 100,
+        "Drawdown": result["drawdown"][:, 0],
+        **{f"Volatility {window}d": values[:, 0] for window, values in result["volatility"].items()},
+    }, index=index)
+    summary = {name: float(values[0]) for name, values in result["summary"].items()}
+    value = {"frame": frame, "summary": summary}
+
+    with _cache_lock:
+        _cache[key] = value
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return value
+
+
+@traced()
+def universe_returns(
+    tickers: List[str],
+    start,
+    end,
+    price_store,
+    windows: Iterable[int] = DEFAULT_WINDOWS,
+    workers: int = 8
+) -> DataFrame:
+    """
+    Summary statistics for every ticker from the price store, computed in one array pass over
+    a (dates x tickers) matrix aligned on the union of trading days. Missing history is fetched
+    first, `workers` tickers at a time. Tickers without prices get NaN rows.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        windows_by_ticker = dict(zip(tickers, pool.map(lambda t: price_store.window(t, start, end), tickers)))
+
+    dates = np.unique(np.concatenate([w["ts"] for w in windows_by_ticker.values()] or [np.empty(0, "<i8")]))
+    if len(dates) == 0:
+        return DataFrame(index=pd.Index(tickers, name="ticker"))
+    shape = (len(dates), len(tickers))
+    prices = np.full(shape, np.nan)
+    dividends = np.zeros(shape)
+    splits = np.zeros(shape)
+    for column, ticker in enumerate(tickers):
+        records = windows_by_ticker[ticker]
+        rows = np.searchsorted(dates, records["ts"])
+        prices[rows, column] = records["close"]
+        dividends[rows, column] = records["dividend"]
+        splits[rows, column] = records["split"]
+
+    result = compute_returns(dates.astype("datetime64[ns]"), prices, dividends, splits, windows)
+    return DataFrame(result["summary"], index=pd.Index(tickers, name="ticker"))
+
+
+def summary_rows(summary: Dict[str, float]) -> Dict[str, str]:
+    """Report-ready labels and formatted values for a ticker_total_return summary."""
+    pct = lambda value: "N/A" if value is None or value != value else f"{value:.1%}"
+    rows = {
+        "Total Return (Dividends Reinvested)": pct(summary.get("total_return")),
+        "Price Return": pct(summary.get("price_return")),
+        "CAGR (Total Return)": pct(summary.get("cagr")),
+        "CAGR (Price)": pct(summary.get("price_cagr")),
+        "Max Drawdown": pct(summary.get("max_drawdown")),
+    }
+    for key, value in summary.items():
+        if key.startswith("volatility_"):
+            rows[f"Volatility ({key[len('volatility_'):-1]} days, annualized)"] = pct(value)
+    return rows
@@ -0,0 +1,276 @@
+# src/tracing.py
+
+import contextvars
+import functools
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Upper bounds (seconds) of the span duration histogram buckets
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRIC_HELP = {
+    "report_span_seconds": ("histogram", "Duration of traced pipeline spans"),
+    "report_span_errors_total": ("counter", "Spans that ended with an exception"),
+    "report_upstream_bytes_total": ("counter", "Approximate in-memory size of upstream responses"),
+    "report_session_memo_hits_total": ("counter", "Session fetches served from memoized results"),
+    "report_cache_requests_total": ("counter", "Local cache lookups by result"),
+    "report_swallowed_errors_total": ("counter", "Section failures replaced by a placeholder instead of raised"),
+}
+
+_tracer: Optional["Tracer"] = None
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+_span_ids = itertools.count(1)
+
+
+def payload_bytes(value: Any) -> int:
+    """Rough size of an upstream response: frame memory for pandas objects, buffer length for bytes."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if hasattr(value, "memory_usage"):
+        try:
+            usage = value.memory_usage(deep=True)
+            return int(usage.sum() if hasattr(usage, "sum") else usage)
+        except Exception:
+            pass
+    if hasattr(value, "calls") and hasattr(value, "puts"):
+        return payload_bytes(value.calls) + payload_bytes(value.puts)
+    return sys.getsizeof(value)
+
+
+class Span:
+    """One timed operation; attributes end up in the trace event and some feed the metrics."""
+
+    __slots__ = ("tracer", "name", "attrs", "span_id", "parent_id", "thread", "start", "duration", "error", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.span_id = next(_span_ids)
+        parent = _current_span.get()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.thread = threading.get_ident()
+        self.start = 0.0
+        self.duration = None
+        self.error = None
+        self._token = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attrs[key] = value
+
+    def record_payload(self, value: Any, **labels) -> None:
+        """Attach the response size to the span and to the upstream bytes counter."""
+        size = payload_bytes(value)
+        self.attrs["bytes"] = size
+        self.tracer.count("report_upstream_bytes_total", size, **labels)
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.duration = time.perf_counter() - self.start
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.tracer.finish(self)
+        return False
+
+
+class _NoopSpan:
+    """Returned by span() while tracing is off: entering, setting and exiting do nothing."""
+
+    __slots__ = ()
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def record_payload(self, value: Any, **labels) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _labels_text(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    escape = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in sorted(labels.items())) + "}"
+
+
+def _label_key(labels: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Tracer:
+    """
+    Collects finished spans and aggregates them into counters and duration histograms.
+    Export with write_trace (Chrome trace-event JSON, viewable in Perfetto or chrome://tracing)
+    or write_metrics (Prometheus text exposition).
+    """
+
+    def __init__(self, max_spans: int = 100_000):
+        self.max_spans = max_spans
+        self.spans: List[Span] = []
+        self.dropped_spans = 0
+        self.counters: Dict[Tuple[str, tuple], float] = {}
+        self.histograms: Dict[str, list] = {}
+        self.origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def start(self, name: str, attrs: Dict[str, Any]) -> Span:
+        return Span(self, name, attrs)
+
+    def finish(self, span: Span) -> None:
+        bucket = next((i for i, bound in enumerate(DURATION_BUCKETS) if span.duration <= bound), len(DURATION_BUCKETS))
+        with self._lock:
+            if len(self.spans) < self.max_spans:
+                self.spans.append(span)
+            else:
+                self.dropped_spans += 1
+            counts, total = self.histograms.setdefault(span.name, [[0] * (len(DURATION_BUCKETS) + 1), 0.0])
+            counts[bucket] += 1
+            self.histograms[span.name][1] = total + span.duration
+        if span.error:
+            self.count("report_span_errors_total", span=span.name)
+
+    def count(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def snapshot(self) -> dict:
+        """Metrics as plain JSON-friendly data, e.g. to send from a worker process to the parent."""
+        with self._lock:
+            return {
+                "counters": [[name, dict(labels), value] for (name, labels), value in self.counters.items()],
+                "histograms": [[name, list(counts), total] for name, (counts, total) in self.histograms.items()],
+            }
+
+    def merge(self, snapshot: dict) -> None:
+        """Add another tracer's snapshot into this one's metrics."""
+        for name, labels, value in snapshot["counters"]:
+            self.count(name, value, **labels)
+        with self._lock:
+            for name, counts, total in snapshot["histograms"]:
+                mine = self.histograms.setdefault(name, [[0] * (len(DURATION_BUCKETS) + 1), 0.0])
+                mine[0] = [a + b for a, b in zip(mine[0], counts)]
+                mine[1] += total
+
+    def trace_events(self) -> List[dict]:
+        with self._lock:
+            spans = list(self.spans)
+        pid = os.getpid()
+        events = []
+        for span in spans:
+            args = {k: v if isinstance(v, (int, float, bool, type(None))) else str(v) for k, v in span.attrs.items()}
+            args["span_id"] = span.span_id
+            if span.parent_id is not None:
+                args["parent_id"] = span.parent_id
+            if span.error:
+                args["error"] = span.error
+            events.append({
+                "name": span.name,
+                "cat": span.name.split(".")[0],
+                "ph": "X",
+                "ts": round((span.start - self.origin) * 1e6, 1),
+                "dur": round(span.duration * 1e6, 1),
+                "pid": pid,
+                "tid": span.thread,
+                "args": args,
+            })
+        return events
+
+    def write_trace(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.trace_events(), "droppedSpans": self.dropped_spans}, f)
+
+    def prometheus(self) -> str:
+        snapshot = self.snapshot()
+        families: Dict[str, List[str]] = {}
+
+        for name, counts, total in sorted(snapshot["histograms"]):
+            lines = families.setdefault("report_span_seconds", [])
+            cumulative = 0
+            for bound, count in zip(DURATION_BUCKETS + ("+Inf",), counts):
+                cumulative += count
+                lines.append(f"report_span_seconds_bucket{_labels_text({'span': name, 'le': str(bound)})} {cumulative}")
+            lines.append(f"report_span_seconds_sum{_labels_text({'span': name})} {total:.6f}")
+            lines.append(f"report_span_seconds_count{_labels_text({'span': name})} {cumulative}")
+        for name, labels, value in sorted(snapshot["counters"], key=lambda c: (c[0], sorted(c[1].items()))):
+            families.setdefault(name, []).append(f"{name}{_labels_text(labels)} {value:g}")
+
+        out = []
+        for name, lines in families.items():
+            kind, text = METRIC_HELP.get(name, ("counter", name))
+            out += [f"# HELP {name} {text}", f"# TYPE {name} {kind}", *lines]
+        return "\n".join(out) + "\n"
+
+    def write_metrics(self, path: str) -> None:
+        with open(path, "w") as f:
+            f.write(self.prometheus())
+
+
+def enable_tracing(tracer: Optional[Tracer] = None) -> Tracer:
+    """Start recording spans and metrics process-wide (replacing any active tracer)."""
+    global _tracer
+    _tracer = tracer or Tracer()
+    return _tracer
+
+
+def disable_tracing() -> Optional[Tracer]:
+    """Stop recording and return the tracer that was active, if any."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def span(name: str, **attrs):
+    """Context manager timing a block as a span; a shared no-op while tracing is disabled."""
+    tracer = _tracer
+    if tracer is None:
+        return NOOP_SPAN
+    return tracer.start(name, attrs)
+
+
+def count(name: str, value: float = 1, **labels) -> None:
+    """Increment a counter if tracing is enabled."""
+    tracer = _tracer
+    if tracer is not None:
+        tracer.count(name, value, **labels)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator recording every call of a function as a span (named module.function by default)."""
+
+    def decorator(func: Callable) -> Callable:
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return func(*args, **kwargs)
+            with tracer.start(span_name, {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
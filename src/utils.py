@@ -1,8 +1,9 @@
 # src/utils.py
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from pandas import DataFrame
 from typing import Optional, Tuple
+from src.periods import PeriodResolver
 
 def format_currency(value: float) -> str:
     """Formats numeric values as currency with M/B suffix."""
@@ -15,28 +16,23 @@ def format_currency(value: float) -> str:
     else:
         return f"${value:,.0f}"
 
-def get_two_closest_columns(df: DataFrame, reference_date: datetime) -> Tuple[Optional[datetime], Optional[datetime]]:
+def get_two_closest_columns(
+    df: DataFrame,
+    reference_date: datetime,
+    filing_lag: Optional[timedelta] = None
+) -> Tuple[Optional[datetime], Optional[datetime]]:
     """
     Find the two closest reporting dates in the DataFrame:
-    - The most recent column before or on the reference_date
+    - The most recent column before or on the reference_date (minus any filing lag)
     - The closest column about one year earlier
+    For many reference dates at once, use PeriodResolver directly.
     """
     if df.empty or not hasattr(df, "columns"):
         return None, None
 
-    dates = sorted(df.columns, reverse=True)
-    latest = next((d for d in dates if d <= reference_date), None)
-
-    if not latest:
+    latest, prev = PeriodResolver(df.columns, filing_lag).resolve_one(reference_date)
+    if latest is None:
         return None, None
-
-    one_year_back = latest.replace(year=latest.year - 1)
-    prev = min(
-        (d for d in dates if d < latest),
-        key=lambda d: abs((d - one_year_back).days),
-        default=None
-    )
-
     return latest, prev
 
 def print_statement_by_date(df: DataFrame, title: str, reference_date: datetime) -> None:
@@ -0,0 +1,129 @@
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.session import FixtureProvider
+
+PERIODS = [pd.Timestamp(f"{2024 - i}-09-30") for i in range(4)]
+
+BALANCE_SHEET = [
+    "Current Assets", "Current Liabilities", "Inventory", "Cash And Cash Equivalents",
+    "Other Short Term Investments", "Total Assets", "Stockholders Equity", "Receivables",
+    "Accounts Payable", "Total Debt", "Long Term Debt", "Total Capitalization",
+    "Ordinary Shares Number", "Invested Capital", "Net PPE",
+]
+INCOME_STATEMENT = [
+    "Gross Profit", "Operating Income", "Net Income", "Total Revenue", "Cost Of Revenue",
+    "Interest Expense", "EBIT", "Basic EPS", "Diluted EPS",
+]
+CASH_FLOW = ["Free Cash Flow", "Operating Cash Flow", "Cash Flow From Continuing Operating Activities"]
+
+
+def statement(items, rng, columns=PERIODS):
+    return pd.DataFrame(rng.uniform(1e8, 1e10, (len(items), len(columns))), index=items, columns=columns)
+
+
+def price_history(seed=1):
+    index = pd.bdate_range("2015-01-01", "2026-12-31", tz="America/New_York")
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    frame = pd.DataFrame({
+        "Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+        "Volume": 1e6, "Dividends": 0.0, "Stock Splits": 0.0,
+    }, index=index)
+    frame.loc[index[::63], "Dividends"] = 0.25
+
+    def history(start=None, end=None, **kwargs):
+        start = pd.Timestamp(start or index[0]).tz_localize(None).tz_localize(index.tz)
+        end = pd.Timestamp(end or "2100-01-01").tz_localize(None).tz_localize(index.tz)
+        return frame[(frame.index >= start) & (frame.index < end)]
+    return history
+
+
+def option_chain(expiry):
+    strikes = np.arange(50, 150, 5.0)
+    side = lambda: pd.DataFrame({
+        "contractSymbol": [f"X{expiry}{k:.0f}" for k in strikes], "strike": strikes, "lastPrice": 5.0,
+        "bid": 4.9, "ask": 5.1, "impliedVolatility": 0.3, "openInterest": 100, "volume": 10,
+    })
+    return types.SimpleNamespace(calls=side(), puts=side())
+
+
+def ticker_data(seed=0, expiries=("2099-01-16", "2099-06-19")):
+    """Everything a report reads for one ticker, for FixtureProvider."""
+    rng = np.random.default_rng(seed)
+    balance_sheet = statement(BALANCE_SHEET, rng)
+    financials = statement(INCOME_STATEMENT, rng)
+    cashflow = statement(CASH_FLOW, rng)
+    dividends = pd.Series([0.2, 0.22, 0.24], index=pd.DatetimeIndex(
+        ["2022-02-01", "2023-02-01", "2024-02-01"], tz="America/New_York"))
+    return {
+        "balance_sheet": balance_sheet, "financials": financials, "cashflow": cashflow,
+        "quarterly_balance_sheet": balance_sheet, "quarterly_financials": financials,
+        "quarterly_cashflow": cashflow,
+        "info": {
+            "longName": "Test Corp", "longBusinessSummary": "Does things.", "sector": "Technology",
+            "industry": "Software", "website": "", "marketCap": 1e9, "currentPrice": 100.0,
+            "dividendYield": 0.9,
+        },
+        "history": price_history(seed + 1),
+        "dividends": dividends,
+        "splits": pd.Series(dtype=float),
+        "calendar": {"Earnings Date": [pd.Timestamp("2025-01-30").date()], "EPS Estimate": [1.5]},
+        "options": expiries,
+        "option_chain": option_chain,
+        "news": [],
+        "get_analyst_price_targets": {"current": 100, "mean": 120},
+        "get_recommendations": pd.DataFrame({"period": ["0m"], "strongBuy": [5]}),
+        "get_eps_trend": pd.DataFrame({"current": [1.0]}, index=["0q"]),
+        "get_earnings_estimate": pd.DataFrame({"avg": [1.0]}, index=["0q"]),
+        "get_revenue_estimate": pd.DataFrame({"avg": [1e9]}, index=["0q"]),
+        "get_growth_estimates": pd.DataFrame({"stock": [0.1]}, index=["0q"]),
+    }
+
+
+@pytest.fixture
+def provider():
+    """Offline provider serving two synthetic tickers, AAA and BBB."""
+    return FixtureProvider({"AAA": ticker_data(0), "BBB": ticker_data(1)})
+
+
+class SplitHistory:
+    """
+    A ticker trading flat at 100 that splits 2-for-1 on SPLIT_DATE and pays 0.5 quarterly,
+    served the way Yahoo does: prices and dividends adjusted for every split up to `today`.
+    """
+
+    SPLIT_DATE = pd.Timestamp("2024-03-01")
+
+    def __init__(self):
+        index = pd.bdate_range("2023-01-02", "2024-12-31")
+        after = index >= self.SPLIT_DATE
+        self.raw = pd.DataFrame({
+            "Close": np.where(after, 50.0, 100.0),
+            "Dividends": 0.0,
+            "Stock Splits": np.where(index == self.SPLIT_DATE, 2.0, 0.0),
+        }, index=index)
+        self.raw.loc[index[::63], "Dividends"] = np.where(after[::63], 0.25, 0.5)
+        self.today = pd.Timestamp("2024-01-31")
+        self.provider = FixtureProvider({"SPLT": {"history": self.history}})
+
+    def history(self, start=None, end=None, **kwargs):
+        known = self.raw[self.raw.index < self.today]
+        later = known["Stock Splits"].replace(0.0, 1.0)[::-1].cumprod()[::-1].shift(-1, fill_value=1.0)
+        frame = known.copy()
+        frame["Close"] = known["Close"] / later
+        frame["Dividends"] = known["Dividends"] / later
+        for column in ("Open", "High", "Low", "Adj Close"):
+            frame[column] = frame["Close"]
+        frame["Volume"] = 1e6 * later
+        return frame[(frame.index >= pd.Timestamp(start)) & (frame.index < pd.Timestamp(end))]
+
+
+@pytest.fixture
+def split_history(monkeypatch):
+    history = SplitHistory()
+    monkeypatch.setattr("src.price_store._today", lambda: history.today.date())
+    return history
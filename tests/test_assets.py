@@ -0,0 +1,100 @@
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.assets import LogoCache
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+
+
+class LogoHandler(BaseHTTPRequestHandler):
+    """Serves a PNG for /logo.test, HTML for /html.test and 404 for everything else."""
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        body, content_type = {
+            "/logo.test": (PNG, "image/png"),
+            "/html.test": (b"<html></html>", "text/html"),
+        }.get(self.path, (None, None))
+        self.send_response(200 if body else 404)
+        self.send_header("Content-Type", content_type or "text/plain")
+        self.send_header("Content-Length", str(len(body or b"")))
+        self.end_headers()
+        self.wfile.write(body or b"")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def logo_host():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LogoHandler)
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_cache(host, path, **options):
+    return LogoCache(str(path), url_template=f"http://127.0.0.1:{host.server_address[1]}/{{domain}}", **options)
+
+
+def test_hit_after_miss_from_memory_and_disk(logo_host, tmp_path):
+    cache = make_cache(logo_host, tmp_path)
+    assert cache.get("logo.test") == PNG
+    assert cache.get("logo.test") == PNG
+    assert make_cache(logo_host, tmp_path).get("logo.test") == PNG
+    assert logo_host.requests == ["/logo.test"]
+
+
+def test_misses_are_negatively_cached(logo_host, tmp_path):
+    cache = make_cache(logo_host, tmp_path)
+    assert cache.get("unknown.test") is None
+    assert cache.get("html.test") is None
+    assert make_cache(logo_host, tmp_path).get("unknown.test") is None
+    assert logo_host.requests == ["/unknown.test", "/html.test"]
+
+
+def test_expired_miss_is_fetched_again(logo_host, tmp_path):
+    cache = make_cache(logo_host, tmp_path, negative_ttl=timedelta(0))
+    assert cache.get("unknown.test") is None
+    assert cache.get("unknown.test") is None
+    assert logo_host.requests == ["/unknown.test", "/unknown.test"]
+
+
+def test_network_error_serves_the_stale_copy(logo_host, tmp_path):
+    assert make_cache(logo_host, tmp_path).get("logo.test") == PNG
+    port = logo_host.server_address[1]
+    logo_host.shutdown()
+    logo_host.server_close()
+    stale = LogoCache(str(tmp_path), ttl=timedelta(0), url_template=f"http://127.0.0.1:{port}/{{domain}}",
+                      timeout=(0.5, 0.5))
+    assert stale.get("logo.test") == PNG
+    assert stale.get("other.test") is None
+
+
+def test_memory_is_bounded_and_drops_expired_entries(logo_host, tmp_path):
+    cache = make_cache(logo_host, tmp_path, max_memory=2)
+    for domain in ("logo.test", "a.test", "b.test"):
+        cache.get(domain)
+    assert list(cache._memory) == ["a.test", "b.test"]
+
+    cache.get("a.test")
+    cache.get("c.test")
+    assert list(cache._memory) == ["a.test", "c.test"]
+
+    cache._memory["a.test"] = (None, 0.0)
+    assert cache.get("a.test") is None
+    assert cache._memory["a.test"][1] > 0.0
+
+
+def test_fetch_failures_are_logged(logo_host, tmp_path, caplog):
+    port = logo_host.server_address[1]
+    logo_host.shutdown()
+    logo_host.server_close()
+    cache = LogoCache(str(tmp_path), url_template=f"http://127.0.0.1:{port}/{{domain}}", timeout=(0.5, 0.5))
+    assert cache.get("logo.test") is None
+    assert "Could not fetch logo for logo.test" in caplog.text
@@ -0,0 +1,51 @@
+import logging
+import os
+
+from src import batch
+
+
+def crash_first(ticker, reference_date, output_dir, *args):
+    """Stands in for _run_job: kills its worker the first time it sees CRASH, succeeds otherwise."""
+    marker = os.path.join(output_dir, "crashed")
+    if ticker == "CRASH" and not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return {"ticker": ticker, "reference_date": reference_date, "status": "ok"}
+
+
+def always_crash(ticker, reference_date, *args):
+    os._exit(1)
+
+
+def test_progress_counts_deduplicated_jobs(monkeypatch, tmp_path, caplog):
+    monkeypatch.setattr(batch, "_run_job", crash_first)
+    jobs = [("AAA", "2024-06-30"), ("AAA", "2024-06-30"), ("BBB", "2024-06-30")]
+    with caplog.at_level(logging.INFO, logger="src.batch"):
+        manifest = batch.run_batch(jobs, str(tmp_path), workers=2)
+    assert manifest["counts"]["ok"] == 2
+    assert caplog.messages[-1].startswith("[2/2]")
+
+
+def test_jobs_lost_to_a_crashed_worker_are_resubmitted(monkeypatch, tmp_path):
+    monkeypatch.setattr(batch, "_run_job", crash_first)
+    jobs = [("CRASH", "2024-06-30")] + [(f"T{i}", "2024-06-30") for i in range(5)]
+    manifest = batch.run_batch(jobs, str(tmp_path), workers=1)
+    assert manifest["counts"] == {"ok": 6, "failed": 0, "skipped": 0}
+
+
+def test_a_job_that_keeps_crashing_fails_after_the_restarts(monkeypatch, tmp_path):
+    monkeypatch.setattr(batch, "_run_job", always_crash)
+    manifest = batch.run_batch([("CRASH", "2024-06-30")], str(tmp_path), workers=1)
+    assert manifest["counts"]["failed"] == 1
+    assert manifest["jobs"][0]["error"].startswith("Worker crashed")
+
+
+def test_metrics_alone_write_no_trace_files(monkeypatch, tmp_path):
+    monkeypatch.setattr("src.pipeline.generate_report", lambda *args, **kwargs: None)
+    entry = batch._run_job("AAA", "2024-06-30", str(tmp_path), "Name", str(tmp_path / "cache"), False, True, None, {})
+    assert entry["status"] == "ok" and "metrics" in entry
+    assert not os.path.exists(entry["path"] + ".trace.json")
+
+    entry = batch._run_job("AAA", "2024-06-30", str(tmp_path), "Name", str(tmp_path / "cache"), True, False, None, {})
+    assert "metrics" not in entry
+    assert os.path.exists(entry["path"] + ".trace.json")
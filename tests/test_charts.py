@@ -0,0 +1,37 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from src import charts
+from src.charts import render_dividends_chart, render_price_chart
+
+
+def history(scale=1.0):
+    index = pd.date_range("2024-01-01", periods=50)
+    return pd.DataFrame({"Close": [scale * (100 + i) for i in range(50)]}, index=index)
+
+
+def test_figures_are_reused_across_threads():
+    render_price_chart(history(), "AAA")
+    figures = [entry[0] for entry in charts._templates["price"]]
+    for _ in range(3):
+        thread = threading.Thread(target=render_price_chart, args=(history(), "BBB"))
+        thread.start()
+        thread.join()
+    assert [entry[0] for entry in charts._templates["price"]] == figures
+
+
+def test_reused_figure_renders_like_a_new_one():
+    first = render_price_chart(history(), "AAA")
+    render_dividends_chart(pd.Series([0.2, 0.3], index=pd.to_datetime(["2024-01-01", "2024-04-01"])), "AAA")
+    render_price_chart(history(3.0), "BBB")
+    assert render_price_chart(history(), "AAA") == first
+
+
+def test_concurrent_renders_do_not_share_a_figure():
+    expected = {scale: render_price_chart(history(scale), "AAA") for scale in (1.0, 2.0, 3.0, 4.0)}
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        scales = [1.0, 2.0, 3.0, 4.0] * 4
+        results = list(pool.map(lambda scale: render_price_chart(history(scale), "AAA"), scales))
+    assert results == [expected[scale] for scale in scales]
@@ -0,0 +1,75 @@
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from src.export import ROW_COLUMNS, ExportWriter, collect_report_data, report_rows, row_schema
+from src.session import TickerSession
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def data(provider):
+    return collect_report_data("aaa", datetime(2024, 6, 30), session=TickerSession("AAA", provider))
+
+
+def write(data, output, fmt):
+    writer = ExportWriter(str(output), fmt)
+    try:
+        return writer.write(data)
+    finally:
+        writer.close()
+
+
+def test_collected_sections(data):
+    assert data["ticker"] == "AAA" and data["errors"] == {}
+    assert data["current_period"] == "2023-09-30" and data["previous_period"] == "2022-09-30"
+    assert data["overview"] and data["ratios"]["Liquidity"]["Current Ratio"] is not None
+
+
+def test_json_round_trip(data, tmp_path):
+    with open(write(data, tmp_path / "json", "json")) as f:
+        loaded = json.load(f)
+    assert loaded["schema_version"] == data["schema_version"]
+    assert loaded["ratios"] == data["ratios"]
+    assert loaded["reference_date"] == "2024-06-30"
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_row_round_trip(data, tmp_path, fmt):
+    path = write(data, tmp_path / f"rows.{fmt}", fmt)
+    loaded = pd.read_csv(path) if fmt == "csv" else pd.read_parquet(path)
+    expected = report_rows(data)
+    assert list(loaded.columns) == ROW_COLUMNS
+    assert len(loaded) == len(expected)
+    ratios = loaded[loaded["section"] == "ratios"].set_index("field")["value"]
+    assert ratios["Current Ratio"] == pytest.approx(data["ratios"]["Liquidity"]["Current Ratio"])
+    meta = loaded[loaded["section"] == "meta"].set_index("field")["text"]
+    assert meta["frequency"] == "annual"
+
+
+def test_parquet_matches_the_row_schema(data, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = write(data, tmp_path / "rows.parquet", "parquet")
+    assert pq.read_schema(path).remove_metadata() == row_schema()
+    assert [field.name for field in row_schema()] == ROW_COLUMNS
+
+
+def test_export_never_loads_the_renderers(tmp_path):
+    code = (
+        "import sys; from datetime import datetime\n"
+        "from src.export import ExportWriter, collect_report_data\n"
+        "from src.session import FixtureProvider, TickerSession\n"
+        "from tests.conftest import ticker_data\n"
+        "session = TickerSession('AAA', FixtureProvider({'AAA': ticker_data(0)}))\n"
+        f"writer = ExportWriter({str(tmp_path / 'rows.csv')!r}, 'csv')\n"
+        "writer.write(collect_report_data('AAA', datetime(2024, 6, 30), session=session))\n"
+        "print(sorted(m for m in ('src.pdf_report', 'matplotlib', 'fpdf') if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT, check=True)
+    assert result.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+
+from src.benchmark import compare, load_results, save_results
+from src.fixtures import RecordingProvider, ReplayProvider, load_fixtures, universe_aliases
+from src.session import TickerSession
+
+
+@pytest.fixture
+def replay(provider, tmp_path):
+    recorder = RecordingProvider(provider)
+    session = TickerSession("AAA", recorder)
+    session.get("history", start="2020-01-01", end="2025-01-01")
+    session.get("option_chain", "2099-01-16")
+    session.get("info")
+    recorder.save(str(tmp_path / "fixtures.pkl"), "2024-06-30")
+    return ReplayProvider.from_file(str(tmp_path / "fixtures.pkl"), aliases={"AAA_0001": "AAA"})
+
+
+def fetch(provider, field, *args, ticker="AAA", **kwargs):
+    return provider.fetch(provider.open(ticker), field, *args, **kwargs)
+
+
+def test_recorded_calls_replay_exactly(provider, replay, tmp_path):
+    assert load_fixtures(str(tmp_path / "fixtures.pkl"))["reference_date"] == "2024-06-30"
+    recorded = fetch(replay, "history", start="2020-01-01", end="2025-01-01")
+    pd.testing.assert_frame_equal(recorded, provider.data["AAA"]["history"](start="2020-01-01", end="2025-01-01"))
+    assert fetch(replay, "info") == provider.data["AAA"]["info"]
+
+
+def test_unrecorded_history_range_is_sliced_from_the_recording(replay):
+    sliced = fetch(replay, "history", start="2023-03-01", end="2023-04-01")
+    dates = sliced.index.tz_localize(None)
+    assert dates.min() >= pd.Timestamp("2023-03-01") and dates.max() < pd.Timestamp("2023-04-01")
+    assert len(sliced) == 23
+    assert fetch(replay, "history", start="2030-01-01", end="2031-01-01").empty
+
+
+def test_unrecorded_expiry_falls_back_to_a_recorded_chain(replay):
+    recorded = fetch(replay, "option_chain", "2099-01-16")
+    assert fetch(replay, "option_chain", "2099-06-19") is recorded
+    with pytest.raises(KeyError):
+        fetch(replay, "news")
+
+
+def test_aliases_replay_another_ticker(replay):
+    assert fetch(replay, "info", ticker="aaa_0001") == fetch(replay, "info")
+    with pytest.raises(KeyError):
+        replay.open("ZZZ")
+    assert universe_aliases(["BBB", "AAA"], 3) == {"AAA_0000": "AAA", "BBB_0001": "BBB", "AAA_0002": "AAA"}
+
+
+def results(stage_p50, batch_seconds):
+    return {
+        "stages": {"calculate_ratios": {"p50": stage_p50}},
+        "batches": {"100": {"total_seconds": batch_seconds}},
+    }
+
+
+def test_compare_flags_slowdowns_past_the_threshold():
+    baseline = results(0.010, 10.0)
+    assert compare(results(0.0119, 11.9), baseline) == []
+    regressions = compare(results(0.013, 12.5), baseline)
+    assert regressions == [
+        "calculate_ratios p50: 0.0100s -> 0.0130s (+30%)",
+        "batch 100 total: 10.0000s -> 12.5000s (+25%)",
+    ]
+    assert compare(results(0.013, 12.5), baseline, threshold=0.5) == []
+
+
+def test_compare_ignores_speedups_tiny_timings_and_new_entries():
+    assert compare(results(0.005, 5.0), results(0.010, 10.0)) == []
+    assert compare(results(0.0009, 10.0), results(0.0001, 10.0)) == []
+    assert compare(results(0.5, 10.0), {"stages": {}, "batches": {}}) == []
+
+
+def test_compare_against_saved_results(tmp_path):
+    path = str(tmp_path / "bench.json")
+    save_results(results(0.010, 10.0), path)
+    assert compare(results(0.02, 10.0), load_results(path)) == ["calculate_ratios p50: 0.0100s -> 0.0200s (+100%)"]
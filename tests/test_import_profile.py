@@ -0,0 +1,20 @@
+import json
+import os
+import subprocess
+import sys
+
+from src.import_profile import HEAVY_MODULES, measure_imports
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_main_loads_no_heavy_dependency():
+    code = "import json, sys, main; print(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT, check=True)
+    loaded = {name.split(".")[0] for name in json.loads(result.stdout.splitlines()[-1])}
+    assert loaded.isdisjoint({"matplotlib", "yfinance"})
+    assert loaded.isdisjoint(HEAVY_MODULES)
+
+
+def test_measure_imports_sees_the_entry_point():
+    assert "main" in {name for name, _, _ in measure_imports("main")}
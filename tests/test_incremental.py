@@ -0,0 +1,39 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from src.incremental import ChartCache, content_hash, read_manifest
+from src.pipeline import generate_report
+from src.session import TickerSession
+
+
+def build(provider, path, chart_cache, **options):
+    return generate_report(
+        "AAA", datetime(2024, 6, 30), save_path=path, session=TickerSession("AAA", provider),
+        fetch_logo=False, chart_cache=chart_cache, **options
+    )
+
+
+def test_content_hash_ignores_dict_order():
+    frame = pd.DataFrame({"a": [1.0, 2.0]})
+    assert content_hash({"x": 1, "y": frame}) == content_hash({"y": frame.copy(), "x": 1})
+    assert content_hash({"x": 1}) != content_hash({"x": 2})
+
+
+def test_second_identical_build_is_skipped(provider, tmp_path):
+    path = str(tmp_path / "AAA.pdf")
+    charts = ChartCache(str(tmp_path / "charts"))
+
+    build(provider, path, charts, appendix=True)
+    first = read_manifest(path)
+    built_at = os.path.getmtime(path)
+    assert first["rebuilt"]
+    assert "options" in first["sections"]
+    assert "appendix:Appendix: Option Contracts" in first["sections"]
+
+    build(provider, path, charts, appendix=True)
+    second = read_manifest(path)
+    assert not second["rebuilt"]
+    assert second["regenerated"] == []
+    assert os.path.getmtime(path) == built_at
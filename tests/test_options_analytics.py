@@ -0,0 +1,48 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from src.incremental import content_hash
+from src.options_analytics import (
+    EXPIRY_HOUR, QUOTE_COLUMNS, chain_frame, dividend_yield_fraction, get_options_analytics
+)
+from src.session import TickerSession
+from tests.conftest import option_chain
+
+
+def test_dividend_yield_is_read_in_percent():
+    assert dividend_yield_fraction({"dividendYield": 0.44}) == pytest.approx(0.0044)
+    assert dividend_yield_fraction({"dividendYield": 2.5}) == pytest.approx(0.025)
+
+
+def test_trailing_yield_is_already_a_fraction():
+    info = {"trailingAnnualDividendYield": 0.0045, "dividendYield": 0.44}
+    assert dividend_yield_fraction(info) == pytest.approx(0.0045)
+
+
+def test_missing_yield_is_zero():
+    assert dividend_yield_fraction({}) == 0.0
+    assert dividend_yield_fraction({"dividendYield": None}) == 0.0
+
+
+def test_zero_dte_years_reflect_the_time_left():
+    chains = {"2024-06-21": option_chain("2024-06-21")}
+    contracts = chain_frame(chains, datetime(2024, 6, 21, 15, 0))
+    assert contracts["years"].to_numpy() == pytest.approx(1 / (365 * 24))
+
+
+def test_contracts_are_valued_now_by_default(provider):
+    expiry = (date.today() + timedelta(days=1)).isoformat()
+    provider.data["AAA"]["options"] = (expiry,)
+    before = datetime.now()
+    years = get_options_analytics("AAA", TickerSession("AAA", provider))["contracts"]["years"].iloc[0]
+    left = (datetime.combine(date.today() + timedelta(days=1), time(EXPIRY_HOUR)) - before).total_seconds()
+    assert years * 365 * 24 * 3600 == pytest.approx(left, abs=60)
+
+
+def test_hashed_inputs_are_the_raw_quotes(provider):
+    first = get_options_analytics("AAA", TickerSession("AAA", provider), valuation_time=datetime(2098, 1, 1))
+    later = get_options_analytics("AAA", TickerSession("AAA", provider), valuation_time=datetime(2098, 1, 1, 15))
+    assert not first["contracts"]["theta"].equals(later["contracts"]["theta"])
+    assert content_hash(first["inputs"]) == content_hash(later["inputs"])
+    assert set(first["inputs"]["quotes"].columns) <= set(QUOTE_COLUMNS)
@@ -0,0 +1,50 @@
+import threading
+import time
+
+import pytest
+
+from src.orchestrator import SectionUnavailable, is_unavailable, run_sections
+
+
+def sleeper(seconds, value="done"):
+    def run():
+        time.sleep(seconds)
+        return value
+    return run
+
+
+def failing():
+    raise KeyError("missing")
+
+
+@pytest.mark.parametrize("section_timeout, deadline", [(0.2, 5.0), (5.0, 0.2), (0.2, None), (None, 0.2)])
+def test_slow_section_is_cut_at_the_earlier_limit(section_timeout, deadline):
+    release = threading.Event()
+    start = time.monotonic()
+    results = run_sections(
+        {"slow": lambda: release.wait(10), "fast": sleeper(0.01)},
+        section_timeout=section_timeout, deadline=deadline
+    )
+    elapsed = time.monotonic() - start
+    release.set()
+    assert isinstance(results["slow"], SectionUnavailable) and results["slow"].reason == "timed out"
+    assert results["fast"] == "done"
+    assert 0.2 <= elapsed < 1.0
+
+
+def test_failing_section_leaves_the_others_alone():
+    results = run_sections({"a": sleeper(0.05, 1), "broken": failing, "b": sleeper(0.05, 2)})
+    assert results["a"] == 1 and results["b"] == 2
+    assert is_unavailable(results["broken"])
+    assert results["broken"].reason == "KeyError: 'missing'"
+    assert list(results) == ["a", "broken", "b"]
+
+
+def test_sections_run_concurrently_within_the_deadline():
+    sections = {f"s{i}": sleeper(0.3 if i % 2 else 5) for i in range(10)}
+    start = time.monotonic()
+    results = run_sections(sections, section_timeout=None, deadline=0.5)
+    elapsed = time.monotonic() - start
+    assert elapsed < 0.8
+    assert [name for name, value in results.items() if value == "done"] == ["s1", "s3", "s5", "s7", "s9"]
+    assert all(is_unavailable(results[f"s{i}"]) for i in range(0, 10, 2))
@@ -0,0 +1,86 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import pdf_report
+from src.pdf_report import PDFReport
+
+pypdf = pytest.importorskip("pypdf")
+
+
+def frame(rows):
+    return pd.DataFrame({
+        "contract": [f"AAA250117C{i:08d}" for i in range(rows)],
+        "strike": np.arange(rows) * 0.5 + 50,
+        "volume": np.arange(rows) % 97,
+    })
+
+
+def pages_text(pdf):
+    reader = pypdf.PdfReader(io.BytesIO(bytes(pdf.output())))
+    return [page.extract_text() for page in reader.pages]
+
+
+@pytest.mark.parametrize("rows", [120, pdf_report.FAST_TABLE_ROWS + 1500])
+def test_dataframe_text_and_repeated_header(rows):
+    pdf = PDFReport()
+    pdf.add_page()
+    pdf.add_dataframe(frame(rows), index=False)
+    pages = pages_text(pdf)
+
+    text = "\n".join(pages)
+    for i in (0, rows // 2, rows - 1):
+        assert f"AAA250117C{i:08d}" in text
+    assert f"{(rows - 1) * 0.5 + 50:,.4g}" in text
+    assert len(pages) > 1
+    for page in pages:
+        assert "contract" in page and "strike" in page and "volume" in page
+    assert text.count("AAA250117C") == rows
+
+
+def mixed_frame(rows):
+    return pd.DataFrame({
+        "expiry": pd.date_range("2025-01-17", periods=rows, freq="D").strftime("%Y-%m-%d"),
+        "iv": np.where(np.arange(rows) % 11 == 0, np.nan, np.linspace(0.1, 2.0, rows)),
+        "note": [("call" if i % 2 else "put") * (1 + i % 9) for i in range(rows)],
+    }, index=pd.Index([f"C{i}" for i in range(rows)], name="contract"))
+
+
+@pytest.mark.parametrize("df, index", [
+    (frame(pdf_report.FAST_TABLE_ROWS + 10), False),
+    (mixed_frame(pdf_report.FAST_TABLE_ROWS + 1), True),
+])
+def test_fast_path_text_matches_cells(df, index, monkeypatch):
+    # The fast path writes fpdf2 internals directly; an upgrade that changes them must fail here
+    fast = PDFReport()
+    fast.add_page()
+    monkeypatch.setattr(fast, "_draw_table_cells", lambda *args: pytest.fail("fell back to cell()"))
+    fast.add_dataframe(df, index=index)
+
+    cells = PDFReport()
+    cells.add_page()
+    cells._fast_tables = lambda: False
+    cells.add_dataframe(df, index=index)
+
+    fast_pages, cell_pages = pages_text(fast), pages_text(cells)
+    assert len(fast_pages) == len(cell_pages) > 1
+    assert fast_pages == cell_pages
+
+
+def test_long_cells_are_clipped():
+    pdf = PDFReport()
+    pdf.add_page()
+    pdf.add_dataframe(pd.DataFrame({"a": ["x" * 400], "b": [1]}), index=False, col_widths=[40, 40])
+    text = pages_text(pdf)[0]
+    assert "..." in text and "x" * 400 not in text
+
+
+def test_ratio_table_text():
+    pdf = PDFReport()
+    pdf.add_page()
+    pdf.add_table([("Metric", "Value"), ("Current Ratio", "1.50"), ("Quick Ratio", "None")])
+    text = pages_text(pdf)[0]
+    for value in ("Metric", "Value", "Current Ratio", "1.50", "Quick Ratio", "None"):
+        assert value in text
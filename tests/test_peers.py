@@ -0,0 +1,86 @@
+import math
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from src.peers import PeerStats, build_peer_table, peer_file, percentile_rank, rank_ratios
+from src.ratio_calculator import calculate_ratios
+from src.screener import ScreenerStore
+from src.session import FixtureProvider, set_default_provider
+from tests.conftest import ticker_data
+
+TICKERS = ("AAA", "BBB", "CCC", "DDD")
+
+
+@pytest.fixture
+def store(tmp_path):
+    data = {ticker: ticker_data(seed) for seed, ticker in enumerate(TICKERS)}
+    data["DDD"]["info"] = {**data["DDD"]["info"], "industry": "Banks"}
+    set_default_provider(FixtureProvider(data))
+    store = ScreenerStore(str(tmp_path / "store"))
+    assert store.ingest(TICKERS[:3]) == {}
+    yield store
+    set_default_provider(None)
+
+
+def test_percentile_rank_counts_ties_half():
+    values = np.array([1.0, 2.0, 2.0, 3.0])
+    assert percentile_rank(values, 0.5) == 0.0
+    assert percentile_rank(values, 2.0) == 50.0
+    assert percentile_rank(values, 2.5) == 75.0
+    assert percentile_rank(values, 9.0) == 100.0
+
+
+def test_percentile_rank_of_nan_and_a_single_peer():
+    assert math.isnan(percentile_rank(np.array([1.0, 2.0]), float("nan")))
+    assert percentile_rank(np.array([5.0]), 5.0) == 50.0
+    assert percentile_rank(np.array([5.0]), 4.0) == 0.0
+
+
+def test_single_member_industry_gives_no_comparison(store):
+    store.ingest(["DDD"])
+    stats = PeerStats(store)
+    assert stats.distributions("Banks", datetime(2024, 9, 30)) == {}
+    assert stats.distributions("Software", datetime(2024, 9, 30))
+    assert PeerStats(store, min_peers=1).distributions("Banks", datetime(2024, 9, 30))
+
+
+def test_ingest_invalidates_the_cached_table(store):
+    stats = PeerStats(store)
+    counts = stats.table()["count"]
+    assert os.path.exists(peer_file(store, "industry"))
+    assert counts.xs("Software", level="group").max() == 3
+
+    store.ingest(["DDD"])
+    assert not os.path.exists(peer_file(store, "industry"))
+    assert "Banks" in stats.table().index.get_level_values("group")
+    assert os.path.exists(peer_file(store, "industry"))
+
+
+def test_ranks_line_up_with_the_ratio_table(store):
+    distributions = PeerStats(store).distributions("Software", datetime(2024, 9, 30))
+    financials = ticker_data(0)
+    ratios = calculate_ratios(
+        {"balance_sheet": financials["balance_sheet"], "income_statement": financials["financials"],
+         "cash_flow": financials["cashflow"]},
+        *financials["balance_sheet"].columns[:2]
+    )
+    ranks = rank_ratios(ratios, distributions)
+    ordered = [metric for metrics in ratios.values() for metric in metrics if metric in distributions]
+    assert list(ranks) == ordered and ordered
+    for metrics in ratios.values():
+        for metric, value in metrics.items():
+            if metric in ranks:
+                values, median = distributions[metric]
+                assert ranks[metric]["peers"] == len(values) == 3
+                assert ranks[metric]["median"] == pytest.approx(np.median(values))
+                assert ranks[metric]["percentile"] == (None if value is None else percentile_rank(values, value))
+
+
+def test_table_groups_by_sector_too(store):
+    table = build_peer_table(store, by="sector")
+    assert set(table.index.get_level_values("group")) == {"Technology"}
+    with pytest.raises(ValueError):
+        build_peer_table(store, by="country")
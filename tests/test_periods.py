@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+
+from src.periods import MAX_TTM_SPAN, PeriodResolver, ttm_statement, ttm_view
+from src.ratio_calculator import calculate_ratios
+
+QUARTERS = pd.date_range("2022-03-31", "2024-12-31", freq="QE")
+
+
+def test_latest_column_on_or_before_each_date():
+    resolver = PeriodResolver([pd.Timestamp("2023-09-30"), pd.Timestamp("2024-09-30"), pd.Timestamp("2022-09-30")])
+    resolved = resolver.resolve(["2022-01-01", "2024-09-30", "2024-06-30"])
+    assert resolved["current"].isna().iloc[0] and resolved["previous"].isna().iloc[0]
+    assert list(resolved["current"].iloc[1:]) == [pd.Timestamp("2024-09-30"), pd.Timestamp("2023-09-30")]
+    assert list(resolved["previous"].iloc[1:]) == [pd.Timestamp("2023-09-30"), pd.Timestamp("2022-09-30")]
+
+
+def test_ties_go_to_the_more_recent_column():
+    # 2023-06-30 and 2023-07-02 are both one day from a year before 2024-07-01
+    columns = [pd.Timestamp(d) for d in ("2024-07-01", "2023-07-02", "2023-06-30")]
+    assert PeriodResolver(columns).resolve_one("2024-08-01") == (columns[0], columns[1])
+
+
+def test_filing_lag_hides_unpublished_periods():
+    columns = [pd.Timestamp("2024-09-30"), pd.Timestamp("2023-09-30")]
+    resolver = PeriodResolver(columns, filing_lag=timedelta(days=60))
+    assert resolver.resolve_one("2024-10-15") == (columns[1], None)
+    assert resolver.resolve_one("2024-11-29") == (columns[0], columns[1])
+
+
+def test_ttm_sums_four_consecutive_quarters():
+    quarterly = pd.DataFrame([range(1, len(QUARTERS) + 1)], index=["Total Revenue"], columns=QUARTERS)
+    ttm = ttm_statement(quarterly)
+    assert list(ttm.columns) == sorted(QUARTERS[3:], reverse=True)
+    assert ttm.loc["Total Revenue", QUARTERS[3]] == 1 + 2 + 3 + 4
+
+
+def test_ttm_skips_windows_spanning_a_gap():
+    gapped = QUARTERS.delete(4)  # 2023-03-31 is missing
+    quarterly = pd.DataFrame([[1.0] * len(gapped)], index=["Total Revenue"], columns=gapped)
+    ttm = ttm_statement(quarterly)
+    # Every window holding the gap spans a full year or more
+    assert list(ttm.columns) == sorted([gapped[3], *gapped[7:]], reverse=True)
+    assert all(end - gapped[gapped.get_loc(end) - 3] <= MAX_TTM_SPAN for end in ttm.columns)
+    assert (ttm.loc["Total Revenue"] == 4.0).all()
+
+
+def company(quarter_scale):
+    """Balance sheets at every quarter end, flows per quarter (times `quarter_scale`)."""
+    balance = pd.DataFrame({"Total Assets": 1000.0, "Stockholders Equity": 600.0, "Inventory": 100.0},
+                           index=QUARTERS).T
+    income = pd.DataFrame({"Net Income": 30.0, "Total Revenue": 300.0, "Cost Of Revenue": 180.0},
+                          index=QUARTERS).T * quarter_scale
+    return {"balance_sheet": balance, "income_statement": income, "cash_flow": pd.DataFrame()}
+
+
+@pytest.mark.parametrize("metric", ["Return on Assets (ROA)", "Return on Equity (ROE)", "Inventory Turnover",
+                                    "Asset Turnover", "Net Profit Margin"])
+def test_quarterly_ttm_and_annual_agree_for_the_same_company(metric):
+    quarterly = company(1.0)
+    annual = company(4.0)
+    annual = {name: df[[QUARTERS[-1], QUARTERS[-5]]] if not df.empty else df for name, df in annual.items()}
+    resolve = lambda financials: PeriodResolver(financials["balance_sheet"].columns).resolve_one("2025-01-15")
+
+    flat = lambda ratios: {m: v for section in ratios.values() for m, v in section.items()}
+    values = {
+        "annual": flat(calculate_ratios(annual, *resolve(annual)))[metric],
+        "quarterly": flat(calculate_ratios(quarterly, *resolve(quarterly), frequency="quarterly"))[metric],
+        "ttm": flat(calculate_ratios(ttm_view(quarterly), *resolve(quarterly), frequency="ttm"))[metric],
+    }
+    assert values["quarterly"] == pytest.approx(values["annual"], rel=1e-3)
+    assert values["ttm"] == pytest.approx(values["annual"], rel=1e-3)
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from src.price_store import PRICE_DTYPE, PriceStore
+from src.session import TickerSession
+
+
+def test_history_is_restated_after_a_split(split_history, tmp_path):
+    store = PriceStore(str(tmp_path))
+    session = TickerSession("SPLT", split_history.provider)
+    before = store.history("SPLT", "2023-01-02", "2024-01-31", session)
+    assert before["Close"].iloc[0] == 100.0
+
+    split_history.today = pd.Timestamp("2024-06-28")
+    after = store.history("SPLT", "2023-01-02", "2024-06-28", TickerSession("SPLT", split_history.provider))
+    # Stored and newly fetched records now share one adjustment: no jump at the split
+    assert np.allclose(after["Close"], 50.0)
+    assert np.allclose(after["Dividends"][after["Dividends"] > 0], 0.25)
+    assert store.actions("SPLT", start="2023-01-02")["splits"].tolist() == [2.0]
+
+
+def test_empty_fetch_is_not_recorded_as_covered(split_history, tmp_path):
+    store = PriceStore(str(tmp_path))
+    split_history.raw = split_history.raw.iloc[:0]
+    assert store.history("SPLT", "2023-01-02", "2024-01-31", TickerSession("SPLT", split_history.provider)).empty
+    assert store.coverage("SPLT") is None
+
+
+def test_partial_record_is_not_mapped(split_history, tmp_path):
+    store = PriceStore(str(tmp_path))
+    records = store.window("SPLT", "2023-01-02", "2024-01-31", TickerSession("SPLT", split_history.provider))
+    with open(store._data_path("SPLT"), "ab") as f:
+        f.write(b"\0" * (PRICE_DTYPE.itemsize // 2))  # A writer half-way through an append
+    assert len(store.records("SPLT")) == len(records)
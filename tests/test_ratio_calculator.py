@@ -0,0 +1,50 @@
+import math
+
+import numpy as np
+import pytest
+
+from src.ratio_calculator import calculate_ratios
+from src.ratio_registry import report_metrics
+from tests import baseline_ratios
+from tests.conftest import BALANCE_SHEET, CASH_FLOW, INCOME_STATEMENT, statement
+
+SEEDS = range(100)
+
+
+def random_statements(seed):
+    """Random statements with about 15% missing values and 5% zeros, to exercise every None path."""
+    rng = np.random.default_rng(seed)
+
+    def frame(items):
+        df = statement(items, rng)
+        df = df.mask(rng.random(df.shape) < 0.15)
+        return df.mask(rng.random(df.shape) < 0.05, 0.0)
+    return {
+        "balance_sheet": frame(BALANCE_SHEET),
+        "income_statement": frame(INCOME_STATEMENT),
+        "cash_flow": frame(CASH_FLOW),
+    }
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_registry_matches_the_baseline_calculator(seed):
+    financials = random_statements(seed)
+    periods = list(financials["balance_sheet"].columns)
+    for current, previous in ((periods[0], periods[1]), (periods[1], periods[3])):
+        expected = baseline_ratios.calculate_ratios(financials, current, previous)
+        actual = calculate_ratios(financials, current, previous)
+        assert list(actual) == list(expected)
+        for section, metrics in expected.items():
+            assert list(actual[section]) == list(metrics)
+            for metric, value in metrics.items():
+                got = actual[section][metric]
+                assert (got is None) == (value is None), (section, metric, value, got)
+                if value is not None:
+                    assert math.isclose(got, value, rel_tol=1e-9, abs_tol=1e-9), (section, metric, value, got)
+
+
+def test_report_metrics_cover_the_baseline():
+    financials = random_statements(0)
+    periods = list(financials["balance_sheet"].columns)
+    expected = baseline_ratios.calculate_ratios(financials, periods[0], periods[1])
+    assert {metric for metrics in expected.values() for metric in metrics} == set(report_metrics())
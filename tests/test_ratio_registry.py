@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from src.ratio_calculator import calculate_ratios
+from src.ratio_registry import compile_plan, register, required_statements
+
+PERIODS = [pd.Timestamp("2024-09-30"), pd.Timestamp("2024-06-30")]
+
+
+def statements(flow_scale=1.0):
+    balance = pd.DataFrame({
+        "Inventory": 100.0, "Receivables": 200.0, "Accounts Payable": 50.0, "Total Assets": 1000.0,
+        "Current Assets": 400.0, "Current Liabilities": 300.0, "Net PPE": 500.0,
+        "Stockholders Equity": 600.0, "Invested Capital": 800.0,
+    }, index=PERIODS).T
+    income = pd.DataFrame({
+        "Total Revenue": 1200.0, "Cost Of Revenue": 730.0, "Net Income": 120.0, "EBIT": 180.0,
+        "Interest Expense": 20.0,
+    }, index=PERIODS).T * flow_scale
+    cash_flow = pd.DataFrame({"Operating Cash Flow": 150.0}, index=PERIODS).T * flow_scale
+    return {"balance_sheet": balance, "income_statement": income, "cash_flow": cash_flow}
+
+
+def flat(ratios):
+    return {metric: value for section in ratios.values() for metric, value in section.items()}
+
+
+def test_quarterly_flow_ratios_are_annualized():
+    annual = flat(calculate_ratios(statements(), *PERIODS))
+    quarterly = flat(calculate_ratios(statements(0.25), *PERIODS, frequency="quarterly"))
+    for metric in ("Inventory Turnover", "Receivables Turnover", "Payables Turnover", "Asset Turnover",
+                   "Working Capital Turnover", "Fixed Asset Turnover", "Cash Conversion Cycle",
+                   "Return on Assets (ROA)", "Return on Equity (ROE)", "Return on Capital Employed (ROCE)",
+                   "Return on Invested Capital (ROIC)", "Cash Return on Assets (CROA)",
+                   "Operating Cash Flow Ratio", "Interest Coverage", "Net Profit Margin"):
+        assert quarterly[metric] == pytest.approx(annual[metric], rel=1e-3), metric
+    assert annual["Receivables Turnover"] == pytest.approx(6.0)
+    assert annual["Cash Conversion Cycle"] == pytest.approx(365 / 6 + 365 / 7.3 - 365 / 14.6, abs=0.01)
+
+
+def test_ttm_flows_are_not_scaled():
+    assert flat(calculate_ratios(statements(), *PERIODS, frequency="ttm")) == flat(calculate_ratios(statements(), *PERIODS))
+
+
+def test_parameters_are_not_statements():
+    assert required_statements(["Inventory Turnover"]) == ["income_statement", "balance_sheet"]
+    assert "param:periods_per_year" in compile_plan(("Inventory Turnover",)).order
+    with pytest.raises(ValueError):
+        register("Broken", ["param:nope"], lambda x: x)
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.scheduler import DEFAULT_MAX_WAIT, DEFAULT_RETRY, DEFAULT_TTL, EARNINGS_GRACE, RefreshScheduler, due_time
+from src.session import FixtureProvider, set_default_provider
+from src.statement_cache import StatementCache
+from tests.conftest import ticker_data
+
+NOW = datetime(2024, 11, 1, 9)
+LAST = datetime(2024, 10, 20)
+
+
+@pytest.fixture
+def universe():
+    set_default_provider(FixtureProvider({ticker: ticker_data(seed) for seed, ticker in enumerate("ABCD")}))
+    yield
+    set_default_provider(None)
+
+
+def make(tmp_path, state=None, **options):
+    scheduler = RefreshScheduler(
+        list("ABCD"), state_path=str(tmp_path / "state.json"),
+        cache=StatementCache(str(tmp_path / "statements.sqlite")), workers=2, **options
+    )
+    scheduler.state.update(state or {})
+    scheduler._heap = []
+    for ticker in scheduler.tickers:
+        scheduler._push(ticker)
+    return scheduler
+
+
+def test_new_and_failed_tickers():
+    assert due_time({}) == (datetime.min, "new")
+    retry_at = "2024-10-21T00:00:00"
+    assert due_time({"last_fetched": LAST.isoformat(), "retry_after": retry_at}) == (datetime(2024, 10, 21), "retry")
+
+
+def test_earnings_date_brings_the_fetch_forward():
+    state = {"last_fetched": LAST.isoformat(), "next_earnings": "2024-10-25T00:00:00"}
+    assert due_time(state) == (datetime(2024, 10, 25) + EARNINGS_GRACE, "earnings")
+    # Earnings already covered by the last fetch: only the TTL is left
+    state["next_earnings"] = "2024-10-18T00:00:00"
+    assert due_time(state) == (LAST + DEFAULT_TTL, "ttl")
+
+
+def test_awaited_filing_is_retried_until_max_wait():
+    earnings = datetime(2024, 10, 15)
+    state = {"last_fetched": LAST.isoformat(), "awaiting": earnings.isoformat()}
+    assert due_time(state) == (LAST + DEFAULT_RETRY, "awaiting filing")
+    state["last_fetched"] = (earnings + DEFAULT_MAX_WAIT - timedelta(hours=1)).isoformat()
+    assert due_time(state)[1] == "awaiting filing"
+    state["last_fetched"] = (earnings + DEFAULT_MAX_WAIT).isoformat()
+    assert due_time(state)[1] == "ttl"
+
+
+def test_cycle_refreshes_due_tickers_in_heap_order(universe, tmp_path, monkeypatch):
+    state = {
+        "A": {"last_fetched": (NOW - timedelta(days=31)).isoformat()},
+        "B": {"last_fetched": (NOW - timedelta(days=35)).isoformat()},
+        "C": {"last_fetched": (NOW - timedelta(days=2)).isoformat()},
+    }
+    scheduler = make(tmp_path, state)
+    refreshed = []
+    refresh = scheduler.refresh
+    monkeypatch.setattr(scheduler, "refresh", lambda ticker, now: refreshed.append(ticker) or refresh(ticker, now))
+    summary = scheduler.run_cycle(NOW)
+    assert [r["ticker"] for r in summary["refreshed"]] == ["D", "B", "A"]
+    assert [r["reason"] for r in summary["refreshed"]] == ["new", "ttl", "ttl"]
+    assert sorted(refreshed) == ["A", "B", "D"]
+    assert summary["next_due"] == (NOW - timedelta(days=2) + DEFAULT_TTL).isoformat()
+    assert scheduler.run_cycle(NOW)["refreshed"] == []
+
+
+def test_dry_run_writes_nothing_and_builds_no_reports(universe, tmp_path, monkeypatch):
+    monkeypatch.setattr("src.batch.run_batch", lambda *args, **kwargs: pytest.fail("run_batch called"))
+    scheduler = make(tmp_path, output_dir=str(tmp_path / "reports"))
+    summary = scheduler.run_cycle(NOW, dry_run=True)
+    assert [entry["ticker"] for entry in summary["due"]] == list("ABCD")
+    assert not (tmp_path / "state.json").exists()
+    assert all(scheduler.cache.snapshots(ticker, "balance_sheet") == [] for ticker in "ABCD")
+    assert scheduler.run_cycle(NOW, dry_run=True)["due"] == summary["due"]
+
+
+def test_changed_statements_regenerate_reports(universe, tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr("src.batch.run_batch", lambda jobs, output_dir, **kwargs: calls.append(jobs) or {
+        "counts": {"ok": len(jobs), "failed": 0, "skipped": 0}
+    })
+    summary = make(tmp_path, output_dir=str(tmp_path / "reports")).run_cycle(NOW)
+    assert calls == [[(ticker, "2024-11-01") for ticker in "ABCD"]]
+    assert summary["reports"]["ok"] == 4
+    assert (tmp_path / "state.json").exists()
+    assert make(tmp_path).run_cycle(NOW)["refreshed"] == []
@@ -0,0 +1,53 @@
+import pytest
+
+from src.screener import ScreenerStore, parse_query, resolve_metrics, run_screen
+from src.session import FixtureProvider, set_default_provider
+
+
+class FieldLog(FixtureProvider):
+    def __init__(self, data):
+        super().__init__(data)
+        self.fields = set()
+
+    def fetch(self, handle, field, *args, **kwargs):
+        self.fields.add(field)
+        return super().fetch(handle, field, *args, **kwargs)
+
+
+@pytest.fixture
+def logged(provider):
+    log = FieldLog(provider.data)
+    set_default_provider(log)
+    yield log
+    set_default_provider(None)
+
+
+def test_ingest_fetches_only_the_statements_the_metrics_need(logged, tmp_path):
+    store = ScreenerStore(str(tmp_path))
+    assert store.ingest(["AAA", "BBB"], metrics=resolve_metrics(["Current Ratio"])) == {}
+    assert logged.fields == {"balance_sheet", "info"}
+    ratios = store.compute(["Current Ratio"])
+    assert set(ratios.index.get_level_values("ticker")) == {"AAA", "BBB"}
+    assert ratios["Current Ratio"].notna().all()
+
+
+def test_ingest_fetches_every_statement_by_default(logged, tmp_path):
+    ScreenerStore(str(tmp_path)).ingest(["AAA"])
+    assert {"balance_sheet", "financials", "cashflow"} <= logged.fields
+
+
+def test_queries_accept_short_names():
+    assert parse_query("ROE > 0.15 and Current Ratio <= 2") == [
+        ("Return on Equity (ROE)", ">", 0.15), ("Current Ratio", "<=", 2.0)
+    ]
+    with pytest.raises(ValueError):
+        resolve_metrics(["Nope"])
+
+
+def test_run_screen_returns_matches_and_timing_without_printing(logged, tmp_path, capsys):
+    store = ScreenerStore(str(tmp_path))
+    store.ingest(["AAA", "BBB"])
+    result, seconds = run_screen("Current Ratio > 0", store, sort_by="Current Ratio")
+    assert set(result.index) == {"AAA", "BBB"}
+    assert seconds >= 0
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,101 @@
+import json
+import os
+import threading
+import urllib.request
+from datetime import timedelta
+
+import pytest
+
+from src.incremental import ChartCache
+from src.pdf_report import PDFReport
+from src.server import ReportService, make_server
+
+
+@pytest.fixture
+def service(provider, tmp_path):
+    service = ReportService(
+        str(tmp_path / "reports"), workers=2, provider=provider, chart_cache=ChartCache(str(tmp_path / "charts")),
+        fetch_logo=False
+    )
+    yield service
+    service.shutdown()
+
+
+def test_report_is_built_and_identical_requests_share_it(service):
+    job = service.submit("aaa", "2024-06-30")
+    assert service.submit("AAA", "2024-06-30") is job
+    service.wait(job.id, timeout=60)
+    assert job.status == "done", job.error
+    assert os.path.basename(job.path) == "AAA_2024-06-30_annual_0.pdf"
+    assert service.submit("AAA", "2024-06-30") is job
+
+
+def test_expired_session_rebuilds_into_the_same_file(service):
+    first = service.submit("AAA", "2024-06-30")
+    service.wait(first.id, timeout=60)
+    service.session_ttl = timedelta(0)
+    second = service.submit("AAA", "2024-06-30")
+    assert second is not first
+    service.wait(second.id, timeout=60)
+    assert second.status == "done", second.error
+    assert second.path == first.path
+    assert len(os.listdir(service.output_dir)) == 2  # The PDF and its manifest
+
+
+def test_failed_rebuild_leaves_the_served_pdf_whole(service, monkeypatch):
+    first = service.submit("AAA", "2024-06-30")
+    service.wait(first.id, timeout=60)
+    with open(first.path, "rb") as f:
+        served = f.read()
+
+    def broken_output(self, name):
+        with open(name, "wb") as f:
+            f.write(b"%PDF-partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(PDFReport, "output", broken_output)
+    monkeypatch.setattr("src.pdf_report.is_current", lambda *args: False)
+    service.session_ttl = timedelta(0)
+    second = service.submit("AAA", "2024-06-30")
+    service.wait(second.id, timeout=60)
+    assert second.status == "failed"
+    with open(first.path, "rb") as f:
+        assert f.read() == served
+    assert not [name for name in os.listdir(service.output_dir) if name.endswith(".tmp")]
+
+
+def test_expired_sessions_are_evicted(service):
+    service.session_ttl = timedelta(0)
+    for ticker in ("AAA", "BBB"):
+        service.wait(service.submit(ticker, "2024-06-30").id, timeout=60)
+    assert list(service._sessions) == ["BBB"]
+
+
+@pytest.mark.parametrize("ticker", ["../AAA", "A/B", "AAA;RM", "A B", "X" * 16])
+def test_invalid_ticker_is_rejected(service, ticker):
+    with pytest.raises(ValueError):
+        service.submit(ticker, "2024-06-30")
+
+
+def test_http_round_trip(service):
+    server = make_server(service, port=0, quiet=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        request = urllib.request.Request(
+            f"{base}/reports", data=json.dumps({"ticker": "BBB", "date": "2024-06-30"}).encode(), method="POST"
+        )
+        job = json.load(urllib.request.urlopen(request))
+        service.wait(job["id"], timeout=60)
+        with urllib.request.urlopen(f"{base}/reports/{job['id']}/pdf") as response:
+            assert response.read(5) == b"%PDF-"
+
+        bad = urllib.request.Request(
+            f"{base}/reports", data=json.dumps({"ticker": "../x", "date": "2024-06-30"}).encode(), method="POST"
+        )
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(bad)
+        assert error.value.code == 400
+    finally:
+        server.shutdown()
+        server.server_close()
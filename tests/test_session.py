@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+from src import session as session_module
+from src.session import DataProvider, FixtureProvider, TickerSession, clear_sessions, get_session
+
+
+class CountingProvider(FixtureProvider):
+    def __init__(self, data, delay=0.0):
+        super().__init__(data)
+        self.calls = 0
+        self.delay = delay
+
+    def fetch(self, handle, field, *args, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        return super().fetch(handle, field, *args, **kwargs)
+
+
+def test_incomplete_provider_fails_at_instantiation():
+    class OpenOnly(DataProvider):
+        def open(self, ticker):
+            return {}
+
+    with pytest.raises(TypeError, match="fetch"):
+        OpenOnly()
+
+
+def test_results_are_memoized_per_arguments():
+    provider = CountingProvider({"AAA": {"info": {"longName": "A"}, "history": lambda start, end: (start, end)}})
+    session = TickerSession("aaa", provider)
+    assert session.get("info") is session.get("info")
+    assert session.get("history", start="2024-01-01", end="2024-02-01") == ("2024-01-01", "2024-02-01")
+    session.get("history", end="2024-02-01", start="2024-01-01")
+    assert provider.calls == 2
+    assert session.upstream_calls == 2
+
+
+def test_concurrent_requests_share_one_fetch():
+    provider = CountingProvider({"AAA": {"info": {"longName": "A"}}}, delay=0.05)
+    session = TickerSession("AAA", provider)
+    threads = [threading.Thread(target=session.get, args=("info",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert provider.calls == 1
+
+
+def test_failures_are_not_memoized():
+    data = {"AAA": {}}
+    session = TickerSession("AAA", FixtureProvider(data))
+    with pytest.raises(KeyError):
+        session.get("info")
+    data["AAA"]["info"] = {"longName": "A"}
+    assert session.get("info") == {"longName": "A"}
+
+
+def test_shared_sessions_are_bounded(monkeypatch):
+    monkeypatch.setattr(session_module, "MAX_SESSIONS", 3)
+    provider = FixtureProvider({})
+    clear_sessions()
+    try:
+        first = get_session("T0", provider)
+        for i in range(1, 5):
+            get_session(f"T{i}", provider)
+        assert list(session_module._sessions) == ["T2", "T3", "T4"]
+        assert get_session("T0", provider) is not first
+        get_session("T3", provider)
+        assert list(session_module._sessions) == ["T4", "T0", "T3"]
+    finally:
+        clear_sessions()
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from src.data_loader import get_all_financials
+from src.session import FixtureProvider, TickerSession
+from src.statement_cache import StatementCache
+
+
+def frame(value):
+    return pd.DataFrame({pd.Timestamp("2024-09-30"): [value]}, index=["Total Assets"])
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return StatementCache(str(tmp_path / "statements.sqlite"))
+
+
+class FetchLog(FixtureProvider):
+    def __init__(self, data):
+        super().__init__(data)
+        self.fields = []
+
+    def fetch(self, handle, field, *args, **kwargs):
+        self.fields.append(field)
+        return super().fetch(handle, field, *args, **kwargs)
+
+
+def test_ttl_depends_on_the_statement_frequency(cache):
+    ten_days_ago = datetime.now() - timedelta(days=10)
+    cache.put("aaa", "balance_sheet", frame(1.0), fetched_at=ten_days_ago)
+    cache.put("aaa", "quarterly_balance_sheet", frame(2.0), fetched_at=ten_days_ago)
+    assert cache.get("AAA", "balance_sheet").iloc[0, 0] == 1.0
+    assert cache.get("AAA", "quarterly_balance_sheet") is None
+
+    cache.put("aaa", "balance_sheet", frame(3.0), fetched_at=datetime.now() - timedelta(days=31))
+    assert cache.get("AAA", "balance_sheet").iloc[0, 0] == 1.0  # the newer snapshot still wins
+    shorter = StatementCache(cache.path, ttl={"balance_sheet": timedelta(days=5)})
+    assert shorter.get("AAA", "balance_sheet") is None
+
+
+def test_as_of_reads_the_latest_snapshot_fetched_by_then(cache):
+    for day, value in (("2024-01-10", 1.0), ("2024-03-10", 2.0), ("2024-05-10", 3.0)):
+        cache.put("AAA", "balance_sheet", frame(value), fetched_at=datetime.fromisoformat(day + "T12:00"))
+    assert cache.get("AAA", "balance_sheet", as_of=datetime(2024, 3, 10)).iloc[0, 0] == 2.0
+    assert cache.get("AAA", "balance_sheet", as_of=datetime(2024, 4, 30)).iloc[0, 0] == 2.0
+    assert cache.get("AAA", "balance_sheet", as_of=datetime(2024, 1, 9)) is None
+    # Past the TTL, but as_of reads ignore it
+    assert cache.get("AAA", "balance_sheet", as_of=datetime(2030, 1, 1)).iloc[0, 0] == 3.0
+    assert cache.snapshots("AAA", "balance_sheet")[0] == datetime(2024, 5, 10)
+
+
+def test_same_day_fetch_replaces_the_snapshot(cache):
+    cache.put("AAA", "balance_sheet", frame(1.0), fetched_at=datetime(2024, 1, 10, 9))
+    cache.put("AAA", "balance_sheet", frame(2.0), fetched_at=datetime(2024, 1, 10, 17))
+    assert cache.snapshots("AAA", "balance_sheet") == [datetime(2024, 1, 10)]
+    assert cache.get("AAA", "balance_sheet", as_of=datetime(2024, 1, 10)).iloc[0, 0] == 2.0
+
+
+def test_as_of_miss_is_empty_instead_of_a_live_fetch(provider, cache):
+    log = FetchLog(provider.data)
+    financials = get_all_financials("AAA", TickerSession("AAA", log), cache=cache, as_of=datetime(2024, 1, 1))
+    assert all(df.empty for df in financials.values())
+    assert not {"balance_sheet", "financials", "cashflow"} & set(log.fields)
+    assert cache.snapshots("AAA", "balance_sheet") == []
+
+
+def test_live_miss_is_fetched_once_and_cached(provider, cache):
+    log = FetchLog(provider.data)
+    first = get_all_financials("AAA", TickerSession("AAA", log), cache=cache, statements=["balance_sheet"])
+    again = get_all_financials("AAA", TickerSession("AAA", log), cache=cache, statements=["balance_sheet"])
+    assert log.fields.count("balance_sheet") == 1
+    pd.testing.assert_frame_equal(first["balance_sheet"], again["balance_sheet"])
+    assert cache.get("AAA", "balance_sheet", as_of=datetime.now()) is not None
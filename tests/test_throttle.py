@@ -0,0 +1,65 @@
+import types
+import urllib.error
+
+import pytest
+
+from src.session import FixtureProvider
+from src.throttle import ThrottledProvider, TokenBucket, backoff_delay, is_transient
+
+
+@pytest.mark.parametrize("message", [
+    "HTTP Error 429: Too Many Requests",
+    "500 Server Error: Internal Server Error for url: https://query2.finance.yahoo.com/x",
+    "Unexpected status code: 503",
+    "Read timed out. (read timeout=30)",
+    "('Connection aborted.', RemoteDisconnected('Remote end closed connection without response'))",
+    "Too Many Requests. Rate limited. Try after a while.",
+])
+def test_transient_messages(message):
+    assert is_transient(Exception(message))
+
+
+@pytest.mark.parametrize("message", [
+    "No data found for ticker A500",
+    "Expected 429 rows, got 428",
+    "No price data between 2024-05-03 and 2024-05-04",
+    "'Total Revenue' not found in 502 line items",
+    "HTTP Error 404: Not Found",
+])
+def test_permanent_messages(message):
+    assert not is_transient(Exception(message))
+
+
+def test_status_codes_win_over_the_message():
+    response = types.SimpleNamespace(status_code=404)
+    error = Exception("503 of them")
+    error.response = response
+    assert not is_transient(error)
+    assert is_transient(urllib.error.HTTPError("https://x", 502, "Bad Gateway", {}, None))
+    assert not is_transient(urllib.error.HTTPError("https://x", 400, "Bad Request", {}, None))
+
+
+def test_backoff_is_capped():
+    assert all(0 <= backoff_delay(attempt, base=1, cap=5) <= 5 for attempt in range(20))
+
+
+def test_bucket_allows_a_burst_then_waits(tmp_path):
+    bucket = TokenBucket(rate=50, capacity=3, path=str(tmp_path / "bucket"))
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() > 0
+    with pytest.raises(TimeoutError):
+        bucket.acquire(tokens=3, timeout=0.001)
+
+
+def test_final_failure_after_retries_is_logged(tmp_path, caplog):
+    def history(*args, **kwargs):
+        raise OSError("Read timed out")
+
+    provider = ThrottledProvider(
+        FixtureProvider({"AAA": {"history": history}}), TokenBucket(rate=1000, path=str(tmp_path / "bucket")),
+        retries=2, base_delay=0.001, max_delay=0.001
+    )
+    with pytest.raises(OSError):
+        provider.fetch(provider.open("AAA"), "history")
+    assert provider.stats()["history"]["retries"] == 2
+    assert "Upstream history failed after 2 retries: OSError: Read timed out" in caplog.text
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.price_store import PriceStore
+from src.report_builder import get_total_return
+from src.session import TickerSession
+from src.total_return import compute_returns
+
+
+def test_dividends_are_reinvested():
+    dates = pd.bdate_range("2024-01-01", periods=3).to_numpy()
+    prices = np.array([[100.0], [100.0], [100.0]])
+    dividends = np.array([[0.0], [1.0], [0.0]])
+    result = compute_returns(dates, prices, dividends)
+    assert result["summary"]["price_return"][0] == pytest.approx(0.0)
+    assert result["summary"]["total_return"][0] == pytest.approx(0.01)
+
+
+def test_raw_prices_are_divided_by_later_splits():
+    dates = pd.bdate_range("2024-01-01", periods=4).to_numpy()
+    prices = np.array([[100.0], [100.0], [50.0], [50.0]])
+    splits = np.array([[0.0], [0.0], [2.0], [0.0]])
+    result = compute_returns(dates, prices, splits=splits, raw_prices=True)
+    assert np.allclose(result["price_index"][:, 0], 1.0)
+    assert result["summary"]["max_drawdown"][0] == pytest.approx(0.0)
+
+
+def test_split_in_the_price_store_is_not_a_crash(split_history, tmp_path):
+    store = PriceStore(str(tmp_path))
+    get_total_return("SPLT", datetime(2024, 1, 30), TickerSession("SPLT", split_history.provider), store)
+
+    # The split happens after the first fill: the stored history must be restated, not appended to
+    split_history.today = pd.Timestamp("2024-06-28")
+    result = get_total_return("SPLT", datetime(2024, 6, 27), TickerSession("SPLT", split_history.provider), store)
+    frame = result["frame"]
+    assert frame.index.min() < split_history.SPLIT_DATE < frame.index.max()
+    assert np.allclose(frame["Price"], 100.0)
+    assert result["summary"]["max_drawdown"] == pytest.approx(0.0)
+    assert result["summary"]["total_return"] > 0
@@ -0,0 +1,115 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from src.orchestrator import run_sections
+from src.tracing import DURATION_BUCKETS, Tracer, count, disable_tracing, enable_tracing, span, traced
+
+
+@pytest.fixture
+def tracer():
+    tracer = enable_tracing()
+    yield tracer
+    disable_tracing()
+
+
+@traced("test.work")
+def work(fail=False):
+    with span("test.inner", item="x"):
+        if fail:
+            raise ValueError("bad \"input\"")
+
+
+def traced_in_worker(_):
+    tracer = enable_tracing()
+    with span("worker.outer"):
+        work()
+    count("report_cache_requests_total", cache="statements", result="hit")
+    disable_tracing()
+    return tracer.snapshot(), tracer.trace_events()
+
+
+def by_name(tracer):
+    return {s.name: s for s in tracer.spans}
+
+
+def test_spans_nest_across_section_threads(tracer):
+    with span("report") as outer:
+        run_sections({"a": work, "b": work}, label="section")
+    spans = by_name(tracer)
+    assert spans["section.a"].parent_id == outer.span_id
+    assert spans["section.a"].thread != outer.thread
+    inner = [s for s in tracer.spans if s.name == "test.work"]
+    assert sorted(s.parent_id for s in inner) == sorted([spans["section.a"].span_id, spans["section.b"].span_id])
+
+
+def test_worker_processes_keep_their_nesting_and_merge_metrics(tracer):
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(traced_in_worker, range(2)))
+    for snapshot, events in results:
+        tracer.merge(snapshot)
+        ids = {event["name"]: event["args"]["span_id"] for event in events}
+        parents = {event["name"]: event["args"].get("parent_id") for event in events}
+        assert parents == {"worker.outer": None, "test.work": ids["worker.outer"], "test.inner": ids["test.work"]}
+        assert {event["pid"] for event in events} != {os.getpid()}
+    snapshot = tracer.snapshot()
+    assert ["report_cache_requests_total", {"cache": "statements", "result": "hit"}, 2] in snapshot["counters"]
+    assert {name: sum(counts) for name, counts, _ in snapshot["histograms"]} == {
+        "worker.outer": 2, "test.work": 2, "test.inner": 2
+    }
+
+
+def test_chrome_trace_layout(tracer, tmp_path):
+    with pytest.raises(ValueError):
+        work(fail=True)
+    path = tmp_path / "trace.json"
+    tracer.write_trace(str(path))
+    trace = json.loads(path.read_text())
+    assert trace["droppedSpans"] == 0
+    events = {event["name"]: event for event in trace["traceEvents"]}
+    inner, outer = events["test.inner"], events["test.work"]
+    assert inner["ph"] == "X" and inner["cat"] == "test"
+    assert inner["pid"] == os.getpid() and isinstance(inner["tid"], int)
+    assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"] + 1
+    assert inner["args"]["item"] == "x" and inner["args"]["parent_id"] == outer["args"]["span_id"]
+    assert inner["args"]["error"].startswith("ValueError")
+
+
+def test_spans_past_the_limit_are_dropped():
+    tracer = enable_tracing(Tracer(max_spans=1))
+    try:
+        work()
+    finally:
+        disable_tracing()
+    assert len(tracer.spans) == 1 and tracer.dropped_spans == 1
+    assert sum(tracer.histograms["test.work"][0]) == 1
+
+
+def test_prometheus_text(tracer):
+    work()
+    with pytest.raises(ValueError):
+        work(fail=True)
+    count("report_cache_requests_total", 2, cache='a"b', result="miss")
+    lines = tracer.prometheus().splitlines()
+
+    assert "# TYPE report_span_seconds histogram" in lines
+    assert "# HELP report_cache_requests_total Local cache lookups by result" in lines
+    buckets = [line for line in lines
+               if line.startswith("report_span_seconds_bucket{") and 'span="test.work"' in line]
+    assert len(buckets) == len(DURATION_BUCKETS) + 1
+    values = [int(line.rsplit(" ", 1)[1]) for line in buckets]
+    assert values == sorted(values) and values[-1] == 2
+    assert buckets[-1].startswith('report_span_seconds_bucket{le="+Inf",span="test.work"}')
+    assert 'report_span_seconds_count{span="test.work"} 2' in lines
+    assert 'report_span_errors_total{span="test.inner"} 1' in lines
+    assert 'report_cache_requests_total{cache="a\\"b",result="miss"} 2' in lines
+
+
+def test_disabled_tracing_records_nothing():
+    assert disable_tracing() is None
+    with span("ignored") as s:
+        s.set("key", "value")
+    count("report_cache_requests_total")
+    assert work() is None